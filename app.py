@@ -8,22 +8,34 @@ import os
 # Load environment variables from .env file
 load_dotenv()
 
+import logging
 from flask import Flask
 from flask_cors import CORS
-from src.web.views import main_bp
+from src.web.startup import startup
+
+with startup.phase('import_views'):
+    from src.web.views import main_bp
+from src.web.http_cache import init_compression
+
+logger = logging.getLogger(__name__)
 
 def create_app():
     """Create and configure the Flask application."""
-    app = Flask(__name__, 
-                static_folder='src/web/static',
-                template_folder='src/web/templates')
-    
-    # Enable CORS
-    CORS(app)
-    
-    # Register blueprints
-    app.register_blueprint(main_bp)
+    with startup.phase('create_app'):
+        app = Flask(__name__, 
+                    static_folder='src/web/static',
+                    template_folder='src/web/templates')
+        
+        # Enable CORS
+        CORS(app)
+        
+        # Compress large JSON and HTML responses
+        init_compression(app)
+        
+        # Register blueprints
+        app.register_blueprint(main_bp)
     
+    logger.info(f"Startup report: {startup.report()}")
     return app
 
 if __name__ == '__main__':
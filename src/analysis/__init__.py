@@ -0,0 +1,3 @@
+"""
+Analysis helpers shared by the web application and batch jobs
+"""
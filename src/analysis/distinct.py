@@ -0,0 +1,208 @@
+"""
+Distinct counts from mergeable HyperLogLog sketches.
+
+Counting distinct authors or words exactly means holding every value in a set.
+During analysis one HyperLogLog is filled per question instead:
+
+- ``authors``: distinct authors of posts and comments
+- ``locations``: distinct authors mentioning each location
+- ``days``: per UTC day, distinct authors and distinct words (vocabulary size)
+
+The counts go into the ``distinct_counts`` analysis section and the serialised
+sketches are saved with the other sketches of the analysis, so counts over any
+date range (or across several analyses) are answered by merging daily sketches.
+"""
+
+import re
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, Optional
+
+from src.data.post_store import to_epoch
+from src.analysis.text import extract_locations
+from src.analysis.sketches import HyperLogLog, DEFAULT_PRECISION
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UNKNOWN_AUTHORS = ('', '[deleted]', 'None')
+
+
+def _day(timestamp: Any) -> Optional[str]:
+    """UTC calendar day of a timestamp, or None if it cannot be parsed."""
+    epoch = to_epoch(timestamp)
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def _words(text: str) -> set:
+    """Distinct words of a text, tokenised like the phrase extractor."""
+    return set(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+class DistinctCounter:
+    """HyperLogLog sketches for distinct authors, posters per location and daily vocabulary."""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        """
+        Initialize empty sketches.
+
+        Args:
+            precision: HyperLogLog precision of every sketch
+        """
+        self.precision = precision
+        self.authors = HyperLogLog(precision)
+        self.locations = {}
+        self.days = {}
+
+    def _day_sketches(self, day: str) -> Dict[str, HyperLogLog]:
+        if day not in self.days:
+            self.days[day] = {'authors': HyperLogLog(self.precision),
+                              'vocabulary': HyperLogLog(self.precision)}
+        return self.days[day]
+
+    def add_text(self, text: str, author: Any, created_utc: Any):
+        """
+        Count one post or comment.
+
+        Args:
+            text: Post title and body, or comment text
+            author: Author name
+            created_utc: Creation time in any format accepted by to_epoch
+        """
+        author = str(author) if author is not None else ''
+        known_author = author not in UNKNOWN_AUTHORS
+        day = _day(created_utc)
+
+        if known_author:
+            self.authors.update(author)
+            for location in extract_locations(text):
+                if location not in self.locations:
+                    self.locations[location] = HyperLogLog(self.precision)
+                self.locations[location].update(author)
+
+        if day is not None:
+            sketches = self._day_sketches(day)
+            if known_author:
+                sketches['authors'].update(author)
+            sketches['vocabulary'].update_all(_words(text))
+
+    def add_posts(self, posts_data: Iterable[Dict[str, Any]]):
+        """Count scrape-format posts and their comments."""
+        for post in posts_data:
+            # comments_only stubs of an incremental delta carry new comments of a counted post
+            if not post.get('comments_only'):
+                self.add_text(f"{post.get('title', '')} {post.get('text', '')}",
+                              post.get('author'), post.get('created_utc'))
+            for comment in post.get('comments', []):
+                self.add_text(comment.get('text', ''), comment.get('author'), comment.get('created_utc'))
+
+    def merge(self, other: 'DistinctCounter') -> 'DistinctCounter':
+        """Combine sketches from another analysis, shard or day."""
+        self.authors.merge(other.authors)
+        for location, sketch in other.locations.items():
+            if location in self.locations:
+                self.locations[location].merge(sketch)
+            else:
+                self.locations[location] = HyperLogLog.from_dict(sketch.to_dict())
+        for day, sketches in other.days.items():
+            own = self._day_sketches(day)
+            own['authors'].merge(sketches['authors'])
+            own['vocabulary'].merge(sketches['vocabulary'])
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the distinct counts.
+
+        Returns:
+            The ``distinct_counts`` analysis section
+        """
+        days = sorted(self.days)
+        return {
+            'authors': self.authors.count(),
+            'posters_by_location': {location: sketch.count()
+                                    for location, sketch in sorted(self.locations.items())},
+            'by_day': {
+                'days': days,
+                'authors': [self.days[day]['authors'].count() for day in days],
+                'vocabulary': [self.days[day]['vocabulary'].count() for day in days]
+            }
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise to a JSON compatible dictionary."""
+        return {
+            'type': 'distinct_counter',
+            'precision': self.precision,
+            'authors': self.authors.to_dict(),
+            'locations': {location: sketch.to_dict() for location, sketch in self.locations.items()},
+            'days': {day: {name: sketch.to_dict() for name, sketch in sketches.items()}
+                     for day, sketches in self.days.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DistinctCounter':
+        """Rebuild sketches serialised with to_dict."""
+        counter = cls(data['precision'])
+        counter.authors = HyperLogLog.from_dict(data['authors'])
+        counter.locations = {location: HyperLogLog.from_dict(sketch)
+                             for location, sketch in data['locations'].items()}
+        counter.days = {day: {name: HyperLogLog.from_dict(sketch) for name, sketch in sketches.items()}
+                        for day, sketches in data['days'].items()}
+        return counter
+
+
+def analyze_distinct(posts_data: Iterable[Dict[str, Any]],
+                     precision: int = DEFAULT_PRECISION) -> DistinctCounter:
+    """
+    Build distinct-count sketches for scrape-format posts.
+
+    Args:
+        posts_data: Posts in scrape format
+        precision: HyperLogLog precision
+
+    Returns:
+        Filled DistinctCounter; use ``summary()`` for the analysis section and
+        ``to_dict()`` for the sketch file
+    """
+    counter = DistinctCounter(precision)
+    counter.add_posts(posts_data)
+    return counter
+
+
+def distinct_counts_for_range(serialised: Iterable[Dict[str, Any]], start: Optional[str] = None,
+                              end: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Merge the daily sketches of one or more analyses over a date range.
+
+    Args:
+        serialised: ``DistinctCounter.to_dict`` results, e.g. one per analysis
+        start: First day to include (YYYY-MM-DD), or None for no lower bound
+        end: Last day to include (YYYY-MM-DD), or None for no upper bound
+
+    Returns:
+        Dictionary with the range, the days covered and the distinct authors
+        and vocabulary size over the whole range
+    """
+    authors = vocabulary = None
+    days = set()
+    for data in serialised:
+        for day, sketches in data['days'].items():
+            if (start and day < start) or (end and day > end):
+                continue
+            days.add(day)
+            day_authors = HyperLogLog.from_dict(sketches['authors'])
+            day_vocabulary = HyperLogLog.from_dict(sketches['vocabulary'])
+            authors = day_authors if authors is None else authors.merge(day_authors)
+            vocabulary = day_vocabulary if vocabulary is None else vocabulary.merge(day_vocabulary)
+
+    return {
+        'start': start,
+        'end': end,
+        'days': sorted(days),
+        'authors': authors.count() if authors is not None else 0,
+        'vocabulary': vocabulary.count() if vocabulary is not None else 0
+    }
@@ -0,0 +1,194 @@
+"""
+Downsampling for time-series charts.
+
+A chart cannot draw more points than it has pixels, so series longer than
+``max_points`` are reduced on the server before they are serialised. Single
+series use Largest-Triangle-Three-Buckets (LTTB), which keeps the visual shape
+of the line. Several series sharing one x axis use min/max per bucket so every
+series keeps its peaks and troughs at the same selected x positions.
+
+Raw per-post series may mix epoch and ISO 8601 timestamps (and missing ones);
+they are ordered by ``to_epoch`` and points without a parseable time are
+dropped before downsampling.
+"""
+
+from typing import Dict, Any, List, Optional, Sequence
+
+from src.data.post_store import to_epoch
+
+
+def lttb_indices(values: Sequence[float], max_points: int,
+                 x: Optional[Sequence[float]] = None) -> List[int]:
+    """
+    Select indices of a series with Largest-Triangle-Three-Buckets.
+
+    Args:
+        values: Y values
+        max_points: Number of points to keep (at least 3 to be meaningful)
+        x: Optional X values (defaults to the positions 0..n-1)
+
+    Returns:
+        Sorted list of selected indices, always including the first and last point
+    """
+    n = len(values)
+    if max_points >= n:
+        return list(range(n))
+    if max_points < 3:
+        return [0, n - 1][:max(max_points, 1)]
+    if x is None:
+        x = range(n)
+
+    selected = [0]
+    bucket_size = (n - 2) / (max_points - 2)
+    a = 0
+    for i in range(max_points - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = sum(x[j] for j in range(next_start, next_end)) / (next_end - next_start)
+        avg_y = sum(values[j] for j in range(next_start, next_end)) / (next_end - next_start)
+
+        # Pick the point in this bucket forming the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        best_area = -1.0
+        best_index = start
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (values[j] - values[a]) -
+                       (x[a] - x[j]) * (avg_y - values[a]))
+            if area > best_area:
+                best_area = area
+                best_index = j
+        selected.append(best_index)
+        a = best_index
+
+    selected.append(n - 1)
+    return selected
+
+
+def minmax_indices(series: Sequence[Sequence[float]], max_points: int) -> List[int]:
+    """
+    Select indices keeping the minimum and maximum of every series per bucket.
+
+    Args:
+        series: Aligned series of equal length
+        max_points: Target number of indices; never fewer than two per series are kept
+
+    Returns:
+        Sorted list of selected indices
+    """
+    n = len(series[0]) if series else 0
+    if n <= max_points:
+        return list(range(n))
+
+    per_bucket = 2 * len(series)
+    buckets = max(1, max_points // per_bucket)
+    selected = set()
+    for b in range(buckets):
+        start = b * n // buckets
+        end = (b + 1) * n // buckets
+        if start >= end:
+            continue
+        for values in series:
+            window = range(start, end)
+            selected.add(min(window, key=lambda j: values[j]))
+            selected.add(max(window, key=lambda j: values[j]))
+    return sorted(selected)
+
+
+def downsample_series(labels: Sequence[Any], series: Sequence[Sequence[float]],
+                      max_points: Optional[int]) -> Dict[str, Any]:
+    """
+    Downsample aligned series that share one set of labels.
+
+    Args:
+        labels: X axis labels
+        series: One or more Y series aligned with ``labels``
+        max_points: Maximum number of points to return; None or 0 disables downsampling
+
+    Returns:
+        Dictionary with the kept ``labels`` and ``series``
+    """
+    if not max_points or len(labels) <= max_points:
+        return {'labels': list(labels), 'series': [list(values) for values in series]}
+
+    numeric = [[value if value is not None else 0 for value in values] for values in series]
+    if len(numeric) == 1:
+        indices = lttb_indices(numeric[0], max_points)
+    else:
+        indices = minmax_indices(numeric, max_points)
+
+    return {
+        'labels': [labels[i] for i in indices],
+        'series': [[values[i] for i in indices] for values in series]
+    }
+
+
+def parse_max_points(value: Any) -> Optional[int]:
+    """Parse the ``max_points`` request parameter; invalid or non-positive values disable it."""
+    try:
+        max_points = int(value)
+    except (TypeError, ValueError):
+        return None
+    return max_points if max_points > 0 else None
+
+
+def downsample_raw_series(analysis_data: Dict[str, Any], max_points: Optional[int]) -> Dict[str, Any]:
+    """
+    Downsample the per-post series stored in an analysis file.
+
+    Handles ``sentiment_over_time`` (timestamps/sentiments) and
+    ``engagement_patterns`` (list of timestamp/score/num_comments) wherever they
+    appear among the top-level sections, and rollup buckets if present.
+
+    Args:
+        analysis_data: Parsed analysis data (not modified)
+        max_points: Maximum points per series
+
+    Returns:
+        Shallow copy with the series reduced to at most ``max_points`` points
+    """
+    if not max_points:
+        return analysis_data
+
+    result = {}
+    for key, section in analysis_data.items():
+        if isinstance(section, dict):
+            section = dict(section)
+            over_time = section.get('sentiment_over_time')
+            if isinstance(over_time, dict) and 'timestamps' in over_time:
+                epochs = [to_epoch(timestamp) for timestamp in over_time['timestamps']]
+                order = sorted((i for i, epoch in enumerate(epochs) if epoch is not None), key=lambda i: epochs[i])
+                reduced = downsample_series(
+                    [over_time['timestamps'][i] for i in order],
+                    [[over_time['sentiments'][i] for i in order]],
+                    max_points
+                )
+                section['sentiment_over_time'] = {
+                    'timestamps': reduced['labels'],
+                    'sentiments': reduced['series'][0]
+                }
+
+            patterns = section.get('engagement_patterns')
+            if isinstance(patterns, list) and len(patterns) > max_points:
+                timed = [(to_epoch(p.get('timestamp')), p) for p in patterns]
+                patterns = [p for _, p in sorted((item for item in timed if item[0] is not None),
+                                                 key=lambda item: item[0])]
+                indices = minmax_indices(
+                    [[p['score'] for p in patterns], [p['num_comments'] for p in patterns]],
+                    max_points
+                )
+                section['engagement_patterns'] = [patterns[i] for i in indices]
+
+            buckets = section.get('buckets') if key == 'rollup' else None
+            if isinstance(buckets, list) and len(buckets) > max_points:
+                indices = minmax_indices(
+                    [[b['posts'] for b in buckets],
+                     [b['mean_sentiment'] if b['mean_sentiment'] is not None else 0 for b in buckets]],
+                    max_points
+                )
+                section['buckets'] = [buckets[i] for i in indices]
+        result[key] = section
+    return result
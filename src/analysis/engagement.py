@@ -0,0 +1,201 @@
+"""
+Vectorized engagement analytics.
+
+Posts and comments are loaded into two columnar frames once, then every
+statistic is a grouped NumPy/pandas operation over those columns:
+
+- ``top_influencers``: authors ranked by engagement (post score plus comment
+  count for their posts, plus the score of their comments)
+- ``engagement_by_day``: posts and average engagement per calendar day
+- ``engagement_by_weekday`` / ``engagement_by_hour``: distributions over the
+  day of week and hour of day (UTC)
+- ``percentiles``: mean and p50/p90/p99 of post scores, comment counts and
+  comment scores
+
+The output is the ``engagement_analysis`` section read by the visualization
+formatters.
+"""
+
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Dict, Any, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.post_store import to_epoch
+from src.analysis.rollups import PERCENTILES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+UNKNOWN_AUTHORS = ('', '[deleted]', 'None')
+
+
+def build_frames(posts_data: Iterable[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Flatten scrape-format posts into columnar post and comment frames.
+
+    This is the only per-record Python loop; it appends to plain lists, which
+    are converted to typed columns once.
+
+    Args:
+        posts_data: Posts in scrape format
+
+    Returns:
+        Tuple of (posts, comments) frames. Posts have ``id``, ``author``,
+        ``created_utc``, ``score`` and ``num_comments``; comments have
+        ``post_id``, ``author``, ``created_utc`` and ``score``.
+    """
+    post_columns = {'id': [], 'author': [], 'created_utc': [], 'score': [], 'num_comments': []}
+    comment_columns = {'post_id': [], 'author': [], 'created_utc': [], 'score': []}
+
+    for post in posts_data:
+        post_id = str(post.get('id'))
+        post_columns['id'].append(post_id)
+        post_columns['author'].append(post.get('author'))
+        post_columns['created_utc'].append(to_epoch(post.get('created_utc')))
+        post_columns['score'].append(post.get('score') or 0)
+        post_columns['num_comments'].append(post.get('num_comments') or 0)
+        for comment in post.get('comments', []):
+            comment_columns['post_id'].append(post_id)
+            comment_columns['author'].append(comment.get('author'))
+            comment_columns['created_utc'].append(to_epoch(comment.get('created_utc')))
+            comment_columns['score'].append(comment.get('score') or 0)
+
+    return _typed(pd.DataFrame(post_columns)), _typed(pd.DataFrame(comment_columns))
+
+
+def load_store_frames(db_path: str, source: str = 'reddit') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Read post and comment frames straight from a post store database.
+
+    Avoids materialising scrape-format dictionaries for large stores.
+
+    Args:
+        db_path: Path to the post store SQLite database
+        source: Data source to read
+
+    Returns:
+        Tuple of (posts, comments) frames, as returned by build_frames
+    """
+    with closing(sqlite3.connect(db_path)) as conn:
+        posts = pd.read_sql_query(
+            "SELECT id, author, created_utc, score, num_comments FROM posts WHERE source = ?",
+            conn, params=(source,)
+        )
+        comments = pd.read_sql_query(
+            "SELECT c.post_id, c.author, c.created_utc, c.score FROM comments c "
+            "JOIN posts p ON p.id = c.post_id WHERE p.source = ?",
+            conn, params=(source,)
+        )
+    return _typed(posts), _typed(comments)
+
+
+def _typed(frame: pd.DataFrame) -> pd.DataFrame:
+    """Coerce engagement columns to numeric dtypes."""
+    frame['created_utc'] = pd.to_numeric(frame['created_utc'], errors='coerce')
+    for column in ('score', 'num_comments'):
+        if column in frame:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').fillna(0).astype('int64')
+    frame['author'] = frame['author'].astype(object).where(frame['author'].notna(), '')
+    return frame
+
+
+def _summary(values: pd.Series) -> Dict[str, Any]:
+    """Mean and percentiles of a numeric column."""
+    if values.empty:
+        return {'mean': None, **{f'p{q}': None for q in PERCENTILES}}
+    quantiles = np.percentile(values.to_numpy(dtype=float), PERCENTILES)
+    summary = {'mean': float(values.mean())}
+    summary.update({f'p{q}': float(value) for q, value in zip(PERCENTILES, quantiles)})
+    return summary
+
+
+def _distribution(keys: pd.Series, engagement: pd.Series, index: Iterable) -> Tuple[list, list]:
+    """Post counts and mean engagement per key, filled for every key in ``index``."""
+    grouped = engagement.groupby(keys).agg(['size', 'mean']).reindex(list(index))
+    return (grouped['size'].fillna(0).astype(int).tolist(),
+            grouped['mean'].fillna(0).round(2).tolist())
+
+
+def analyze_engagement_frames(posts: pd.DataFrame, comments: pd.DataFrame,
+                              top_n: int = 20) -> Dict[str, Any]:
+    """
+    Compute engagement statistics from post and comment frames.
+
+    Args:
+        posts: Post frame (see build_frames)
+        comments: Comment frame (see build_frames)
+        top_n: Number of influencers to report
+
+    Returns:
+        Engagement analysis results
+    """
+    post_engagement = posts['score'] + posts['num_comments']
+
+    # Per-author engagement across posts and comments
+    author_engagement = pd.concat([
+        pd.DataFrame({'author': posts['author'], 'engagement': post_engagement}),
+        pd.DataFrame({'author': comments['author'], 'engagement': comments['score']})
+    ], ignore_index=True)
+    author_engagement = author_engagement[~author_engagement['author'].isin(UNKNOWN_AUTHORS)]
+    influencers = author_engagement.groupby('author')['engagement'].sum().nlargest(top_n)
+
+    # Time distributions use posts with a valid timestamp
+    dated = posts['created_utc'].notna()
+    times = pd.to_datetime(posts.loc[dated, 'created_utc'], unit='s', utc=True)
+    dated_engagement = post_engagement[dated]
+
+    days = times.dt.strftime('%Y-%m-%d')
+    day_index = sorted(days.unique())
+    day_counts, day_avg = _distribution(days, dated_engagement, day_index)
+    weekday_counts, weekday_avg = _distribution(times.dt.dayofweek, dated_engagement, range(7))
+    hour_counts, hour_avg = _distribution(times.dt.hour, dated_engagement, range(24))
+
+    return {
+        'totals': {
+            'posts': int(len(posts)),
+            'comments': int(len(comments)),
+            'authors': int(author_engagement['author'].nunique())
+        },
+        'top_influencers': {str(author): int(value) for author, value in influencers.items()},
+        'engagement_by_day': {
+            'days': day_index,
+            'counts': day_counts,
+            'avg_engagement': day_avg
+        },
+        'engagement_by_weekday': {
+            'days': WEEKDAYS,
+            'counts': weekday_counts,
+            'avg_engagement': weekday_avg
+        },
+        'engagement_by_hour': {
+            'hours': list(range(24)),
+            'counts': hour_counts,
+            'avg_engagement': hour_avg
+        },
+        'percentiles': {
+            'post_score': _summary(posts['score']),
+            'post_comments': _summary(posts['num_comments']),
+            'comment_score': _summary(comments['score'])
+        }
+    }
+
+
+def analyze_engagement(posts_data: Iterable[Dict[str, Any]], top_n: int = 20) -> Dict[str, Any]:
+    """
+    Compute engagement statistics for scrape-format posts.
+
+    Args:
+        posts_data: Posts in scrape format
+        top_n: Number of influencers to report
+
+    Returns:
+        Engagement analysis results (see analyze_engagement_frames)
+    """
+    posts, comments = build_frames(posts_data)
+    return analyze_engagement_frames(posts, comments, top_n)
@@ -0,0 +1,122 @@
+"""
+Parallel analysis of a corpus in worker processes.
+
+The posts are split into contiguous slices of roughly equal row counts. Each
+worker attaches to the shared corpus by handle (see
+``src.data.corpus.share_corpus``), analyses its slice into an
+``AnalysisState`` and returns the serialised state; only these partial states
+cross process boundaries, never the posts. The parent merges the states in
+slice order, which gives the same result as analysing every post in one
+process::
+
+    state = analyze_parallel(corpus, ['sentiment', 'trend'])
+    results = state.sections()
+
+Workers run in a spawn-based process pool created on first use, sized by
+``ANALYSIS_WORKERS``. Corpora smaller than ``PARALLEL_MIN_RECORDS`` rows are
+not worth the hand-off and should be analysed in process.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.data.corpus import Corpus, share_corpus, attach_corpus
+from src.analysis.partials import AnalysisState
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', os.cpu_count() or 1))
+PARALLEL_MIN_RECORDS = int(os.getenv('PARALLEL_MIN_RECORDS', 5000))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers: int = ANALYSIS_WORKERS) -> ProcessPoolExecutor:
+    """Get the shared analysis process pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs request threads is unsafe
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            # In a job worker process, multiprocessing joins child processes at exit before
+            # atexit handlers run; stop the pool first (ahead of its queues' own
+            # finalizers) or the worker never exits
+            multiprocessing.util.Finalize(None, _executor.shutdown, exitpriority=100)
+        return _executor
+
+
+def should_parallelize(records: int, workers: int = ANALYSIS_WORKERS) -> bool:
+    """Whether a corpus of this many rows is worth analysing in worker processes."""
+    return workers > 1 and records >= PARALLEL_MIN_RECORDS
+
+
+def split_posts(corpus: Corpus, parts: int) -> List[Tuple[int, int]]:
+    """
+    Split the posts of a corpus into contiguous slices of similar row counts.
+
+    Args:
+        corpus: Corpus to split
+        parts: Maximum number of slices
+
+    Returns:
+        List of (first post, post after the last one)
+    """
+    posts = corpus.post_count
+    if posts == 0:
+        return []
+    # Post boundaries closest to equal shares of the rows, so comment-heavy posts are spread out
+    targets = np.linspace(0, len(corpus), max(parts, 1) + 1)[1:-1]
+    bounds = np.unique(np.searchsorted(corpus.post_rows, targets).clip(1, posts))
+    edges = [0] + [int(bound) for bound in bounds if bound < posts] + [posts]
+    return [(start, stop) for start, stop in zip(edges, edges[1:]) if start < stop]
+
+
+def _analyze_slice(handle: Dict[str, Any], start: int, stop: int, analysis_types: List[str],
+                   phrase_counting: str) -> Dict[str, Any]:
+    """Analyse a slice of a shared corpus (runs in a worker process)."""
+    with attach_corpus(handle) as corpus:
+        state = AnalysisState(analysis_types, phrase_counting).add_posts(corpus.posts(start, stop))
+    return state.to_dict()
+
+
+def analyze_parallel(corpus: Corpus, analysis_types: Iterable[str], phrase_counting: str = 'exact',
+                     workers: Optional[int] = None) -> AnalysisState:
+    """
+    Analyse a corpus in worker processes.
+
+    Args:
+        corpus: Corpus to analyse
+        analysis_types: Requested analysis types (those in PARTIALS are computed)
+        phrase_counting: 'exact' or 'sketch' phrase counting for trends
+        workers: Number of slices (defaults to ANALYSIS_WORKERS)
+
+    Returns:
+        Merged analysis state of every post
+    """
+    analysis_types = list(analysis_types)
+    slices = split_posts(corpus, workers or ANALYSIS_WORKERS)
+    if not slices:
+        return AnalysisState(analysis_types, phrase_counting)
+
+    executor = get_executor()
+    with share_corpus(corpus) as handle:
+        futures = [executor.submit(_analyze_slice, handle, start, stop, analysis_types, phrase_counting)
+                   for start, stop in slices]
+        # Merge in slice order so time-ordered series stay in post order
+        state = None
+        for future in futures:
+            partial = AnalysisState.from_dict(future.result())
+            state = partial if state is None else state.merge(partial)
+
+    logger.info(f"Analysed {corpus.post_count} posts in {len(slices)} worker slices")
+    return state
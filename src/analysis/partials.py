@@ -0,0 +1,567 @@
+"""
+Mergeable partial states of the text analyzers.
+
+Each analyzer accumulates a partial state that can be filled from posts,
+merged with a state built from other posts and serialised, so an analysis of
+(old data + delta) is the stored state of the old data merged with a state of
+the delta:
+
+- ``SentimentPartial``: polarity class counts and the per-post series
+- ``TrendPartial``: phrase counts (exact ``Counter`` or ``HeavyHitters``)
+- ``IncidentPartial``: incident type and location counters and incident times
+- ``LocationPartial``: region, area and road counters and mention contexts
+- ``PostLedger``: per-post timestamp, engagement and comment count, from which
+  the engagement patterns and the rollups are rebuilt
+
+Every post and comment contributes independently, so merging two states equals
+analysing both sets of posts together. A delta may contain stub posts with
+``comments_only`` set: their new comments are counted, the post itself is not.
+Score changes of already analysed posts are applied to the ledger with
+``PostLedger.update_engagement``; changed texts cannot be merged and need a
+full re-analysis.
+
+``AnalysisState`` bundles the partials of one analysis with the distinct-count
+sketches and produces the same result sections as the batch analyzers.
+``save_state`` and ``load_state`` keep it on disk together with the store
+version it was computed at.
+"""
+
+import os
+import json
+import logging
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+
+from src.data.post_store import to_epoch
+from src.analysis.text import extract_phrases, extract_locations, extract_context
+from src.analysis.sketches import HeavyHitters
+from src.analysis.distinct import DistinctCounter
+from src.analysis.rollups import build_rollups
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PARTIALS_DIRNAME = 'partials'
+
+INCIDENT_KEYWORDS = {
+    'accident': ['accident', 'crash', 'collision'],
+    'traffic_jam': ['jam', 'congestion', 'heavy traffic'],
+    'road_work': ['construction', 'roadwork', 'maintenance'],
+    'weather': ['rain', 'flood', 'weather'],
+    'violation': ['speeding', 'red light', 'illegal']
+}
+
+# Singapore locations and areas
+SG_LOCATIONS = {
+    'regions': ['north', 'south', 'east', 'west', 'central'],
+    'areas': [
+        'woodlands', 'tampines', 'jurong', 'changi', 'yishun',
+        'ang mo kio', 'bedok', 'clementi', 'punggol', 'sengkang'
+    ],
+    'roads': [
+        'pie', 'cte', 'sle', 'bke', 'tpe', 'ecp', 'aye', 'kje',
+        'orchard road', 'thomson road', 'bukit timah'
+    ]
+}
+
+
+def _time_key(timestamp: Any) -> float:
+    """Sort key for raw timestamps; unparseable ones sort first."""
+    epoch = to_epoch(timestamp)
+    return epoch if epoch is not None else float('-inf')
+
+
+def _polarity(text: str) -> float:
+    from textblob import TextBlob
+    return TextBlob(text).sentiment.polarity
+
+
+class SentimentPartial:
+    """Polarity class counts of posts and comments, and the polarity series of posts."""
+
+    def __init__(self):
+        self.counts = {'positive_count': 0, 'neutral_count': 0, 'negative_count': 0}
+        self.timestamps: List[Any] = []
+        self.sentiments: List[float] = []
+
+    def _count(self, sentiment: float):
+        # Categorize sentiment
+        if sentiment > 0.1:
+            self.counts['positive_count'] += 1
+        elif sentiment < -0.1:
+            self.counts['negative_count'] += 1
+        else:
+            self.counts['neutral_count'] += 1
+
+    def add_posts(self, posts_data: Iterable[Dict[str, Any]]) -> 'SentimentPartial':
+        """Analyze scrape-format posts and their comments."""
+        for post in posts_data:
+            if not post.get('comments_only'):
+                sentiment = _polarity(f"{post['title']} {post['text']}")
+                self._count(sentiment)
+                self.timestamps.append(post['created_utc'])
+                self.sentiments.append(sentiment)
+            for comment in post.get('comments', []):
+                self._count(_polarity(comment['text']))
+        return self
+
+    def merge(self, other: 'SentimentPartial') -> 'SentimentPartial':
+        """Combine with the state of other posts, keeping the series in time order."""
+        for key, value in other.counts.items():
+            self.counts[key] += value
+        series = sorted(zip(self.timestamps + other.timestamps, self.sentiments + other.sentiments),
+                        key=lambda entry: _time_key(entry[0]))
+        self.timestamps = [timestamp for timestamp, _ in series]
+        self.sentiments = [sentiment for _, sentiment in series]
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        """The ``sentiment_analysis`` section."""
+        return {
+            **self.counts,
+            'sentiment_over_time': {
+                'timestamps': list(self.timestamps),
+                'sentiments': list(self.sentiments)
+            }
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'counts': self.counts, 'timestamps': self.timestamps, 'sentiments': self.sentiments}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SentimentPartial':
+        partial = cls()
+        partial.counts = dict(data['counts'])
+        partial.timestamps = list(data['timestamps'])
+        partial.sentiments = list(data['sentiments'])
+        return partial
+
+
+class TrendPartial:
+    """Phrase counts of posts and comments."""
+
+    def __init__(self, phrase_sketch: Optional[HeavyHitters] = None):
+        """
+        Initialize empty phrase counts.
+
+        Args:
+            phrase_sketch: Count phrases in this bounded-memory sketch instead of a Counter
+        """
+        self.phrase_sketch = phrase_sketch
+        self.phrases = phrase_sketch if phrase_sketch is not None else Counter()
+
+    def _update(self, phrases: Dict[str, int]):
+        if self.phrase_sketch is not None:
+            self.phrase_sketch.update_counts(phrases)
+        else:
+            self.phrases.update(phrases)
+
+    def add_posts(self, posts_data: Iterable[Dict[str, Any]]) -> 'TrendPartial':
+        """Count the phrases of scrape-format posts and their comments."""
+        for post in posts_data:
+            # Get phrases from title and text
+            if not post.get('comments_only'):
+                self._update(extract_phrases(f"{post['title']} {post['text']}"))
+            for comment in post.get('comments', []):
+                self._update(extract_phrases(comment['text']))
+        return self
+
+    def merge(self, other: 'TrendPartial') -> 'TrendPartial':
+        """Combine with the phrase counts of other posts."""
+        if self.phrase_sketch is not None:
+            self.phrase_sketch.merge(other.phrase_sketch)
+        else:
+            self.phrases.update(other.phrases)
+        return self
+
+    def result(self, engagement_patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        The ``trend_analysis`` section.
+
+        Args:
+            engagement_patterns: Per-post engagement (see PostLedger.engagement_patterns)
+        """
+        trend_results = {
+            'common_phrases': dict(self.phrases.most_common(20)),
+            'trending_topics': Counter(),
+            'engagement_patterns': engagement_patterns
+        }
+        if self.phrase_sketch is not None:
+            trend_results['phrase_counting'] = 'sketch'
+        return trend_results
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.phrase_sketch is not None:
+            return {'sketch': self.phrase_sketch.to_dict()}
+        return {'phrases': dict(self.phrases)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TrendPartial':
+        if 'sketch' in data:
+            return cls(HeavyHitters.from_dict(data['sketch']))
+        partial = cls()
+        partial.phrases = Counter(data['phrases'])
+        return partial
+
+
+class IncidentPartial:
+    """Traffic incident counters of posts and comments and the times of post incidents."""
+
+    def __init__(self):
+        self.incident_types = Counter()
+        self.incident_locations = Counter()
+        self.incident_times: List[Dict[str, Any]] = []
+
+    def add_posts(self, posts_data: Iterable[Dict[str, Any]]) -> 'IncidentPartial':
+        """Detect incidents in scrape-format posts and their comments."""
+        for post in posts_data:
+            if not post.get('comments_only'):
+                text = f"{post['title']} {post['text']}".lower()
+
+                # Check for incidents
+                for incident_type, keywords in INCIDENT_KEYWORDS.items():
+                    if any(keyword in text for keyword in keywords):
+                        self.incident_types[incident_type] += 1
+
+                        # Extract location if available
+                        self.incident_locations.update(extract_locations(text))
+
+                        # Add timestamp
+                        self.incident_times.append({
+                            'type': incident_type,
+                            'timestamp': post['created_utc']
+                        })
+
+            # Check comments for additional incident reports
+            for comment in post.get('comments', []):
+                text = comment['text'].lower()
+                for incident_type, keywords in INCIDENT_KEYWORDS.items():
+                    if any(keyword in text for keyword in keywords):
+                        self.incident_types[incident_type] += 1
+                        self.incident_locations.update(extract_locations(text))
+        return self
+
+    def merge(self, other: 'IncidentPartial') -> 'IncidentPartial':
+        """Combine with the incidents of other posts, keeping the times in order."""
+        self.incident_types.update(other.incident_types)
+        self.incident_locations.update(other.incident_locations)
+        self.incident_times = sorted(self.incident_times + other.incident_times,
+                                     key=lambda entry: _time_key(entry['timestamp']))
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        """The ``traffic_analysis`` section."""
+        return {
+            'incident_types': Counter(self.incident_types),
+            'incident_locations': Counter(self.incident_locations),
+            'incident_times': list(self.incident_times)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'incident_types': dict(self.incident_types),
+            'incident_locations': dict(self.incident_locations),
+            'incident_times': self.incident_times
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IncidentPartial':
+        partial = cls()
+        partial.incident_types = Counter(data['incident_types'])
+        partial.incident_locations = Counter(data['incident_locations'])
+        partial.incident_times = list(data['incident_times'])
+        return partial
+
+
+class LocationPartial:
+    """Region, area and road mention counters and the context of post mentions."""
+
+    def __init__(self):
+        self.mentions = {'region_mentions': Counter(), 'area_mentions': Counter(), 'road_mentions': Counter()}
+        self.location_context: List[Dict[str, Any]] = []
+
+    def add_posts(self, posts_data: Iterable[Dict[str, Any]]) -> 'LocationPartial':
+        """Count location mentions in scrape-format posts and their comments."""
+        regions = self.mentions['region_mentions']
+        areas = self.mentions['area_mentions']
+        roads = self.mentions['road_mentions']
+
+        for post in posts_data:
+            if not post.get('comments_only'):
+                text = f"{post['title']} {post['text']}".lower()
+
+                for region in SG_LOCATIONS['regions']:
+                    if region in text:
+                        regions[region] += 1
+
+                for kind, counter in (('areas', areas), ('roads', roads)):
+                    for location in SG_LOCATIONS[kind]:
+                        if location in text:
+                            counter[location] += 1
+                            self.location_context.append({
+                                'location': location,
+                                'timestamp': post['created_utc'],
+                                'context': extract_context(text, location)
+                            })
+
+            # Process comments
+            for comment in post.get('comments', []):
+                text = comment['text'].lower()
+                for region in SG_LOCATIONS['regions']:
+                    if region in text:
+                        regions[region] += 1
+                for area in SG_LOCATIONS['areas']:
+                    if area in text:
+                        areas[area] += 1
+                for road in SG_LOCATIONS['roads']:
+                    if road in text:
+                        roads[road] += 1
+        return self
+
+    def merge(self, other: 'LocationPartial') -> 'LocationPartial':
+        """Combine with the mentions of other posts, keeping the contexts in order."""
+        for key, counter in other.mentions.items():
+            self.mentions[key].update(counter)
+        self.location_context = sorted(self.location_context + other.location_context,
+                                       key=lambda entry: _time_key(entry['timestamp']))
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        """The ``location_analysis`` section."""
+        return {
+            **{key: Counter(counter) for key, counter in self.mentions.items()},
+            'location_context': list(self.location_context)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'mentions': {key: dict(counter) for key, counter in self.mentions.items()},
+            'location_context': self.location_context
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LocationPartial':
+        partial = cls()
+        partial.mentions = {key: Counter(counter) for key, counter in data['mentions'].items()}
+        partial.location_context = list(data['location_context'])
+        return partial
+
+
+class PostLedger:
+    """Timestamp, score, comment count and comments seen of every analysed post, in time order."""
+
+    FIELDS = ('id', 'created_utc', 'score', 'num_comments', 'comments')
+
+    def __init__(self):
+        self.rows: List[List[Any]] = []
+        # Comments of posts outside this ledger (comments_only stubs of a delta)
+        self.extra_comments: Dict[str, int] = {}
+
+    def add_posts(self, posts_data: Iterable[Dict[str, Any]]) -> 'PostLedger':
+        """Record scrape-format posts."""
+        for post in posts_data:
+            comments = len(post.get('comments', []))
+            if post.get('comments_only'):
+                post_id = str(post['id'])
+                self.extra_comments[post_id] = self.extra_comments.get(post_id, 0) + comments
+            else:
+                self.rows.append([post.get('id'), post.get('created_utc'), post.get('score'),
+                                  post.get('num_comments'), comments])
+        return self
+
+    def update_engagement(self, posts: Iterable[Dict[str, Any]]):
+        """Apply new scores and comment counts of already recorded posts."""
+        updates = {str(post['id']): post for post in posts}
+        if not updates:
+            return
+        for row in self.rows:
+            post = updates.get(str(row[0]))
+            if post is not None:
+                row[2] = post.get('score')
+                row[3] = post.get('num_comments')
+
+    def merge(self, other: 'PostLedger') -> 'PostLedger':
+        """Append the posts of a delta and count its comments on recorded posts."""
+        if other.extra_comments:
+            for row in self.rows:
+                row[4] += other.extra_comments.get(str(row[0]), 0)
+        self.rows = sorted(self.rows + other.rows, key=lambda row: _time_key(row[1]))
+        return self
+
+    def engagement_patterns(self) -> List[Dict[str, Any]]:
+        """Per-post engagement, as in the ``trend_analysis`` section."""
+        return [{'timestamp': row[1], 'score': row[2], 'num_comments': row[3]} for row in self.rows]
+
+    def rollups(self, sentiments: Optional[List[float]] = None) -> Dict[str, Any]:
+        """
+        Time-bucketed rollups of the recorded posts.
+
+        Args:
+            sentiments: Polarity per post, aligned with the ledger (SentimentPartial.sentiments)
+        """
+        posts = ({'created_utc': row[1], 'score': row[2] or 0, 'num_comments': row[3] or 0,
+                  'comment_count': row[4]} for row in self.rows)
+        return build_rollups(posts, sentiments)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'fields': list(self.FIELDS), 'rows': self.rows, 'extra_comments': self.extra_comments}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PostLedger':
+        ledger = cls()
+        ledger.rows = [list(row) for row in data['rows']]
+        ledger.extra_comments = dict(data.get('extra_comments', {}))
+        return ledger
+
+
+# Analysis types with a mergeable partial; others ('topic') need every post
+PARTIALS = {
+    'sentiment': SentimentPartial,
+    'trend': TrendPartial,
+    'traffic': IncidentPartial,
+    'location': LocationPartial
+}
+
+SECTIONS = {
+    'sentiment': 'sentiment_analysis',
+    'trend': 'trend_analysis',
+    'traffic': 'traffic_analysis',
+    'location': 'location_analysis'
+}
+
+
+class AnalysisState:
+    """Partials of one analysis, the post ledger and the distinct-count sketches."""
+
+    def __init__(self, analysis_types: Iterable[str], phrase_counting: str = 'exact'):
+        """
+        Initialize empty partials.
+
+        Args:
+            analysis_types: Requested analysis types; those in PARTIALS get a partial
+            phrase_counting: 'exact' or 'sketch' phrase counting for trends
+        """
+        self.phrase_counting = phrase_counting
+        self.partials = {}
+        for analysis_type in analysis_types:
+            if analysis_type == 'trend':
+                self.partials['trend'] = TrendPartial(HeavyHitters() if phrase_counting == 'sketch' else None)
+            elif analysis_type in PARTIALS:
+                self.partials[analysis_type] = PARTIALS[analysis_type]()
+        self.ledger = PostLedger()
+        self.distinct = DistinctCounter()
+
+    def steps(self):
+        """
+        The (name, add_posts) pairs that fill this state, for timing each one.
+
+        The distinct-count sketches and the ledger are always filled, whatever
+        the analysis types: every analysis saves its rollups and distinct-count
+        sketches beside the result, and the trend section's engagement patterns
+        come from the ledger.
+
+        Returns:
+            List of (step name, callable taking posts_data)
+        """
+        steps = [(name, partial.add_posts) for name, partial in self.partials.items()]
+        steps.append(('distinct', self.distinct.add_posts))
+        steps.append(('ledger', self.ledger.add_posts))
+        return steps
+
+    def add_posts(self, posts_data: List[Dict[str, Any]]) -> 'AnalysisState':
+        """Analyze scrape-format posts (a list or Corpus.posts() view, since every partial reads it)."""
+        for _, add_posts in self.steps():
+            add_posts(posts_data)
+        return self
+
+    def merge(self, other: 'AnalysisState') -> 'AnalysisState':
+        """Combine with the state of a delta built with the same options."""
+        if set(other.partials) != set(self.partials) or other.phrase_counting != self.phrase_counting:
+            raise ValueError("Cannot merge analysis states built with different options")
+        for name, partial in self.partials.items():
+            partial.merge(other.partials[name])
+        self.distinct.merge(other.distinct)
+        self.ledger.merge(other.ledger)
+        return self
+
+    def sections(self) -> Dict[str, Any]:
+        """
+        Result sections of the analyses with a partial, plus ``distinct_counts``.
+
+        Returns:
+            Dictionary shaped like the batch analyzers' results
+        """
+        results = {}
+        for name, partial in self.partials.items():
+            if name == 'trend':
+                results[SECTIONS[name]] = partial.result(self.ledger.engagement_patterns())
+            else:
+                results[SECTIONS[name]] = partial.result()
+        results['distinct_counts'] = self.distinct.summary()
+        return results
+
+    def rollups(self) -> Dict[str, Any]:
+        """Time-bucketed rollups, with mean sentiment when sentiment was analysed."""
+        sentiment = self.partials.get('sentiment')
+        return self.ledger.rollups(sentiment.sentiments if sentiment is not None else None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise to a JSON compatible dictionary."""
+        return {
+            'type': 'analysis_state',
+            'phrase_counting': self.phrase_counting,
+            'partials': {name: partial.to_dict() for name, partial in self.partials.items()},
+            'ledger': self.ledger.to_dict(),
+            'distinct': self.distinct.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnalysisState':
+        """Rebuild a state serialised with to_dict."""
+        state = cls([], data['phrase_counting'])
+        state.partials = {name: PARTIALS[name].from_dict(partial) for name, partial in data['partials'].items()}
+        state.ledger = PostLedger.from_dict(data['ledger'])
+        state.distinct = DistinctCounter.from_dict(data['distinct'])
+        return state
+
+
+def save_state(path: str, state: AnalysisState, version: int):
+    """
+    Write an analysis state atomically.
+
+    Args:
+        path: State file
+        state: State to save
+        version: Store version the state was computed at
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'state': state.to_dict()}, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def load_state(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a state written by save_state.
+
+    Args:
+        path: State file
+
+    Returns:
+        Dictionary with the store ``version`` and the ``state``, or None if the
+        file is missing or unreadable
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {'version': int(data['version']), 'state': AnalysisState.from_dict(data['state'])}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable analysis state {path}: {str(e)}")
+        return None
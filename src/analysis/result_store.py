@@ -0,0 +1,267 @@
+"""
+Content-addressed index of saved analysis results.
+
+Every analysis run is keyed by a hash of what determines its output: a
+fingerprint of the input (the content hash of a scrape file, or the version
+of the post store), the analysis options and the versions of the analyzers
+that ran. An identical request finds the key and reuses the saved result
+instead of recomputing it::
+
+    store = ResultStore('data/store/results.db')
+    key = result_key(store.fingerprint(path), {'analysis_types': ['sentiment']})
+    path = store.lookup(key) or run_and_save()
+    store.record(key, path)
+
+Only results recorded here are ever deleted. ``collect_garbage`` removes,
+together with their sidecar files:
+
+- results superseded by a newer result for the same key (``refresh``)
+- results whose file disappeared (their rows only)
+- results not used for ``max_age`` seconds
+- the least recently used results while the total size exceeds ``max_bytes``
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from contextlib import closing
+from typing import Dict, Any, Callable, Iterable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULTS_FILENAME = 'results.db'
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', 1024 ** 3))
+RESULT_CACHE_MAX_AGE = float(os.getenv('RESULT_CACHE_MAX_AGE_DAYS', '30')) * 86400
+HASH_CHUNK_SIZE = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    analysis_path TEXT PRIMARY KEY,
+    cache_key TEXT NOT NULL,
+    params TEXT,
+    size INTEGER,
+    created REAL,
+    last_used REAL,
+    hits INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_results_key ON results (cache_key, created);
+CREATE INDEX IF NOT EXISTS idx_results_used ON results (last_used);
+
+CREATE TABLE IF NOT EXISTS fingerprints (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    digest TEXT
+);
+"""
+
+
+def result_key(fingerprint: str, params: Dict[str, Any]) -> str:
+    """
+    Build the cache key of an analysis.
+
+    Args:
+        fingerprint: Input fingerprint (see ResultStore.fingerprint)
+        params: Options and analyzer versions that affect the output; must be JSON serialisable
+
+    Returns:
+        Hex digest identifying the analysis
+    """
+    payload = json.dumps({'input': fingerprint, 'params': params}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class ResultStore:
+    """SQLite index mapping analysis keys to saved result files."""
+
+    def __init__(self, db_path: str, companions: Iterable[Callable[[str], str]] = (),
+                 max_bytes: int = RESULT_CACHE_MAX_BYTES, max_age: float = RESULT_CACHE_MAX_AGE):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to the SQLite database (created on first use)
+            companions: Functions mapping a result path to one of its sidecar
+                files (rollups, sketches, metrics); deleted together with it
+            max_bytes: Size budget of all results, sidecars included
+            max_age: Seconds after which an unused result is deleted
+        """
+        self.db_path = db_path
+        self.companions = list(companions)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per call keeps the store safe across threads and processes."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def fingerprint(self, file_path: str) -> str:
+        """
+        Content hash of an input file.
+
+        The digest is remembered per (path, size, mtime), so unchanged files
+        are hashed once.
+
+        Args:
+            file_path: File to fingerprint
+
+        Returns:
+            Fingerprint string
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT size, mtime_ns, digest FROM fingerprints WHERE path = ?",
+                               (path,)).fetchone()
+            if row and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns:
+                return f"file:{row['digest']}"
+
+            digest = hashlib.blake2b(digest_size=20)
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            digest = digest.hexdigest()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, digest) "
+                             "VALUES (?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, digest))
+        return f"file:{digest}"
+
+    def _sidecars(self, analysis_path: str):
+        return [companion(analysis_path) for companion in self.companions]
+
+    def _result_size(self, analysis_path: str) -> int:
+        return _file_size(analysis_path) + sum(_file_size(path) for path in self._sidecars(analysis_path))
+
+    def lookup(self, cache_key: str) -> Optional[str]:
+        """
+        Find the saved result of an analysis.
+
+        Args:
+            cache_key: Result of result_key
+
+        Returns:
+            Path of the newest result for the key, or None if there is none on disk
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT analysis_path FROM results WHERE cache_key = ? "
+                                "ORDER BY created DESC", (cache_key,)).fetchall()
+            for row in rows:
+                if os.path.exists(row['analysis_path']):
+                    with conn:
+                        conn.execute("UPDATE results SET last_used = ?, hits = hits + 1 "
+                                     "WHERE analysis_path = ?", (time.time(), row['analysis_path']))
+                    return row['analysis_path']
+        return None
+
+    def record(self, cache_key: str, analysis_path: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Register a saved result and enforce the budgets.
+
+        Args:
+            cache_key: Result of result_key
+            analysis_path: Saved result file (its sidecars should already be written)
+            params: Options recorded for inspection
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO results "
+                         "(analysis_path, cache_key, params, size, created, last_used, hits) "
+                         "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                         (os.path.abspath(analysis_path), cache_key, json.dumps(params or {}, default=str),
+                          self._result_size(analysis_path), now, now))
+        self.collect_garbage()
+
+    def _delete(self, conn: sqlite3.Connection, analysis_path: str) -> int:
+        """Delete a result, its sidecars and its row; returns the bytes freed."""
+        freed = 0
+        for path in [analysis_path] + self._sidecars(analysis_path):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                freed += size
+            except FileNotFoundError:
+                continue
+        conn.execute("DELETE FROM results WHERE analysis_path = ?", (analysis_path,))
+        return freed
+
+    def collect_garbage(self, max_bytes: Optional[int] = None, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Delete superseded, expired and least recently used results.
+
+        Args:
+            max_bytes: Size budget (defaults to the store's)
+            max_age: Age budget in seconds since last use (defaults to the store's)
+
+        Returns:
+            Dictionary with the number of results removed, bytes freed and what is left
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age = self.max_age if max_age is None else max_age
+        removed = freed = 0
+
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute("SELECT analysis_path, cache_key, size, last_used FROM results "
+                                "ORDER BY created DESC").fetchall()
+            newest_per_key = set()
+            kept = []
+            cutoff = time.time() - max_age
+            for row in rows:
+                path = row['analysis_path']
+                if not os.path.exists(path):
+                    conn.execute("DELETE FROM results WHERE analysis_path = ?", (path,))
+                    continue
+                superseded = row['cache_key'] in newest_per_key
+                newest_per_key.add(row['cache_key'])
+                if superseded or row['last_used'] < cutoff:
+                    freed += self._delete(conn, path)
+                    removed += 1
+                else:
+                    kept.append(row)
+
+            total = sum(row['size'] or 0 for row in kept)
+            for row in sorted(kept, key=lambda row: row['last_used']):
+                if total <= max_bytes:
+                    break
+                total -= row['size'] or 0
+                freed += self._delete(conn, row['analysis_path'])
+                removed += 1
+                kept.remove(row)
+
+        if removed:
+            logger.info(f"Result store removed {removed} results ({freed} bytes)")
+        return {'removed': removed, 'bytes_freed': freed, 'results': len(kept), 'bytes': max(total, 0)}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarise the store.
+
+        Returns:
+            Dictionary with the number of results, their size, hits and the budgets
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT COUNT(*) AS results, COALESCE(SUM(size), 0) AS bytes, "
+                               "COALESCE(SUM(hits), 0) AS hits FROM results").fetchone()
+        return {
+            'results': row['results'],
+            'bytes': row['bytes'],
+            'hits': row['hits'],
+            'max_bytes': self.max_bytes,
+            'max_age_seconds': self.max_age
+        }
@@ -0,0 +1,234 @@
+"""
+Time-bucketed rollups of analysed posts.
+
+Analysis files keep one entry per post in ``sentiment_over_time`` and
+``engagement_patterns``, which makes visualization payloads grow with the
+corpus. Rollups summarise the same posts into hourly, daily and weekly buckets
+(post counts, mean sentiment and engagement percentiles) and are written next to
+the analysis file so the visualization endpoint can serve a few kilobytes
+instead of the raw arrays.
+"""
+
+import os
+import json
+import math
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+from src.data.post_store import to_epoch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIRNAME = 'rollups'
+
+# Bucket widths in seconds
+GRANULARITIES = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 604800
+}
+
+# Weekly buckets start on Monday; 1970-01-05 was the first Monday after the epoch
+WEEK_OFFSET = 4 * 86400
+
+# Which rollup to serve for each timeframe offered by the visualizations page
+TIMEFRAMES = {
+    '24h': ('hourly', 86400),
+    '7d': ('hourly', 7 * 86400),
+    '30d': ('daily', 30 * 86400),
+    '90d': ('daily', 90 * 86400),
+    '1y': ('weekly', 365 * 86400),
+    'all': ('weekly', None)
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def bucket_start(timestamp: float, granularity: str) -> int:
+    """Get the start of the bucket containing an epoch timestamp."""
+    width = GRANULARITIES[granularity]
+    offset = WEEK_OFFSET if granularity == 'weekly' else 0
+    return int((timestamp - offset) // width * width + offset)
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summarise(values: List[float]) -> Dict[str, Optional[float]]:
+    """Mean and percentiles of a list of engagement values."""
+    values = sorted(values)
+    summary = {'mean': sum(values) / len(values) if values else None}
+    for q in PERCENTILES:
+        summary[f'p{q}'] = percentile(values, q)
+    return summary
+
+
+def build_rollups(posts_data: Iterable[Dict[str, Any]],
+                  sentiments: Optional[List[float]] = None) -> Dict[str, Any]:
+    """
+    Summarise posts into hourly, daily and weekly buckets.
+
+    Args:
+        posts_data: Posts in scrape format (``created_utc``, ``score``, ``num_comments``);
+            ``comment_count`` may replace the ``comments`` list
+        sentiments: Optional polarity per post, aligned with ``posts_data``
+
+    Returns:
+        Dictionary with one sorted bucket list per granularity
+    """
+    buckets = {granularity: {} for granularity in GRANULARITIES}
+    first = last = None
+
+    for index, post in enumerate(posts_data):
+        timestamp = to_epoch(post.get('created_utc'))
+        if timestamp is None:
+            continue
+        first = timestamp if first is None else min(first, timestamp)
+        last = timestamp if last is None else max(last, timestamp)
+        sentiment = sentiments[index] if sentiments is not None and index < len(sentiments) else None
+
+        for granularity in GRANULARITIES:
+            start = bucket_start(timestamp, granularity)
+            bucket = buckets[granularity].setdefault(start, {
+                'posts': 0,
+                'comments': 0,
+                'sentiment_total': 0.0,
+                'sentiment_count': 0,
+                'scores': [],
+                'num_comments': []
+            })
+            bucket['posts'] += 1
+            bucket['comments'] += (post['comment_count'] if 'comment_count' in post
+                                   else len(post.get('comments', [])))
+            bucket['scores'].append(post.get('score', 0) or 0)
+            bucket['num_comments'].append(post.get('num_comments', 0) or 0)
+            if sentiment is not None:
+                bucket['sentiment_total'] += sentiment
+                bucket['sentiment_count'] += 1
+
+    rollups = {
+        'first_timestamp': first,
+        'last_timestamp': last,
+        'granularities': {}
+    }
+    for granularity, granularity_buckets in buckets.items():
+        rollups['granularities'][granularity] = [
+            {
+                'start': start,
+                'label': datetime.fromtimestamp(start, tz=timezone.utc).strftime(
+                    '%Y-%m-%d %H:00' if granularity == 'hourly' else '%Y-%m-%d'),
+                'posts': bucket['posts'],
+                'comments': bucket['comments'],
+                'mean_sentiment': (bucket['sentiment_total'] / bucket['sentiment_count']
+                                   if bucket['sentiment_count'] else None),
+                'score': _summarise(bucket['scores']),
+                'num_comments': _summarise(bucket['num_comments'])
+            }
+            for start, bucket in sorted(granularity_buckets.items())
+        ]
+    return rollups
+
+
+def rollup_path_for(analysis_path: str) -> str:
+    """Get the rollup file that belongs to an analysis file (JSON or sections)."""
+    directory, filename = os.path.split(analysis_path)
+    return os.path.join(directory, ROLLUP_DIRNAME, os.path.splitext(filename)[0] + '.json')
+
+
+def save_rollups(analysis_path: str, rollups: Dict[str, Any]) -> str:
+    """
+    Write rollups next to their analysis file.
+
+    Args:
+        analysis_path: Path of the analysis file
+        rollups: Output of build_rollups
+
+    Returns:
+        Path to the rollup file
+    """
+    rollup_path = rollup_path_for(analysis_path)
+    os.makedirs(os.path.dirname(rollup_path), exist_ok=True)
+    with open(rollup_path, 'w', encoding='utf-8') as f:
+        json.dump(rollups, f, separators=(',', ':'))
+    logger.info(f"Rollups saved to: {rollup_path}")
+    return rollup_path
+
+
+def select_rollup(rollups: Dict[str, Any], timeframe: str = '30d') -> Dict[str, Any]:
+    """
+    Pick the rollup granularity and window matching a requested timeframe.
+
+    The window is anchored at the newest bucket rather than the current time,
+    so older datasets still show their most recent activity.
+
+    Args:
+        rollups: Output of build_rollups
+        timeframe: One of the TIMEFRAMES keys; unknown values fall back to '30d'
+
+    Returns:
+        Dictionary with the granularity, timeframe and buckets to chart
+    """
+    granularity, window = TIMEFRAMES.get(timeframe, TIMEFRAMES['30d'])
+    buckets = rollups['granularities'].get(granularity, [])
+    if window is not None and rollups.get('last_timestamp') is not None:
+        cutoff = rollups['last_timestamp'] - window
+        buckets = [bucket for bucket in buckets
+                   if bucket['start'] + GRANULARITIES[granularity] > cutoff]
+    return {
+        'granularity': granularity,
+        'timeframe': timeframe if timeframe in TIMEFRAMES else '30d',
+        'buckets': buckets
+    }
+
+
+def load_rollup(analysis_path: str, timeframe: str = '30d',
+                loader: Optional[Callable[[str], Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load the rollup for an analysis file, if one was written.
+
+    Args:
+        analysis_path: Path of the analysis JSON file
+        timeframe: Requested timeframe
+        loader: Function used to read the rollup file, e.g. a cache lookup
+
+    Returns:
+        Selected rollup (see select_rollup) or None
+    """
+    rollup_path = rollup_path_for(analysis_path)
+    if not os.path.exists(rollup_path):
+        return None
+    if loader is not None:
+        return select_rollup(loader(rollup_path), timeframe)
+    with open(rollup_path, 'r', encoding='utf-8') as f:
+        return select_rollup(json.load(f), timeframe)
+
+
+def strip_raw_series(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop the per-post arrays that rollups replace.
+
+    Args:
+        analysis_data: Parsed analysis file (not modified)
+
+    Returns:
+        Shallow copy without ``sentiment_over_time`` and ``engagement_patterns``
+    """
+    stripped = {}
+    for key, value in analysis_data.items():
+        if isinstance(value, dict):
+            value = {k: v for k, v in value.items()
+                     if k not in ('sentiment_over_time', 'engagement_patterns')}
+        stripped[key] = value
+    return stripped
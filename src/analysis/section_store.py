@@ -0,0 +1,171 @@
+"""
+Sectioned analysis result container with lazy section loading.
+
+Analysis results are monolithic JSON documents, so showing one chart parses
+every section. A sections file stores each section (``sentiment_analysis``,
+``trend_analysis``, ``location_analysis``, ...) as its own compact JSON blob
+behind an offset table::
+
+    b'ANSC' | version (u16) | header length (u32) | header JSON | section blobs
+
+The header holds the file metadata and ``{name: [offset, length]}`` for every
+section. Readers parse the header, memory-map the file and decode only the
+sections they are asked for.
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import logging
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SECTIONS_SUFFIX = '.sections'
+MAGIC = b'ANSC'
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<4sHI')
+
+
+def is_sections_path(file_path: str) -> bool:
+    """Check whether a path points at a sections file."""
+    return file_path.endswith(SECTIONS_SUFFIX)
+
+
+def split_analysis(analysis_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Split an analysis document into sections and metadata.
+
+    Documents with a ``results`` object (as saved by AnalysisService) use its
+    entries as sections and keep the remaining keys as metadata. Flat documents
+    (as saved by the analyze endpoint) use every top-level key as a section.
+
+    Args:
+        analysis_data: Parsed analysis document
+
+    Returns:
+        Tuple of (sections, metadata)
+    """
+    if isinstance(analysis_data.get('results'), dict):
+        metadata = {key: value for key, value in analysis_data.items() if key != 'results'}
+        return analysis_data['results'], metadata
+    return analysis_data, {}
+
+
+def write_sections(file_path: str, sections: Dict[str, Any],
+                   metadata: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Write sections to a sections file atomically.
+
+    Args:
+        file_path: Destination path (conventionally ending in ``.sections``)
+        sections: Mapping of section name to JSON serialisable data
+        metadata: Small JSON serialisable document stored in the header
+
+    Returns:
+        Path to the written file
+    """
+    blobs = {name: json.dumps(data, separators=(',', ':')).encode('utf-8')
+             for name, data in sections.items()}
+
+    # Offsets are relative to the end of the header so the header can be sized first
+    table = {}
+    position = 0
+    for name, blob in blobs.items():
+        table[name] = [position, len(blob)]
+        position += len(blob)
+    header = json.dumps({'metadata': metadata or {}, 'sections': table},
+                        separators=(',', ':')).encode('utf-8')
+
+    tmp_path = file_path + '.part'
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for blob in blobs.values():
+            f.write(blob)
+    os.replace(tmp_path, file_path)
+
+    logger.info(f"Wrote {len(blobs)} sections to {file_path}")
+    return file_path
+
+
+def read_index(file_path: str) -> Dict[str, Any]:
+    """
+    Read the header of a sections file without touching the section data.
+
+    Args:
+        file_path: Path to the sections file
+
+    Returns:
+        Dictionary with ``metadata``, ``sections`` ({name: [offset, length]})
+        and ``data_offset`` (absolute start of the first section)
+    """
+    with open(file_path, 'rb') as f:
+        magic, version, header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a sections file: {file_path}")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported sections format version {version} in {file_path}")
+        index = json.loads(f.read(header_length))
+    index['data_offset'] = PREAMBLE.size + header_length
+    return index
+
+
+def read_sections(file_path: str, names: Optional[Iterable[str]] = None,
+                  index: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Decode selected sections through a read-only memory map.
+
+    Args:
+        file_path: Path to the sections file
+        names: Sections to read (all sections if None); unknown names are ignored
+        index: Header from read_index, to avoid re-reading it
+
+    Returns:
+        Mapping of section name to decoded data
+    """
+    index = index or read_index(file_path)
+    table = index['sections']
+    names = list(table) if names is None else [name for name in names if name in table]
+    if not names:
+        return {}
+
+    base = index['data_offset']
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        result = {}
+        for name in names:
+            offset, length = table[name]
+            result[name] = json.loads(mm[base + offset:base + offset + length])
+        return result
+
+
+def read_section(file_path: str, name: str, index: Optional[Dict[str, Any]] = None) -> Any:
+    """Decode a single section (None if the file has no such section)."""
+    return read_sections(file_path, [name], index).get(name)
+
+
+def convert_json(json_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Convert a JSON analysis file into a sections file.
+
+    Args:
+        json_path: Path to the analysis JSON file
+        output_path: Destination (defaults to the same name with a ``.sections`` suffix)
+
+    Returns:
+        Path to the sections file
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        sections, metadata = split_analysis(json.load(f))
+    output_path = output_path or os.path.splitext(json_path)[0] + SECTIONS_SUFFIX
+    return write_sections(output_path, sections, metadata)
+
+
+if __name__ == "__main__":
+    # Convert existing analysis files: python -m src.analysis.section_store data/analysis/*.json
+    for path in sys.argv[1:]:
+        print(convert_json(path))
@@ -0,0 +1,519 @@
+"""
+Streaming trend detection over JSONL scrape files.
+
+Batch trend analysis only sees a scrape after someone re-runs it. The streaming
+detector instead tails the JSONL files in a scrape directory (including
+``.part`` files still being written) and feeds every new post and comment into
+event-time sliding windows:
+
+- a short window (``window_size``, e.g. 1h) and a long window
+  (``baseline_window``, e.g. 24h) of bigram and location counts, kept as a ring
+  of fixed-width slots so memory is bounded by the number of slots and the
+  per-slot term cap
+- a per-term baseline of the per-slot count, an exponentially decayed mean and
+  variance whose half-life is the long window. Baselines start at zero when
+  the stream starts, so they are bias-corrected for the slots seen so far;
+  otherwise every steady term would look like a burst for the first day
+
+Whenever a slot closes, each term counted in that slot is tested: if its
+short-window count exceeds the baseline scaled to the short window by
+``z_threshold`` standard deviations (with a Poisson floor on the variance), it
+is flagged as a burst. Work per slot is proportional to the terms in the slot,
+not to the number of tracked terms.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import logging
+import threading
+from collections import Counter, deque
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from src.data.jsonl_io import JSONL_SUFFIX, PART_SUFFIX, is_jsonl_path, iter_jsonl
+from src.data.post_store import to_epoch
+from src.analysis.text import extract_phrases, extract_locations
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'window_size': '1h',
+    'baseline_window': '24h',
+    'slots_per_window': 12,
+    'z_threshold': 3.0,
+    'min_count': 3,
+    'max_terms': 5000,
+    'max_slot_terms': 2000,
+    'max_bursts': 100
+}
+
+# Bigrams made only of these words carry no topic
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have',
+    'i', 'if', 'in', 'is', 'it', 'its', 'me', 'my', 'no', 'not', 'of', 'on', 'or', 'so',
+    'that', 'the', 'there', 'they', 'this', 'to', 'was', 'we', 'were', 'what', 'when',
+    'with', 'you', 'your', 'he', 'she', 'his', 'her', 'will', 'can', 'just', 'do', 'don',
+    'doesn', 'didn', 'isn', 'won', 'should', 'would', 'all', 'also', 'about',
+    # Contraction fragments left by the tokenizer ("it's" -> "it s")
+    's', 't', 'm', 're', 've', 'll', 'd'
+}
+
+
+def parse_window(value: Any) -> int:
+    """
+    Parse a window length such as '30m', '1h', '7d' or a number of seconds.
+
+    Returns:
+        Window length in seconds
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*(\d+)\s*([smhdw]?)\s*', str(value).lower())
+    if not match:
+        raise ValueError(f"Invalid window size: {value}")
+    unit_seconds = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    return int(match.group(1)) * unit_seconds[match.group(2)]
+
+
+def extract_terms(text: str) -> List[Tuple[str, str]]:
+    """
+    Get the distinct (kind, term) pairs of a text.
+
+    Each term is counted once per post or comment, so one long rant cannot
+    create a burst on its own.
+    """
+    terms = {('location', location) for location in extract_locations(text)}
+    for phrase in extract_phrases(text):
+        if not set(phrase.split()) <= STOPWORDS:
+            terms.add(('ngram', phrase))
+    return list(terms)
+
+
+class TrendDetector:
+    """Event-time sliding-window term counts with z-score burst detection."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the detector.
+
+        Args:
+            config: Overrides for DEFAULT_CONFIG
+        """
+        self.config = dict(DEFAULT_CONFIG, **(config or {}))
+        self.window = parse_window(self.config['window_size'])
+        self.baseline_window = max(parse_window(self.config['baseline_window']), self.window)
+        self.slot_width = max(1, self.window // int(self.config['slots_per_window']))
+        self.short_slots = max(1, self.window // self.slot_width)
+        self.long_slots = max(self.short_slots, self.baseline_window // self.slot_width)
+
+        # Decay per slot so a baseline observation loses half its weight after one long window
+        self.alpha = 1 - 0.5 ** (1 / self.long_slots)
+
+        self.slots = {}             # slot index -> Counter of terms
+        self.short_counts = Counter()
+        self.long_counts = Counter()
+        self.baseline = {}          # term -> [mean, variance, slot of the last observation]
+        self.current_slot = None
+        self.first_slot = None
+        self.closed_slots = 0
+        self.seen = {}              # event id -> timestamp, for deduplicating re-scraped items
+        self.bursts = deque(maxlen=int(self.config['max_bursts']))
+        self._last_flagged = {}     # term -> slot of its latest burst
+        self.events = 0
+        self.late_events = 0
+
+    @property
+    def watermark(self) -> Optional[float]:
+        """End of the newest slot seen, in epoch seconds."""
+        return None if self.current_slot is None else (self.current_slot + 1) * self.slot_width
+
+    def process_posts(self, posts: Iterable[Dict[str, Any]]) -> int:
+        """
+        Feed scrape-format posts (with comments) into the windows.
+
+        Posts and comments become separate events at their own creation time.
+        Items already seen are skipped, so overlapping scrapes only add new
+        posts and new comments. Each batch is processed in time order.
+
+        Args:
+            posts: Posts in scrape format
+
+        Returns:
+            Number of new events processed
+        """
+        events = []
+        for post in posts:
+            events.append((f"p:{post.get('id')}", to_epoch(post.get('created_utc')),
+                           f"{post.get('title', '')} {post.get('text', '')}"))
+            for comment in post.get('comments', []):
+                events.append((f"c:{comment.get('id')}", to_epoch(comment.get('created_utc')),
+                               comment.get('text', '')))
+
+        new_events = [event for event in events if event[1] is not None and event[0] not in self.seen]
+        new_events.sort(key=lambda event: event[1])
+        for event_id, timestamp, text in new_events:
+            self.seen[event_id] = timestamp
+            self.add_event(timestamp, extract_terms(text or ''))
+        return len(new_events)
+
+    def add_event(self, timestamp: float, terms: Iterable[Tuple[str, str]]):
+        """
+        Count the terms of one event at its event time.
+
+        Args:
+            timestamp: Event time in epoch seconds
+            terms: (kind, term) pairs of the event
+        """
+        slot = int(timestamp // self.slot_width)
+        if self.current_slot is None:
+            self.current_slot = self.first_slot = slot
+        elif slot > self.current_slot:
+            self._advance(slot)
+        elif slot <= self.current_slot - self.long_slots:
+            self.late_events += 1
+            return
+
+        self.events += 1
+        counts = self.slots.setdefault(slot, Counter())
+        in_short = slot > self.current_slot - self.short_slots
+        for term in terms:
+            counts[term] += 1
+            self.long_counts[term] += 1
+            if in_short:
+                self.short_counts[term] += 1
+
+    def _advance(self, new_slot: int):
+        """Close every slot up to ``new_slot`` and slide the windows."""
+        if new_slot - self.current_slot > self.long_slots:
+            # Gap longer than the long window: only the baselines carry over
+            self._close_slot()
+            self.slots.clear()
+            self.short_counts.clear()
+            self.long_counts.clear()
+            self.current_slot = new_slot
+            return
+
+        while self.current_slot < new_slot:
+            self._close_slot()
+            self.current_slot += 1
+            self._expire(self.current_slot - self.short_slots, self.short_counts)
+            self._expire(self.current_slot - self.long_slots, self.long_counts, drop=True)
+
+    def _expire(self, slot: int, counts: Counter, drop: bool = False):
+        """Subtract a slot that left a window from that window's counts."""
+        slot_counts = self.slots.pop(slot, None) if drop else self.slots.get(slot)
+        if not slot_counts:
+            return
+        counts.subtract(slot_counts)
+        for term in slot_counts:
+            if counts[term] <= 0:
+                del counts[term]
+
+    def _close_slot(self):
+        """Cap the closing slot, test every term for a burst and update the baselines."""
+        slot = self.current_slot
+        counts = self.slots.get(slot)
+        max_slot_terms = int(self.config['max_slot_terms'])
+        if counts and len(counts) > max_slot_terms:
+            dropped = Counter(dict(counts.most_common()[max_slot_terms:]))
+            for term in dropped:
+                del counts[term]
+            for window_counts in (self.short_counts, self.long_counts):
+                window_counts.subtract(dropped)
+                for term in dropped:
+                    if window_counts[term] <= 0:
+                        del window_counts[term]
+
+        warmed_up = self.closed_slots >= self.short_slots
+        threshold = float(self.config['z_threshold'])
+        min_count = int(self.config['min_count'])
+        window_end = (slot + 1) * self.slot_width
+        # Share of a baseline's weight that comes from slots since the stream started
+        correction = 1 - (1 - self.alpha) ** max(slot - self.first_slot, 1)
+
+        # Only terms counted in the closing slot are touched; slots where a term
+        # was absent are folded into its baseline lazily as zero observations
+        for term, observed in (counts or {}).items():
+            mean, variance, updated = self.baseline.get(term, (0.0, 0.0, slot - 1))
+            mean, variance = self._decay(mean, variance, slot - updated - 1)
+
+            window_count = self.short_counts.get(term, 0)
+            if warmed_up and window_count >= min_count:
+                # Per-slot baseline scaled to the short window, with a Poisson floor
+                expected = mean / correction * self.short_slots
+                z = (window_count - expected) / math.sqrt(variance / correction * self.short_slots +
+                                                          max(expected, 1.0))
+                if z >= threshold:
+                    self._flag(term, window_count, expected, z, slot, window_end)
+
+            # Exponentially decayed mean and variance of the per-slot count
+            delta = observed - mean
+            mean += self.alpha * delta
+            variance = (1 - self.alpha) * (variance + self.alpha * delta * delta)
+            self.baseline[term] = [mean, variance, slot]
+
+        max_terms = int(self.config['max_terms'])
+        if len(self.baseline) > max_terms * 2:
+            # Keep the terms with the highest current expected count (pruning in
+            # batches keeps the sort off the per-slot path)
+            ranked = sorted(self.baseline.items(),
+                            key=lambda item: item[1][0] * (1 - self.alpha) ** (slot - item[1][2]),
+                            reverse=True)
+            self.baseline = dict(ranked[:max_terms])
+
+        # Forget event ids that can no longer fall inside the long window
+        cutoff = window_end - self.baseline_window
+        if len(self.seen) > 0 and self.closed_slots % self.short_slots == 0:
+            self.seen = {event_id: ts for event_id, ts in self.seen.items() if ts >= cutoff}
+
+        self.closed_slots += 1
+
+    def _decay(self, mean: float, variance: float, slots: int) -> Tuple[float, float]:
+        """Apply ``slots`` zero observations to a baseline in closed form."""
+        if slots <= 0:
+            return mean, variance
+        retained = (1 - self.alpha) ** slots
+        return retained * mean, retained * (variance + mean * mean * (1 - retained))
+
+    def _flag(self, term: Tuple[str, str], observed: int, expected: float, z: float,
+              slot: int, window_end: int):
+        """Record a burst, merging repeated flags of the same term within one short window."""
+        kind, text = term
+        burst = {
+            'kind': kind,
+            'term': text,
+            'count': observed,
+            'expected': round(expected, 2),
+            'z_score': round(z, 2),
+            'window_end': window_end,
+            'detected_at': time.time()
+        }
+        last = self._last_flagged.get(term)
+        if last is not None and slot - last < self.short_slots:
+            for existing in reversed(self.bursts):
+                if existing['kind'] == kind and existing['term'] == text:
+                    if z > existing['z_score']:
+                        existing.update(burst)
+                    break
+            else:
+                self.bursts.append(burst)
+        else:
+            self.bursts.append(burst)
+            logger.debug(f"Burst detected: {kind} '{text}' ({observed} vs {expected:.1f} expected, z={z:.1f})")
+        self._last_flagged[term] = slot
+        if len(self._last_flagged) > len(self.baseline) + len(self.bursts):
+            self._last_flagged = {t: s for t, s in self._last_flagged.items() if slot - s < self.short_slots}
+
+    def snapshot(self, top_n: int = 10) -> Dict[str, Any]:
+        """
+        Summarise the current windows.
+
+        Args:
+            top_n: Number of terms to report per kind and window
+
+        Returns:
+            Dictionary with window sizes, the watermark, top terms and recent bursts
+        """
+        def top(counts: Counter, kind: str) -> List[Dict[str, Any]]:
+            ranked = [(term, count) for (term_kind, term), count in counts.most_common() if term_kind == kind]
+            return [{'term': term, 'count': count} for term, count in ranked[:top_n]]
+
+        return {
+            'window_size': self.window,
+            'baseline_window': self.baseline_window,
+            'watermark': self.watermark,
+            'events': self.events,
+            'late_events': self.late_events,
+            'tracked_terms': len(self.baseline),
+            'top_terms': {
+                'short_window': {'ngram': top(self.short_counts, 'ngram'),
+                                 'location': top(self.short_counts, 'location')},
+                'long_window': {'ngram': top(self.long_counts, 'ngram'),
+                                'location': top(self.long_counts, 'location')}
+            },
+            'bursts': sorted(self.bursts, key=lambda burst: burst['z_score'], reverse=True)
+        }
+
+
+class JsonlTailer:
+    """Reads records appended to the JSONL files of a directory since the last poll."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize the tailer.
+
+        Args:
+            directory: Directory containing JSONL scrape files
+        """
+        self.directory = directory
+        # Keyed by (device, inode) so a finished ``.part`` file renamed into place is not re-read
+        self._offsets = {}
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Read every complete new line.
+
+        Plain JSONL files (finished or ``.part``) are tailed from the last
+        offset; a trailing line without a newline is left for the next poll.
+        Compressed files cannot be tailed and are read once when complete.
+
+        Returns:
+            New records, oldest file first
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        records = []
+        live_keys = set()
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.is_file()),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            name = entry.name
+            base = name[:-len(PART_SUFFIX)] if name.endswith(PART_SUFFIX) else name
+            if not is_jsonl_path(base):
+                continue
+
+            stats = entry.stat()
+            key = (stats.st_dev, stats.st_ino)
+            live_keys.add(key)
+
+            if not base.endswith(JSONL_SUFFIX):
+                if name.endswith(PART_SUFFIX) or key in self._offsets:
+                    continue
+                records.extend(iter_jsonl(entry.path))
+                self._offsets[key] = stats.st_size
+                continue
+
+            offset = self._offsets.get(key, 0)
+            if stats.st_size < offset:
+                offset = 0  # truncated or replaced
+            if stats.st_size == offset:
+                continue
+
+            with open(entry.path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    offset += len(line)
+                    if line.strip():
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            logger.warning(f"Skipping malformed line in {entry.path}")
+            self._offsets[key] = offset
+
+        # Forget deleted files
+        for key in set(self._offsets) - live_keys:
+            del self._offsets[key]
+        return records
+
+
+class TrendMonitor:
+    """Tails a scrape directory into a TrendDetector, on demand or from a background thread."""
+
+    def __init__(self, directory: str, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the monitor.
+
+        Args:
+            directory: Directory containing JSONL scrape files
+            config: TrendDetector configuration overrides
+        """
+        self.directory = directory
+        self.tailer = JsonlTailer(directory)
+        self.detector = TrendDetector(config)
+        self.records_processed = 0
+        self.last_poll = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self) -> int:
+        """
+        Process records written since the last poll.
+
+        Returns:
+            Number of new posts and comments processed
+        """
+        with self._lock:
+            records = self.tailer.poll()
+            events = self.detector.process_posts(records)
+            self.records_processed += len(records)
+            self.last_poll = time.time()
+        if events:
+            logger.info(f"Processed {events} new posts and comments from {self.directory}")
+        return events
+
+    def start(self, interval: float = 30.0):
+        """Poll every ``interval`` seconds from a daemon thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Streaming poll failed for {self.directory}: {str(e)}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name=f"trend-monitor:{self.directory}", daemon=True)
+        self._thread.start()
+        logger.info(f"Streaming trend monitor started for {self.directory}")
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is polling."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self, top_n: int = 10) -> Dict[str, Any]:
+        """Current windows and bursts plus monitor status."""
+        with self._lock:
+            snapshot = self.detector.snapshot(top_n)
+        snapshot.update({
+            'directory': self.directory,
+            'records_processed': self.records_processed,
+            'last_poll': self.last_poll,
+            'running': self.running
+        })
+        return snapshot
+
+
+# One monitor per directory, shared by every request in the process
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_monitor(directory: str, config: Optional[Dict[str, Any]] = None) -> TrendMonitor:
+    """
+    Get the shared monitor of a directory, creating it on first use.
+
+    The configuration only applies when the monitor is created.
+    """
+    directory = os.path.abspath(directory)
+    with _monitors_lock:
+        monitor = _monitors.get(directory)
+        if monitor is None:
+            monitor = _monitors[directory] = TrendMonitor(directory, config)
+        return monitor
+
+
+def stop_monitors():
+    """Stop every background monitor."""
+    with _monitors_lock:
+        monitors = list(_monitors.values())
+    for monitor in monitors:
+        monitor.stop()
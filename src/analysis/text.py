@@ -0,0 +1,57 @@
+"""
+Text helpers shared by the analyzers.
+
+Phrase and location extraction used by the batch analyzers in the web app and
+by the streaming trend detector.
+"""
+
+import re
+from collections import Counter
+
+
+def extract_phrases(text):
+    """Extract meaningful phrases from text"""
+    # Remove special characters and convert to lowercase
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    
+    # Split into words
+    words = text.split()
+    
+    # Create phrases (bigrams)
+    phrases = [' '.join(words[i:i+2]) for i in range(len(words)-1)]
+    
+    return Counter(phrases)
+
+
+def extract_locations(text):
+    """Extract location mentions from text"""
+    # Singapore location keywords
+    locations = ['woodlands', 'tampines', 'jurong', 'changi', 'yishun', 
+                'ang mo kio', 'bedok', 'clementi', 'punggol', 'sengkang',
+                'pie', 'cte', 'sle', 'bke', 'tpe', 'ecp', 'aye', 'kje']
+    
+    found_locations = []
+    text = text.lower()
+    
+    for location in locations:
+        if location in text:
+            found_locations.append(location)
+    
+    return found_locations
+
+
+def extract_context(text, keyword, window=50):
+    """Extract context around a keyword mention"""
+    text = text.lower()
+    keyword = keyword.lower()
+    
+    # Find the position of the keyword
+    pos = text.find(keyword)
+    if pos == -1:
+        return ""
+    
+    # Get the surrounding context
+    start = max(0, pos - window)
+    end = min(len(text), pos + len(keyword) + window)
+    
+    return text[start:end]
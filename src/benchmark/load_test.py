@@ -0,0 +1,368 @@
+"""
+HTTP load test for the Flask API.
+
+Replays a weighted mix of dashboard requests against a running instance at
+increasing concurrency levels:
+
+- ``list_datasets``: ``GET /api/list-datasets``
+- ``analysis_files``: ``GET /api/get-analysis-files``
+- ``dashboard``: ``GET /api/get-visualizations`` (charts from the newest analysis)
+- ``analysis_viz``: ``GET /api/get-visualizations?file=...`` for a random analysis file
+- ``analyze``: ``POST /api/analyze-reddit-data`` on a Reddit dataset (writes analysis files)
+
+Every concurrency level runs for a fixed duration with one thread and HTTP
+session per simulated user. The report has throughput per level and, per
+endpoint, request and error counts, latency percentiles and a latency
+histogram. Responses with an HTTP error status or a JSON ``"status": "error"``
+body count as errors. Reports are saved to ``data/benchmarks/`` and can be
+compared with an earlier run::
+
+    python -m src.benchmark.load_test --start-server --concurrency 1,4,16 --duration 20
+    python -m src.benchmark.load_test --concurrency 1,4,16 --compare data/benchmarks/<report>.json
+
+The client shares the GIL between its threads, so at high concurrency run it
+from another machine or check that client CPU is not the bottleneck.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import subprocess
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import requests
+
+from src.analysis.rollups import percentile
+from src.benchmark.pipeline import BENCHMARK_DIR, PROJECT_ROOT, git_commit
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = {
+    'list_datasets': 20,
+    'analysis_files': 20,
+    'dashboard': 25,
+    'analysis_viz': 25,
+    'analyze': 1
+}
+
+# Upper bounds of the latency histogram buckets in milliseconds
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+REQUEST_TIMEOUT = 120
+
+
+class RequestMix:
+    """Weighted scenarios with the request each of them sends."""
+
+    def __init__(self, weights: Dict[str, int], analysis_files: List[str], datasets: List[str],
+                 analysis_types: List[str]):
+        """
+        Initialize the mix.
+
+        Args:
+            weights: Scenario name -> relative weight (0 disables a scenario)
+            analysis_files: Analysis file paths for ``analysis_viz``
+            datasets: Reddit dataset paths for ``analyze``
+            analysis_types: Analysis types submitted by ``analyze``
+        """
+        self.analysis_files = analysis_files
+        self.datasets = datasets
+        self.analysis_types = analysis_types
+
+        available = dict(weights)
+        if not analysis_files and available.get('analysis_viz'):
+            logger.warning("No analysis files found; dropping the analysis_viz scenario")
+            available['analysis_viz'] = 0
+        if not datasets and available.get('analyze'):
+            logger.warning("No Reddit datasets found; dropping the analyze scenario")
+            available['analyze'] = 0
+        self.names = [name for name, weight in available.items() if weight > 0]
+        self.weights = [available[name] for name in self.names]
+        if not self.names:
+            raise ValueError("The request mix has no enabled scenarios")
+
+    def choose(self, rng: random.Random) -> str:
+        """Pick a scenario."""
+        return rng.choices(self.names, self.weights)[0]
+
+    def request(self, name: str, rng: random.Random) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Build the request of a scenario.
+
+        Returns:
+            Tuple of (method, path, keyword arguments for requests)
+        """
+        if name == 'list_datasets':
+            return 'GET', '/api/list-datasets', {'params': {'limit': 50}}
+        if name == 'analysis_files':
+            return 'GET', '/api/get-analysis-files', {'params': {'limit': 50}}
+        if name == 'dashboard':
+            return 'GET', '/api/get-visualizations', {'params': {'timeframe': rng.choice(['7d', '30d', 'all'])}}
+        if name == 'analysis_viz':
+            return 'GET', '/api/get-visualizations', {'params': {'file': rng.choice(self.analysis_files),
+                                                                 'type': 'all', 'max_points': 500}}
+        if name == 'analyze':
+            return 'POST', '/api/analyze-reddit-data', {'json': {'file_path': rng.choice(self.datasets),
+                                                                 'analysis_types': self.analysis_types}}
+        raise ValueError(f"Unknown scenario: {name}")
+
+
+def discover(base_url: str) -> Tuple[List[str], List[str]]:
+    """
+    Find the analysis files and Reddit datasets the mix can request.
+
+    Returns:
+        Tuple of (analysis file paths, Reddit dataset paths)
+    """
+    with requests.Session() as session:
+        files = session.get(f'{base_url}/api/get-analysis-files',
+                            params={'limit': 50, 'fields': 'path'}, timeout=REQUEST_TIMEOUT).json()
+        datasets = session.get(f'{base_url}/api/list-datasets',
+                               params={'limit': 200, 'fields': 'file_path,source,format'},
+                               timeout=REQUEST_TIMEOUT).json()
+    analysis_files = [entry['path'] for entry in files.get('files', [])]
+    reddit = [entry['file_path'] for entry in datasets
+              if entry.get('source') == 'reddit' and entry.get('format') in ('JSON', 'JSONL')]
+    return analysis_files, reddit
+
+
+def _is_error(response: requests.Response) -> bool:
+    """HTTP errors and JSON bodies reporting ``"status": "error"`` both count as errors."""
+    if response.status_code >= 400:
+        return True
+    if 'json' not in response.headers.get('Content-Type', ''):
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return True
+    return isinstance(body, dict) and (body.get('status') == 'error' or body.get('success') is False)
+
+
+def _worker(base_url: str, mix: RequestMix, deadline: float, seed: int,
+            samples: List[Tuple[str, float, bool]]):
+    """Send requests until the deadline, appending (scenario, seconds, error) samples."""
+    rng = random.Random(seed)
+    local = []
+    with requests.Session() as session:
+        while time.perf_counter() < deadline:
+            name = mix.choose(rng)
+            method, path, kwargs = mix.request(name, rng)
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, timeout=REQUEST_TIMEOUT, **kwargs)
+                error = _is_error(response)
+            except requests.RequestException:
+                error = True
+            local.append((name, time.perf_counter() - start, error))
+    samples.extend(local)
+
+
+def summarise_latencies(latencies: List[float], errors: int) -> Dict[str, Any]:
+    """Request count, error rate, percentiles and histogram of one endpoint (latencies in seconds)."""
+    millis = sorted(latency * 1000 for latency in latencies)
+    histogram = {str(bound): 0 for bound in HISTOGRAM_BUCKETS_MS}
+    histogram['+Inf'] = 0
+    for value in millis:
+        for bound in HISTOGRAM_BUCKETS_MS:
+            if value <= bound:
+                histogram[str(bound)] += 1
+                break
+        else:
+            histogram['+Inf'] += 1
+    return {
+        'requests': len(millis),
+        'errors': errors,
+        'error_rate': errors / len(millis) if millis else 0.0,
+        'latency_ms': {
+            'mean': sum(millis) / len(millis) if millis else None,
+            'p50': percentile(millis, 50),
+            'p90': percentile(millis, 90),
+            'p95': percentile(millis, 95),
+            'p99': percentile(millis, 99),
+            'max': millis[-1] if millis else None
+        },
+        'histogram_ms': histogram
+    }
+
+
+def run_level(base_url: str, mix: RequestMix, concurrency: int, duration: float,
+              seed: int = 42) -> Dict[str, Any]:
+    """
+    Run the mix with ``concurrency`` simulated users for ``duration`` seconds.
+
+    Returns:
+        Throughput and per-endpoint statistics of the level
+    """
+    samples = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    threads = [threading.Thread(target=_worker, args=(base_url, mix, deadline, seed + index, samples))
+               for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    by_endpoint = {}
+    for name, latency, error in samples:
+        entry = by_endpoint.setdefault(name, [[], 0])
+        entry[0].append(latency)
+        entry[1] += error
+
+    errors = sum(entry[1] for entry in by_endpoint.values())
+    return {
+        'concurrency': concurrency,
+        'duration_seconds': elapsed,
+        'requests': len(samples),
+        'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'endpoints': {name: summarise_latencies(latencies, errors)
+                      for name, (latencies, errors) in sorted(by_endpoint.items())}
+    }
+
+
+def start_server(port: int, timeout: float = 60) -> subprocess.Popen:
+    """
+    Start the application from ``app.py`` without the debug reloader and wait until it answers.
+
+    Returns:
+        The server process
+    """
+    command = [sys.executable, '-c',
+               f"from app import create_app; create_app().run(host='127.0.0.1', port={port}, threaded=True)"]
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            requests.get(f'http://127.0.0.1:{port}/', timeout=2)
+            return process
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Server did not answer on port {port} within {timeout}s")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Find endpoints whose p95 latency or error rate got worse than in a baseline.
+
+    Args:
+        report: Current load test report
+        baseline: Earlier load test report
+        threshold: Relative p95 increase reported as a regression (any error rate increase is reported)
+
+    Returns:
+        One entry per regressed endpoint and concurrency level
+    """
+    previous_levels = {level['concurrency']: level for level in baseline.get('levels', [])}
+    regressions = []
+    for level in report['levels']:
+        previous = previous_levels.get(level['concurrency'])
+        if not previous:
+            continue
+        for name, stats in level['endpoints'].items():
+            before = previous['endpoints'].get(name)
+            if not before or not stats['requests']:
+                continue
+            current_p95, previous_p95 = stats['latency_ms']['p95'], before['latency_ms']['p95']
+            if previous_p95 and current_p95 > previous_p95 * (1 + threshold):
+                regressions.append({'concurrency': level['concurrency'], 'endpoint': name, 'metric': 'p95_ms',
+                                    'baseline': previous_p95, 'current': current_p95})
+            if stats['error_rate'] > before['error_rate']:
+                regressions.append({'concurrency': level['concurrency'], 'endpoint': name, 'metric': 'error_rate',
+                                    'baseline': before['error_rate'], 'current': stats['error_rate']})
+    return regressions
+
+
+def _parse_mix(value: Optional[str]) -> Dict[str, int]:
+    """Parse ``name=weight,...`` overrides of the default mix."""
+    mix = dict(DEFAULT_MIX)
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown scenario: {name}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load test the Flask API with a dashboard request mix')
+    parser.add_argument('--base-url', help='Running instance to test (default: http://127.0.0.1:<port>)')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--start-server', action='store_true', help='Start app.py locally for the test')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='Comma separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per concurrency level')
+    parser.add_argument('--mix', help='Scenario weights, e.g. "analyze=0,dashboard=50"')
+    parser.add_argument('--analysis-types', default='sentiment,trend', help='Types submitted by the analyze scenario')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Where to save the report (default: data/benchmarks/)')
+    parser.add_argument('--compare', help='Earlier report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative p95 increase reported as a regression')
+    args = parser.parse_args(argv)
+
+    try:
+        weights = _parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    base_url = (args.base_url or f'http://127.0.0.1:{args.port}').rstrip('/')
+
+    server = start_server(args.port) if args.start_server else None
+    try:
+        analysis_files, datasets = discover(base_url)
+        mix = RequestMix(weights, analysis_files, datasets, args.analysis_types.split(','))
+
+        levels = []
+        for concurrency in [int(level) for level in args.concurrency.split(',')]:
+            level = run_level(base_url, mix, concurrency, args.duration, args.seed)
+            levels.append(level)
+            logger.info(f"{concurrency} users: {level['throughput_rps']:.1f} req/s, "
+                        f"{level['error_rate']:.1%} errors")
+            for name, stats in level['endpoints'].items():
+                logger.info(f"  {name}: {stats['requests']} requests, p50 {stats['latency_ms']['p50']:.0f} ms, "
+                            f"p95 {stats['latency_ms']['p95']:.0f} ms, {stats['error_rate']:.1%} errors")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'config': {'base_url': base_url, 'duration': args.duration, 'mix': dict(zip(mix.names, mix.weights)),
+                   'analysis_types': mix.analysis_types, 'seed': args.seed},
+        'levels': levels
+    }
+
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Load test report saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            logger.warning(f"Regression at {regression['concurrency']} users: {regression['endpoint']} "
+                           f"{regression['metric']} {regression['baseline']} -> {regression['current']}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
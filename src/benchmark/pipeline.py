@@ -0,0 +1,309 @@
+"""
+Reproducible benchmark suite for the analysis pipeline.
+
+Generates a synthetic Reddit corpus shaped like ``drivingsg_data_*.json`` (see
+``src.data.corpus_generator``) for each requested size, then runs every
+analyzer against it:
+
+- the batch analyzers of the web app (sentiment, trends, traffic, locations,
+  topics) and the engagement, distinct-count and rollup analyzers
+- the Hadoop streaming trend mapper and reducer (run as subprocesses with a
+  sort in between, as Hadoop streaming would)
+
+The Spark SQL path of ``AnalysisService.analyze_reddit_data`` is not a case:
+``SparkService`` has no session accessor it can run with, so it would only
+ever report an error.
+
+Each case runs in a fresh process, so peak RSS is measured per case and one
+case's caches do not warm up the next. Results (throughput, latency
+percentiles over the repeats, peak RSS) are saved as a JSON baseline that later
+runs can be compared against::
+
+    python -m src.benchmark.pipeline --sizes 10000,100000 --repeats 5
+    python -m src.benchmark.pipeline --sizes 10000 --compare data/benchmarks/baseline.json
+
+Cases whose dependencies are not installed (Flask for the web analyzers) are
+reported as skipped. In-memory analyzers hold
+the whole corpus, so the largest sizes need memory in proportion.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import importlib
+import subprocess
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Any, Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from src.analysis.rollups import percentile
+from src.data.corpus_generator import write_corpus
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, 'data', 'benchmarks')
+MAPREDUCE_DIR = os.path.join(PROJECT_ROOT, 'src', 'mapreduce')
+
+# Case name -> (input kind, 'module:function'); 'posts' cases get the loaded
+# corpus, 'path' cases the path of the JSONL corpus file
+CASES = {
+    'sentiment': ('posts', 'src.web.views:analyze_sentiment'),
+    'trend': ('posts', 'src.web.views:analyze_trends'),
+    'trend_sketch': ('posts', 'src.benchmark.pipeline:run_trends_sketch'),
+    'traffic': ('posts', 'src.web.views:analyze_traffic_incidents'),
+    'location': ('posts', 'src.web.views:analyze_locations'),
+    'topic': ('posts', 'src.web.views:analyze_topics'),
+    'engagement': ('posts', 'src.analysis.engagement:analyze_engagement'),
+    'distinct': ('posts', 'src.analysis.distinct:analyze_distinct'),
+    'rollups': ('posts', 'src.analysis.rollups:build_rollups'),
+    'mapreduce_trends': ('path', 'src.benchmark.pipeline:run_mapreduce_trends')
+}
+
+def run_trends_sketch(posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Trend analysis with bounded-memory phrase counting."""
+    from src.analysis.sketches import HeavyHitters
+    from src.web.views import analyze_trends
+    return analyze_trends(posts, phrase_sketch=HeavyHitters())
+
+
+def run_mapreduce_trends(corpus_path: str) -> int:
+    """
+    Run the trend mapper, a sort and the trend reducer like Hadoop streaming.
+
+    Returns:
+        Number of reduced (day, bigram) keys
+    """
+    with open(corpus_path, 'rb') as corpus:
+        mapped = subprocess.run([sys.executable, os.path.join(MAPREDUCE_DIR, 'trend_mapper.py')],
+                                stdin=corpus, stdout=subprocess.PIPE, check=True).stdout
+    shuffled = b'\n'.join(sorted(mapped.splitlines())) + b'\n'
+    reduced = subprocess.run([sys.executable, os.path.join(MAPREDUCE_DIR, 'trend_reducer.py')],
+                             input=shuffled, stdout=subprocess.PIPE, check=True).stdout
+    return reduced.count(b'\n')
+
+
+def _resolve(target: str) -> Callable:
+    """Import a 'module:function' target."""
+    module_name, function_name = target.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _rss_bytes() -> Optional[int]:
+    """Peak RSS of this process in bytes (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(case: str, corpus_path: str, repeats: int) -> Dict[str, Any]:
+    """
+    Run one case in the current process.
+
+    Called in a fresh worker process by run_suite. Loading the corpus is not
+    part of the timings.
+
+    Args:
+        case: Name of the case (see CASES)
+        corpus_path: JSONL corpus file
+        repeats: Number of timed runs
+
+    Returns:
+        Dictionary with ``status`` and, on success, the run ``timings`` and
+        RSS before and after the runs
+    """
+    kind, target = CASES[case]
+    try:
+        function = _resolve(target)
+    except ImportError as e:
+        return {'status': 'skipped', 'reason': str(e)}
+
+    if kind == 'posts':
+        from src.data.jsonl_io import load_posts
+        argument = load_posts(corpus_path)
+    else:
+        argument = corpus_path
+
+    baseline_rss = _rss_bytes()
+    timings = []
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function(argument)
+            timings.append(time.perf_counter() - start)
+    except ImportError as e:
+        # Wrappers import the code they benchmark lazily
+        return {'status': 'skipped', 'reason': str(e)}
+    except Exception as e:
+        return {'status': 'error', 'reason': f"{type(e).__name__}: {e}"}
+
+    return {'status': 'success', 'timings': timings,
+            'baseline_rss_bytes': baseline_rss, 'peak_rss_bytes': _rss_bytes()}
+
+
+def summarise(raw: Dict[str, Any], records: int) -> Dict[str, Any]:
+    """Turn the timings of a case into throughput, latency percentiles and memory."""
+    if raw['status'] != 'success':
+        return raw
+    timings = sorted(raw['timings'])
+    median = percentile(timings, 50)
+    summary = {
+        'status': 'success',
+        'runs': len(timings),
+        'records': records,
+        'records_per_second': round(records / median, 1) if median else None,
+        'latency_seconds': {
+            'min': timings[0],
+            'p50': median,
+            'p90': percentile(timings, 90),
+            'p99': percentile(timings, 99),
+            'max': timings[-1]
+        },
+        'peak_rss_bytes': raw['peak_rss_bytes']
+    }
+    if raw['peak_rss_bytes'] is not None and raw['baseline_rss_bytes'] is not None:
+        summary['rss_growth_bytes'] = raw['peak_rss_bytes'] - raw['baseline_rss_bytes']
+    return summary
+
+
+def run_suite(sizes: List[int], cases: List[str], repeats: int = 3, seed: int = 42,
+              work_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Benchmark every case at every corpus size.
+
+    Args:
+        sizes: Corpus sizes in posts
+        cases: Case names (see CASES)
+        repeats: Timed runs per case
+        seed: Corpus seed
+        work_dir: Directory for the generated corpora (a temporary directory by default)
+
+    Returns:
+        Benchmark report with environment, configuration and per-size results
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix='benchmark_')
+    context = get_context('spawn')
+    results = {}
+
+    for size in sizes:
+        corpus_path = os.path.join(work_dir, f'corpus_{size}_{seed}.jsonl')
+        start = time.perf_counter()
+        generated = write_corpus(corpus_path, 'reddit', size, 'jsonl', seed)
+        counts = {'posts': generated['records'], 'comments': generated['comments']}
+        logger.info(f"Generated {counts['posts']} posts and {counts['comments']} comments "
+                    f"in {time.perf_counter() - start:.1f}s")
+        records = counts['posts'] + counts['comments']
+
+        results[str(size)] = {'corpus': counts, 'cases': {}}
+        for case in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                raw = executor.submit(run_case, case, corpus_path, repeats).result()
+            summary = summarise(raw, records)
+            results[str(size)]['cases'][case] = summary
+            if summary['status'] == 'success':
+                logger.info(f"[{size}] {case}: p50 {summary['latency_seconds']['p50']:.3f}s, "
+                            f"{summary['records_per_second']} records/s")
+            else:
+                logger.info(f"[{size}] {case}: {summary['status']} ({summary['reason']})")
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpu_count': os.cpu_count()},
+        'config': {'sizes': sizes, 'cases': cases, 'repeats': repeats, 'seed': seed},
+        'results': results
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, check=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Find cases that got slower or use more memory than in a baseline.
+
+    Args:
+        report: Result of run_suite
+        baseline: Earlier result of run_suite
+        threshold: Relative change above which a case is reported
+
+    Returns:
+        One entry per regressed metric with the size, case, metric and both values
+    """
+    regressions = []
+    for size, result in report['results'].items():
+        for case, summary in result['cases'].items():
+            previous = baseline.get('results', {}).get(size, {}).get('cases', {}).get(case)
+            if summary['status'] != 'success' or not previous or previous['status'] != 'success':
+                continue
+            metrics = [('latency_p50', summary['latency_seconds']['p50'], previous['latency_seconds']['p50']),
+                       ('peak_rss_bytes', summary['peak_rss_bytes'], previous['peak_rss_bytes'])]
+            for metric, current, before in metrics:
+                if current is not None and before and current > before * (1 + threshold):
+                    regressions.append({'size': size, 'case': case, 'metric': metric,
+                                        'baseline': before, 'current': current,
+                                        'change': round(current / before - 1, 3)})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the analysis pipeline on synthetic corpora')
+    parser.add_argument('--sizes', default='10000', help='Comma separated corpus sizes in posts')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma separated cases to run')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per case')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--work-dir', help='Directory for the generated corpora')
+    parser.add_argument('--output', help='Where to save the report (default: data/benchmarks/)')
+    parser.add_argument('--compare', help='Baseline report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change reported as a regression')
+    args = parser.parse_args(argv)
+
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+
+    report = run_suite([int(size) for size in args.sizes.split(',')], cases,
+                       args.repeats, args.seed, args.work_dir)
+
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Benchmark report saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            logger.warning(f"Regression at {regression['size']} posts: {regression['case']} "
+                           f"{regression['metric']} {regression['baseline']} -> {regression['current']} "
+                           f"(+{regression['change']:.1%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
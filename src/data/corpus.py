@@ -0,0 +1,559 @@
+"""
+Array-backed, memory-mapped corpus.
+
+Scrape-format posts are nested dictionaries: every post and comment costs
+hundreds of bytes of Python objects before any text is analysed. A ``Corpus``
+stores the same records column-wise instead: one row per post or comment, in
+parallel NumPy arrays, with every title and text in a single UTF-8 buffer::
+
+    ids           S<n>     post or comment id
+    created_utc   float64  epoch seconds (NaN if unknown)
+    score         int64
+    num_comments  int64    reported comment count (0 for comments)
+    parent        int64    row of the comment's post, -1 for posts
+    author        int32    code into the author table, -1 if unknown
+    flair         int32    code into the flair table, -1 if none
+    offsets       int64    text of row i is text[offsets[i]:offsets[i + 1]]
+    title_length  int32    leading bytes of a post's text that are its title
+    text          uint8    UTF-8 titles and texts
+
+Each post row is followed by its comment rows, posts in time order, so any
+range of posts is one contiguous range of rows.
+
+``save`` writes one ``.npy`` file per array into a directory and ``open`` maps
+them back with ``mmap``: opening is instant whatever the corpus size, pages are
+read on first use and every process opening the same directory shares them
+through the page cache::
+
+    corpus = Corpus.from_store('data/store/posts.db')
+    corpus.save('data/store/corpus/reddit-v12')
+    corpus = Corpus.open('data/store/corpus/reddit-v12')
+    for post in corpus.posts():     # scrape-format dicts, built one at a time
+        ...
+
+``store_corpus`` keeps one such snapshot of the post store per store version.
+
+Worker processes get a corpus by handle rather than by pickling posts:
+``share_corpus`` yields a small picklable handle (the snapshot directory, or
+the name of a shared memory block the arrays were copied into when the corpus
+only lives in memory) and ``attach_corpus`` maps it in the worker without
+copying::
+
+    with share_corpus(corpus) as handle:
+        executor.submit(work, handle, start, stop)
+
+    def work(handle, start, stop):
+        with attach_corpus(handle) as corpus:
+            return summarise(corpus.posts(start, stop))
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import logging
+from contextlib import closing, contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.data.post_store import PostStore, read_version, to_epoch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CORPUS_DIRNAME = 'corpus'
+CORPUS_FORMAT = 1
+META_FILENAME = 'meta.json'
+# Byte alignment of each array in a shared memory block
+SHM_ALIGNMENT = 64
+
+# Columns stored as codes into a table of distinct strings
+LABELS = ('author', 'flair')
+
+# Arrays saved for every corpus; each label also has <label>_text and <label>_offsets
+ARRAYS = ('ids', 'created_utc', 'score', 'num_comments', 'parent', 'offsets', 'title_length', 'text') + tuple(
+    f'{label}{suffix}' for label in LABELS for suffix in ('', '_offsets', '_text'))
+
+
+def _pack_strings(values: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate encoded strings into a (uint8 buffer, int64 offsets) pair."""
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    if values:
+        np.cumsum([len(value) for value in values], out=offsets[1:])
+    return np.frombuffer(b''.join(values), dtype=np.uint8), offsets
+
+
+class CorpusBuilder:
+    """Accumulates posts and comments row by row and builds a Corpus."""
+
+    def __init__(self):
+        self.ids: List[bytes] = []
+        self.created_utc: List[float] = []
+        self.score: List[int] = []
+        self.num_comments: List[int] = []
+        self.parent: List[int] = []
+        self.labels: Dict[str, List[int]] = {label: [] for label in LABELS}
+        self.title_length: List[int] = []
+        self.texts: List[bytes] = []
+        self.tables: Dict[str, Dict[str, int]] = {label: {} for label in LABELS}
+
+    def _add(self, record_id: Any, created_utc: Any, score: Any, num_comments: Any, parent: int,
+             author: Optional[str], flair: Optional[str], title: str, text: str):
+        self.ids.append(str(record_id).encode('utf-8'))
+        epoch = to_epoch(created_utc)
+        self.created_utc.append(np.nan if epoch is None else epoch)
+        self.score.append(score or 0)
+        self.num_comments.append(num_comments or 0)
+        self.parent.append(parent)
+        for label, value in (('author', author), ('flair', flair)):
+            table = self.tables[label]
+            self.labels[label].append(-1 if value is None else table.setdefault(value, len(table)))
+        title = (title or '').encode('utf-8')
+        self.title_length.append(len(title))
+        self.texts.append(title + (text or '').encode('utf-8'))
+
+    def add_post(self, post_id: Any, title: str, text: str, created_utc: Any, score: Any,
+                 num_comments: Any, author: Optional[str], flair: Optional[str] = None,
+                 comments: Iterable[Dict[str, Any]] = ()):
+        """
+        Append a post followed by its comments.
+
+        Args:
+            comments: Dicts with ``id``, ``text``, ``created_utc``, ``score`` and ``author``
+        """
+        row = len(self.ids)
+        self._add(post_id, created_utc, score, num_comments, -1, author, flair, title, text)
+        for comment in comments:
+            self._add(comment.get('id'), comment.get('created_utc'), comment.get('score'), 0, row,
+                      comment.get('author'), None, '', comment.get('text'))
+
+    def add_posts(self, posts_data: Iterable[Dict[str, Any]]) -> 'CorpusBuilder':
+        """Append scrape-format posts."""
+        for post in posts_data:
+            self.add_post(post.get('id'), post.get('title'), post.get('text'), post.get('created_utc'),
+                          post.get('score'), post.get('num_comments'), post.get('author'),
+                          post.get('flair'), post.get('comments', []))
+        return self
+
+    def build(self, version: Optional[int] = None) -> 'Corpus':
+        """
+        Convert the rows to typed arrays.
+
+        Args:
+            version: Post store version the rows were read at, if any
+        """
+        text, offsets = _pack_strings(self.texts)
+        width = max((len(record_id) for record_id in self.ids), default=1)
+        arrays = {
+            'ids': np.array(self.ids, dtype=f'S{max(width, 1)}'),
+            'created_utc': np.array(self.created_utc, dtype=np.float64),
+            'score': np.array(self.score, dtype=np.int64),
+            'num_comments': np.array(self.num_comments, dtype=np.int64),
+            'parent': np.array(self.parent, dtype=np.int64),
+            'offsets': offsets,
+            'title_length': np.array(self.title_length, dtype=np.int32),
+            'text': text
+        }
+        for label in LABELS:
+            arrays[label] = np.array(self.labels[label], dtype=np.int32)
+            arrays[f'{label}_text'], arrays[f'{label}_offsets'] = _pack_strings(
+                [value.encode('utf-8') for value in self.tables[label]])
+        return Corpus(arrays, version=version)
+
+
+class Corpus:
+    """Posts and comments as parallel arrays and one UTF-8 text buffer."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], version: Optional[int] = None,
+                 path: Optional[str] = None):
+        """
+        Wrap corpus arrays (see CorpusBuilder.build and Corpus.open).
+
+        Args:
+            arrays: One array per name in ARRAYS
+            version: Post store version the corpus was read at, if any
+            path: Directory the arrays are mapped from, if any
+        """
+        missing = [name for name in ARRAYS if name not in arrays]
+        if missing:
+            raise ValueError(f"Corpus is missing arrays: {', '.join(missing)}")
+        self.arrays = arrays
+        self.version = version
+        self.path = path
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self._post_rows = None
+        self._tables = {}
+
+    @classmethod
+    def from_posts(cls, posts_data: Iterable[Dict[str, Any]]) -> 'Corpus':
+        """Build an in-memory corpus from scrape-format posts."""
+        return CorpusBuilder().add_posts(posts_data).build()
+
+    @classmethod
+    def from_store(cls, db_path: str, source: str = 'reddit') -> 'Corpus':
+        """
+        Read every post of a post store database without building dictionaries.
+
+        Posts and comments are read in one transaction, so the corpus matches
+        the store version it records.
+
+        Args:
+            db_path: Path to the post store SQLite database
+            source: Data source to read
+
+        Returns:
+            In-memory corpus, posts ordered by creation time
+        """
+        builder = CorpusBuilder()
+        with closing(sqlite3.connect(db_path)) as conn:
+            conn.row_factory = sqlite3.Row
+            conn.execute('BEGIN')
+            version = read_version(conn, source)
+            for post in conn.execute(
+                "SELECT id, title, text, created_utc, score, num_comments, author, flair FROM posts "
+                "WHERE source = ? ORDER BY created_utc", (source,)
+            ).fetchall():
+                comments = [dict(comment) for comment in conn.execute(
+                    "SELECT id, text, created_utc, score, author FROM comments WHERE post_id = ? "
+                    "ORDER BY created_utc", (post['id'],)
+                )]
+                builder.add_post(post['id'], post['title'], post['text'], post['created_utc'], post['score'],
+                                 post['num_comments'], post['author'], post['flair'], comments)
+            conn.rollback()
+        return builder.build(version)
+
+    def save(self, directory: str) -> str:
+        """
+        Write the arrays as ``.npy`` files that ``open`` can map.
+
+        The directory is written under a temporary name and renamed, so readers
+        never see a partial corpus.
+
+        Args:
+            directory: Directory to create; must not exist
+
+        Returns:
+            The directory
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = f"{directory}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(tmp_dir, f'{name}.npy'), self.arrays[name], allow_pickle=False)
+            with open(os.path.join(tmp_dir, META_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'type': 'corpus',
+                    'format': CORPUS_FORMAT,
+                    'version': self.version,
+                    'records': len(self),
+                    'posts': self.post_count,
+                    'text_bytes': int(self.text.size)
+                }, f, indent=2)
+            os.rename(tmp_dir, directory)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        logger.info(f"Saved corpus of {len(self)} records to {directory}")
+        return directory
+
+    @classmethod
+    def open(cls, directory: str, mmap: bool = True) -> 'Corpus':
+        """
+        Open a saved corpus.
+
+        Args:
+            directory: Directory written by save
+            mmap: Map the arrays read-only instead of reading them into memory
+
+        Returns:
+            Corpus whose arrays are backed by the files
+        """
+        with open(os.path.join(directory, META_FILENAME), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('type') != 'corpus' or meta.get('format') != CORPUS_FORMAT:
+            raise ValueError(f"{directory} is not a corpus in format {CORPUS_FORMAT}")
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+                  for name in ARRAYS}
+        return cls(arrays, version=meta.get('version'), path=directory)
+
+    def __len__(self) -> int:
+        """Number of rows (posts and comments)."""
+        return int(self.parent.size)
+
+    @property
+    def post_rows(self) -> np.ndarray:
+        """Row of every post, in order."""
+        if self._post_rows is None:
+            self._post_rows = np.flatnonzero(np.asarray(self.parent) < 0)
+        return self._post_rows
+
+    @property
+    def post_count(self) -> int:
+        return int(self.post_rows.size)
+
+    def row_range(self, start: int = 0, stop: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Rows holding a range of posts and their comments.
+
+        Args:
+            start: First post
+            stop: Post after the last one (defaults to all posts)
+
+        Returns:
+            (first row, row after the last one)
+        """
+        posts = self.post_count
+        stop = posts if stop is None else min(stop, posts)
+        start = min(max(start, 0), stop)
+        first = int(self.post_rows[start]) if start < posts else len(self)
+        last = int(self.post_rows[stop]) if stop < posts else len(self)
+        return first, last
+
+    def _bytes(self, row: int) -> bytes:
+        return self.text[self.offsets[row]:self.offsets[row + 1]].tobytes()
+
+    def title(self, row: int) -> str:
+        """Title of a post row ('' for comments)."""
+        return self._bytes(row)[:self.title_length[row]].decode('utf-8')
+
+    def body(self, row: int) -> str:
+        """Text of a post or comment row, without the title."""
+        return self._bytes(row)[self.title_length[row]:].decode('utf-8')
+
+    def text_of(self, row: int) -> str:
+        """Analysed text of a row: ``title text`` for posts, the text for comments."""
+        if self.parent[row] < 0:
+            return f"{self.title(row)} {self.body(row)}"
+        return self.body(row)
+
+    def label(self, label: str, row: int) -> Optional[str]:
+        """
+        Value of a label column (see LABELS) for a row.
+
+        Returns:
+            The string, or None if the row has none
+        """
+        code = int(self.arrays[label][row])
+        if code < 0:
+            return None
+        table = self._tables.get(label)
+        if table is None:
+            # Decoded once; tables hold distinct values only
+            offsets = self.arrays[f'{label}_offsets'].tolist()
+            values = self.arrays[f'{label}_text'].tobytes()
+            table = self._tables[label] = [values[offsets[i]:offsets[i + 1]].decode('utf-8')
+                                           for i in range(len(offsets) - 1)]
+        return table[code]
+
+    def _timestamp(self, row: int) -> Optional[float]:
+        value = float(self.created_utc[row])
+        return None if np.isnan(value) else value
+
+    def _record(self, row: int) -> Dict[str, Any]:
+        return {
+            'id': self.ids[row].decode('utf-8'),
+            'text': self.body(row),
+            'created_utc': self._timestamp(row),
+            'score': int(self.score[row]),
+            'author': self.label('author', row)
+        }
+
+    def iter_posts(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Build scrape-format posts one at a time.
+
+        Args:
+            start: First post
+            stop: Post after the last one (defaults to all posts)
+
+        Yields:
+            Post dicts with their comments, as returned by PostStore.iter_posts
+        """
+        first, last = self.row_range(start, stop)
+        post = None
+        for row in range(first, last):
+            if self.parent[row] < 0:
+                if post is not None:
+                    yield post
+                post = self._record(row)
+                post.update({
+                    'title': self.title(row),
+                    'num_comments': int(self.num_comments[row]),
+                    'flair': self.label('flair', row),
+                    'comments': []
+                })
+            else:
+                post['comments'].append(self._record(row))
+        if post is not None:
+            yield post
+
+    def posts(self, start: int = 0, stop: Optional[int] = None) -> 'CorpusPosts':
+        """Re-iterable view of a range of posts, for analyzers that read posts_data several times."""
+        return CorpusPosts(self, start, stop)
+
+    def release(self):
+        """Drop the arrays, e.g. so the shared memory they view can be closed."""
+        for name in ARRAYS:
+            setattr(self, name, None)
+        self.arrays = {}
+        self._post_rows = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Sizes of the corpus."""
+        return {
+            'version': self.version,
+            'path': self.path,
+            'records': len(self),
+            'posts': self.post_count,
+            'authors': int(self.author_offsets.size) - 1,
+            'text_bytes': int(self.text.size),
+            'array_bytes': int(sum(array.nbytes for array in self.arrays.values()))
+        }
+
+
+class CorpusPosts:
+    """Posts of a corpus range; every iteration builds the dicts afresh."""
+
+    def __init__(self, corpus: Corpus, start: int = 0, stop: Optional[int] = None):
+        self.corpus = corpus
+        self.start = start
+        self.stop = stop
+        first, last = corpus.row_range(start, stop)
+        parents = np.asarray(corpus.parent[first:last])
+        self.post_count = int(np.count_nonzero(parents < 0))
+        # Posts plus comments
+        self.records = last - first
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.corpus.iter_posts(self.start, self.stop)
+
+    def __len__(self) -> int:
+        return self.post_count
+
+
+def store_corpus(store: PostStore, directory: str, source: str = 'reddit') -> Corpus:
+    """
+    Open the corpus snapshot of a post store, saving one for its current version if needed.
+
+    Snapshots of older versions are deleted once a newer one is saved.
+
+    Args:
+        store: PostStore to read
+        directory: Directory holding the snapshots, e.g. ``data/store/corpus``
+        source: Data source to read
+
+    Returns:
+        Memory-mapped corpus; its ``version`` is the store version it holds
+    """
+    path = os.path.join(directory, f'{source}-v{store.version(source)}')
+    if not os.path.exists(os.path.join(path, META_FILENAME)):
+        corpus = Corpus.from_store(store.db_path, source)
+        path = os.path.join(directory, f'{source}-v{corpus.version}')
+        try:
+            corpus.save(path)
+        except OSError:
+            # Another worker saved the same version first
+            if not os.path.exists(os.path.join(path, META_FILENAME)):
+                raise
+        for name in os.listdir(directory):
+            if name.startswith(f'{source}-v') and os.path.join(directory, name) != path and not name.endswith('.tmp'):
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return Corpus.open(path)
+
+
+class SharedCorpus:
+    """Copy of a corpus in one shared memory block that other processes attach to by name."""
+
+    def __init__(self, corpus: Corpus):
+        """
+        Copy the arrays into a new shared memory block.
+
+        Args:
+            corpus: Corpus to share
+        """
+        layout = {}
+        size = 0
+        for name in ARRAYS:
+            array = corpus.arrays[name]
+            size = -(-size // SHM_ALIGNMENT) * SHM_ALIGNMENT
+            layout[name] = (size, array.dtype.str, list(array.shape))
+            size += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, (offset, dtype, shape) in layout.items():
+            target = np.ndarray(tuple(shape), dtype=dtype, buffer=self.shm.buf, offset=offset)
+            target[...] = corpus.arrays[name]
+            del target
+        self.handle = {'shm': self.shm.name, 'layout': layout, 'version': corpus.version}
+
+    def close(self):
+        """Free the block; attached processes keep their mapping until they detach."""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> 'SharedCorpus':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+@contextmanager
+def share_corpus(corpus: Corpus):
+    """
+    Make a corpus available to worker processes.
+
+    A corpus opened from disk is shared through its memory-mapped files; an
+    in-memory corpus is copied into shared memory for the duration of the block.
+
+    Args:
+        corpus: Corpus to share
+
+    Yields:
+        Picklable handle for attach_corpus
+    """
+    if corpus.path is not None:
+        yield {'path': corpus.path, 'version': corpus.version}
+        return
+    with SharedCorpus(corpus) as shared:
+        yield shared.handle
+
+
+@contextmanager
+def attach_corpus(handle: Dict[str, Any]):
+    """
+    Open a corpus shared with share_corpus, without copying its arrays.
+
+    Args:
+        handle: Handle yielded by share_corpus
+
+    Yields:
+        Corpus viewing the shared files or memory; it is released when the block ends
+    """
+    if 'path' in handle:
+        corpus = Corpus.open(handle['path'])
+        try:
+            yield corpus
+        finally:
+            corpus.release()
+        return
+
+    shm = shared_memory.SharedMemory(name=handle['shm'])
+    corpus = None
+    try:
+        corpus = Corpus({name: np.ndarray(tuple(shape), dtype=dtype, buffer=shm.buf, offset=offset)
+                         for name, (offset, dtype, shape) in handle['layout'].items()},
+                        version=handle.get('version'))
+        yield corpus
+    finally:
+        # Views into the block must be gone before it can be closed
+        if corpus is not None:
+            corpus.release()
+        shm.close()
@@ -0,0 +1,455 @@
+"""
+Synthetic Reddit and Twitter corpora for load testing.
+
+Records are generated in NumPy batches with distributions shaped like real
+scrapes:
+
+- text is drawn from a Zipfian vocabulary whose head holds common English and
+  Singlish words, traffic terms and Singapore place names, followed by a long
+  tail of generated words
+- comment counts, scores, likes and author activity are heavy tailed
+  (log-normal, Pareto and Zipf)
+- timestamps follow a diurnal profile in Singapore time with commute and
+  evening peaks; comments trail their post by an exponential delay
+
+Output is streamed batch by batch as JSONL, JSON, CSV or Parquet, so corpora
+of any size are written in constant memory::
+
+    python -m src.data.corpus_generator --kind reddit --count 1000000 --output data/reddit/synthetic.jsonl
+
+The same seed and configuration always produce the same corpus. Record ids
+include the seed, so corpora generated with different seeds can be ingested
+into the same post store without overwriting each other.
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet output is optional
+    pyarrow = None
+
+from src.data.jsonl_io import PART_SUFFIX, metadata_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORMATS = ('jsonl', 'json', 'csv', 'parquet')
+KINDS = ('reddit', 'twitter')
+
+DEFAULT_CONFIG = {
+    'start': '2025-01-01',     # First day (UTC) of the corpus
+    'days': 90,                # Days covered
+    'vocab_size': 30000,       # Words in the vocabulary, including the generated tail
+    'zipf_exponent': 1.07,     # Word frequency ~ 1 / rank ** exponent
+    'authors': None,           # Author pool (default: a quarter of the record count, at least 100)
+    'author_exponent': 1.1,    # Author activity ~ 1 / rank ** exponent
+    'comment_mu': 1.2,         # Log-normal parameters of comments per post
+    'comment_sigma': 1.3,
+    'max_comments': 500,
+    'topic': None              # Optional word mixed into every record, e.g. a search query
+}
+
+# Head of the vocabulary in rank order
+COMMON_WORDS = [
+    'the', 'i', 'to', 'a', 'and', 'you', 'is', 'it', 'in', 'of', 'that', 'on', 'for', 'my',
+    'car', 'this', 'just', 'at', 'be', 'was', 'so', 'not', 'have', 'are', 'but', 'can', 'if',
+    'they', 'road', 'lane', 'traffic', 'driver', 'with', 'like', 'one', 'all', 'no', 'what',
+    'when', 'get', 'lah', 'then', 'there', 'why', 'or', 'will', 'from', 'pie', 'cte', 'jam',
+    'accident', 'time', 'people', 'left', 'right', 'bus', 'grab', 'taxi', 'also', 'got',
+    'drive', 'should', 'even', 'only', 'do', 'he', 'we', 'up', 'out', 'about', 'how', 'ecp',
+    'aye', 'sle', 'kje', 'bke', 'tpe', 'woodlands', 'tampines', 'jurong', 'changi', 'yishun',
+    'ang mo kio', 'bedok', 'clementi', 'punggol', 'sengkang', 'orchard road', 'bukit timah',
+    'thomson road', 'erp', 'coe', 'parking', 'speed', 'camera', 'police', 'tp', 'lta',
+    'motorcycle', 'lorry', 'exit', 'junction', 'signal', 'red light', 'horn', 'brake', 'rain',
+    'flood', 'insurance', 'dashcam', 'overtake', 'sia', 'leh', 'lor',
+    'walao', 'cyclist', 'pedestrian', 'crossing', 'expressway', 'carpark', 'petrol', 'toll',
+    'checkpoint', 'causeway', 'morning', 'evening', 'peak', 'hour', 'today', 'yesterday',
+    'again', 'very', 'really', 'still', 'never', 'always', 'some', 'more', 'other', 'because'
+]
+
+TWITTER_HASHTAGS = ['#SGTraffic', '#Singapore', '#PIE', '#CTE', '#AYE', '#LTA', '#Accident',
+                    '#Jam', '#SGRoads', '#Causeway', '#ERP', '#COE', '#BigData']
+
+FLAIRS = ['Discussion', 'Accident', 'Traffic', 'Question', 'Rant', 'Dashcam', None]
+FLAIR_WEIGHTS = [0.3, 0.15, 0.15, 0.15, 0.1, 0.1, 0.05]
+
+# Relative activity per hour of the day in Singapore time (UTC+8)
+DIURNAL_PROFILE = [2, 1, 1, 1, 1, 2, 4, 8, 10, 7, 5, 5, 6, 5, 5, 5, 6, 9, 11, 9, 8, 7, 5, 3]
+SGT_OFFSET_HOURS = 8
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ten', 'ra', 'po', 'sin', 'gu', 'ba', 'de', 'chu', 'an',
+             'li', 'mo', 'ser', 'ta', 'kin', 'rou', 'pa', 'hu', 'ven', 'dor', 'ti', 'cha']
+
+
+def _vocabulary(size: int, topic: Optional[str]) -> np.ndarray:
+    """Ranked vocabulary: common words first, then generated words."""
+    words = list(COMMON_WORDS)
+    if topic:
+        words.insert(min(20, len(words)), topic.lower())
+    index = 0
+    base = len(SYLLABLES)
+    while len(words) < size:
+        # Deterministic pseudo-words from syllables, e.g. 'kalo', 'kami', ...
+        value, word = index + base, ''
+        while value:
+            value, digit = divmod(value, base)
+            word = SYLLABLES[digit] + word
+        words.append(word)
+        index += 1
+    return np.array(words[:size], dtype=object)
+
+
+def _zipf_table(size: int, exponent: float) -> np.ndarray:
+    """Normalised cumulative weights of a Zipf distribution over ``size`` ranks."""
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    cumulative = np.cumsum(weights)
+    return cumulative / cumulative[-1]
+
+
+class CorpusGenerator:
+    """Seeded generator of synthetic Reddit posts or tweets in batches."""
+
+    def __init__(self, kind: str = 'reddit', count: int = 10000, seed: int = 42,
+                 config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the generator.
+
+        Args:
+            kind: 'reddit' (posts with nested comments) or 'twitter'
+            count: Number of posts or tweets
+            seed: Random seed
+            config: Overrides of DEFAULT_CONFIG
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unsupported corpus kind: {kind}. Must be one of: {', '.join(KINDS)}")
+        self.kind = kind
+        self.count = count
+        self.seed = seed
+        # Ids are unique per seed, not just per corpus
+        self.id_prefix = f'{seed:x}'
+        self.config = dict(DEFAULT_CONFIG)
+        self.config.update(config or {})
+
+        self.rng = np.random.default_rng(seed)
+        self.vocabulary = _vocabulary(self.config['vocab_size'], self.config['topic'])
+        self.word_table = _zipf_table(len(self.vocabulary), self.config['zipf_exponent'])
+        authors = self.config['authors'] or max(100, count // 4)
+        self.author_table = _zipf_table(authors, self.config['author_exponent'])
+        self.hour_weights = np.array(DIURNAL_PROFILE, dtype=float) / sum(DIURNAL_PROFILE)
+        self.start = int(datetime.strptime(self.config['start'], '%Y-%m-%d')
+                         .replace(tzinfo=timezone.utc).timestamp())
+
+    def _words(self, lengths: np.ndarray) -> List[str]:
+        """One text per entry of ``lengths`` with that many Zipf-distributed words."""
+        words = self.vocabulary[np.searchsorted(self.word_table, self.rng.random(int(lengths.sum())))]
+        bounds = np.concatenate(([0], np.cumsum(lengths)))
+        return [' '.join(words[bounds[i]:bounds[i + 1]]) for i in range(len(lengths))]
+
+    def _authors(self, size: int) -> np.ndarray:
+        """Author ranks; a few authors are very active, most post rarely."""
+        return np.searchsorted(self.author_table, self.rng.random(size))
+
+    def _timestamps(self, size: int) -> np.ndarray:
+        """Epoch seconds with a diurnal (Singapore time) profile."""
+        days = self.rng.integers(0, self.config['days'], size)
+        hours = self.rng.choice(24, size, p=self.hour_weights) - SGT_OFFSET_HOURS
+        return self.start + days * 86400 + hours * 3600 + self.rng.integers(0, 3600, size)
+
+    def _reddit_batch(self, offset: int, size: int) -> List[Dict[str, Any]]:
+        rng = self.rng
+        created = self._timestamps(size)
+        num_comments = np.minimum(np.floor(rng.lognormal(self.config['comment_mu'],
+                                                          self.config['comment_sigma'], size)),
+                                  self.config['max_comments']).astype(int)
+        titles = self._words(rng.integers(4, 16, size))
+        body_lengths = np.minimum(np.floor(rng.lognormal(3.3, 0.8, size)), 400).astype(int)
+        body_lengths[rng.random(size) < 0.3] = 0
+        bodies = self._words(body_lengths)
+        # Popular posts get both more comments and more votes
+        scores = np.floor(rng.pareto(1.1, size) * 4 + num_comments * rng.uniform(0.5, 3, size)).astype(int)
+        authors = self._authors(size)
+        flairs = rng.choice(len(FLAIRS), size, p=FLAIR_WEIGHTS)
+
+        total = int(num_comments.sum())
+        comment_texts = self._words(np.minimum(np.floor(rng.lognormal(2.6, 0.8, total)), 200).astype(int) + 1)
+        comment_delays = np.floor(rng.exponential(7200, total)).astype(int)
+        comment_scores = np.floor(rng.pareto(1.5, total) * 2).astype(int)
+        downvoted = rng.random(total) < 0.08
+        comment_scores[downvoted] = -rng.integers(1, 10, int(downvoted.sum()))
+        comment_authors = self._authors(total)
+
+        posts = []
+        position = 0
+        for i in range(size):
+            post_id = f'p{self.id_prefix}_{offset + i}'
+            comments = []
+            for j in range(position, position + num_comments[i]):
+                comments.append({
+                    'id': f'c{self.id_prefix}_{offset + i}_{j - position}',
+                    'text': comment_texts[j],
+                    'created_utc': int(created[i] + comment_delays[j]),
+                    'score': int(comment_scores[j]),
+                    'author': f'user_{comment_authors[j]}'
+                })
+            position += num_comments[i]
+            posts.append({
+                'id': post_id,
+                'title': titles[i],
+                'text': bodies[i],
+                'created_utc': int(created[i]),
+                'score': int(scores[i]),
+                'num_comments': int(num_comments[i]),
+                'flair': FLAIRS[flairs[i]],
+                'author': f'user_{authors[i]}',
+                'comments': comments
+            })
+        return posts
+
+    def _twitter_batch(self, offset: int, size: int) -> List[Dict[str, Any]]:
+        rng = self.rng
+        created = self._timestamps(size)
+        texts = self._words(np.minimum(np.floor(rng.lognormal(2.7, 0.5, size)), 50).astype(int) + 1)
+        likes = np.floor(rng.pareto(1.2, size) * 3).astype(int)
+        retweets = np.floor(likes * rng.beta(1, 6, size)).astype(int)
+        replies = np.floor(likes * rng.beta(1, 10, size)).astype(int)
+        authors = self._authors(size)
+        hashtag_counts = rng.integers(0, 4, size)
+        hashtags = rng.integers(0, len(TWITTER_HASHTAGS), int(hashtag_counts.sum()))
+        topic = self.config['topic']
+
+        tweets = []
+        position = 0
+        for i in range(size):
+            tags = [TWITTER_HASHTAGS[k] for k in hashtags[position:position + hashtag_counts[i]]]
+            position += hashtag_counts[i]
+            if topic:
+                tags.append('#' + topic.replace(' ', ''))
+            tweets.append({
+                'id': f'tweet_{self.id_prefix}_{offset + i}',
+                'text': ' '.join([texts[i]] + tags),
+                'timestamp': datetime.fromtimestamp(int(created[i]), tz=timezone.utc).isoformat(),
+                'created_utc': int(created[i]),
+                'user': f'user_{authors[i]}',
+                'likes': int(likes[i]),
+                'retweets': int(retweets[i]),
+                'replies': int(replies[i]),
+                'hashtags': tags
+            })
+        return tweets
+
+    def batches(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Generate the corpus in batches.
+
+        Args:
+            batch_size: Records per batch
+
+        Yields:
+            Lists of posts (with nested comments) or tweets
+        """
+        make_batch = self._reddit_batch if self.kind == 'reddit' else self._twitter_batch
+        for offset in range(0, self.count, batch_size):
+            yield make_batch(offset, min(batch_size, self.count - offset))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.batches():
+            yield from batch
+
+
+def generate_posts(num_posts: int, seed: int = 42,
+                   config: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield synthetic Reddit posts in scrape format (as in ``drivingsg_data_*.json``).
+
+    Args:
+        num_posts: Number of posts
+        seed: Random seed
+        config: Overrides of DEFAULT_CONFIG
+
+    Yields:
+        Posts with nested comments
+    """
+    return iter(CorpusGenerator('reddit', num_posts, seed, config))
+
+
+CSV_COLUMNS = {
+    'reddit': ['record_type', 'id', 'post_id', 'title', 'text', 'created_utc', 'score',
+               'num_comments', 'flair', 'author'],
+    'twitter': ['id', 'text', 'timestamp', 'created_utc', 'user', 'likes', 'retweets', 'replies', 'hashtags']
+}
+
+
+def _parquet_schema(kind: str):
+    """Arrow schema of the records of a corpus kind."""
+    if kind == 'reddit':
+        comment = pyarrow.struct([('id', pyarrow.string()), ('text', pyarrow.string()),
+                                  ('created_utc', pyarrow.int64()), ('score', pyarrow.int64()),
+                                  ('author', pyarrow.string())])
+        return pyarrow.schema([('id', pyarrow.string()), ('title', pyarrow.string()),
+                               ('text', pyarrow.string()), ('created_utc', pyarrow.int64()),
+                               ('score', pyarrow.int64()), ('num_comments', pyarrow.int64()),
+                               ('flair', pyarrow.string()), ('author', pyarrow.string()),
+                               ('comments', pyarrow.list_(comment))])
+    return pyarrow.schema([('id', pyarrow.string()), ('text', pyarrow.string()),
+                           ('timestamp', pyarrow.string()), ('created_utc', pyarrow.int64()),
+                           ('user', pyarrow.string()), ('likes', pyarrow.int64()),
+                           ('retweets', pyarrow.int64()), ('replies', pyarrow.int64()),
+                           ('hashtags', pyarrow.list_(pyarrow.string()))])
+
+
+def _csv_rows(kind: str, batch: List[Dict[str, Any]]) -> Iterator[list]:
+    """Flatten records into CSV rows; Reddit comments become rows of their own."""
+    if kind == 'twitter':
+        for tweet in batch:
+            yield [tweet['id'], tweet['text'], tweet['timestamp'], tweet['created_utc'], tweet['user'],
+                   tweet['likes'], tweet['retweets'], tweet['replies'], ' '.join(tweet['hashtags'])]
+        return
+    for post in batch:
+        yield ['post', post['id'], '', post['title'], post['text'], post['created_utc'], post['score'],
+               post['num_comments'], post['flair'] or '', post['author']]
+        for comment in post['comments']:
+            yield ['comment', comment['id'], post['id'], '', comment['text'], comment['created_utc'],
+                   comment['score'], '', '', comment['author']]
+
+
+def format_for_path(file_path: str) -> str:
+    """Infer the output format from a file suffix."""
+    suffix = os.path.splitext(file_path)[1].lstrip('.').lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Cannot infer corpus format from {file_path}. Use one of: {', '.join(FORMATS)}")
+    return suffix
+
+
+def write_corpus(file_path: str, kind: str = 'reddit', count: int = 10000, fmt: Optional[str] = None,
+                 seed: int = 42, config: Optional[Dict[str, Any]] = None,
+                 batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Stream a synthetic corpus to a file.
+
+    Data goes to ``<file_path>.part`` and is renamed into place when complete.
+    JSON output uses the ``{'metadata': ..., 'posts': [...]}`` scrape layout
+    (``tweets`` for Twitter); JSONL output gets the same sidecar metadata as
+    streamed scrapes.
+
+    Args:
+        file_path: Destination path
+        kind: 'reddit' or 'twitter'
+        count: Number of posts or tweets
+        fmt: 'jsonl', 'json', 'csv' or 'parquet' (inferred from the suffix if None)
+        seed: Random seed
+        config: Overrides of DEFAULT_CONFIG
+        batch_size: Records generated and written at a time
+
+    Returns:
+        Summary with the path, format, record and comment counts, size and duration
+    """
+    fmt = fmt or format_for_path(file_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported corpus format: {fmt}. Must be one of: {', '.join(FORMATS)}")
+    if fmt == 'parquet' and pyarrow is None:
+        raise ValueError("Parquet output requires the 'pyarrow' package")
+
+    generator = CorpusGenerator(kind, count, seed, config)
+    metadata = {'generator': 'synthetic', 'kind': kind, 'seed': seed, 'config': generator.config}
+    records = comments = 0
+    first_timestamp = last_timestamp = None
+    started = time.time()
+
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    part_path = file_path + PART_SUFFIX
+
+    if fmt == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(part_path, _parquet_schema(kind))
+        output = None
+    else:
+        output = open(part_path, 'w', encoding='utf-8', newline='')
+        if fmt == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(CSV_COLUMNS[kind])
+        elif fmt == 'json':
+            output.write('{"metadata":' + json.dumps(metadata) + f',"{"posts" if kind == "reddit" else "tweets"}":[')
+
+    try:
+        for batch in generator.batches(batch_size):
+            if fmt == 'jsonl':
+                output.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in batch))
+            elif fmt == 'json':
+                output.write((',' if records else '') +
+                             ','.join(json.dumps(record, separators=(',', ':')) for record in batch))
+            elif fmt == 'csv':
+                writer.writerows(_csv_rows(kind, batch))
+            else:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=writer.schema))
+
+            records += len(batch)
+            if kind == 'reddit':
+                comments += sum(post['num_comments'] for post in batch)
+            batch_first = min(record['created_utc'] for record in batch)
+            batch_last = max(record['created_utc'] for record in batch)
+            first_timestamp = batch_first if first_timestamp is None else min(first_timestamp, batch_first)
+            last_timestamp = batch_last if last_timestamp is None else max(last_timestamp, batch_last)
+    finally:
+        if fmt == 'json':
+            output.write(']}')
+        if output is not None:
+            output.close()
+        else:
+            writer.close()
+
+    os.replace(part_path, file_path)
+    size = os.path.getsize(file_path)
+    seconds = time.time() - started
+
+    if fmt == 'jsonl':
+        metadata.update({'format': 'jsonl', 'compression': None, 'records': records,
+                         'first_timestamp': first_timestamp, 'last_timestamp': last_timestamp,
+                         'started': datetime.fromtimestamp(started).isoformat(),
+                         'finished': datetime.now().isoformat(), 'complete': True, 'size': size})
+        with open(metadata_path(file_path), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+
+    logger.info(f"Generated {records} {kind} records ({size / 1e6:.1f} MB) in {seconds:.1f}s: {file_path}")
+    return {
+        'file_path': file_path,
+        'format': fmt,
+        'kind': kind,
+        'records': records,
+        'comments': comments,
+        'size': size,
+        'seconds': seconds
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Generate a synthetic Reddit or Twitter corpus')
+    parser.add_argument('--kind', choices=KINDS, default='reddit')
+    parser.add_argument('--count', type=int, default=10000, help='Number of posts or tweets')
+    parser.add_argument('--output', required=True, help='Output file; the suffix selects the format')
+    parser.add_argument('--format', choices=FORMATS, help='Output format (overrides the suffix)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--days', type=int, default=DEFAULT_CONFIG['days'])
+    parser.add_argument('--start', default=DEFAULT_CONFIG['start'], help='First day (YYYY-MM-DD, UTC)')
+    parser.add_argument('--topic', help='Word mixed into every record')
+    args = parser.parse_args(argv)
+
+    summary = write_corpus(args.output, args.kind, args.count, args.format, args.seed,
+                           {'days': args.days, 'start': args.start, 'topic': args.topic})
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""
+Indexed catalog of dataset and analysis files.
+
+The listing endpoints used to scan and stat every file in a directory, then sort
+in Python, on every request. The catalog keeps one SQLite row per file and only
+rescans a directory when its mtime changes (files were added, removed or
+replaced) or the last scan is older than ``CATALOG_MAX_AGE`` seconds. Listings
+are then served from indexes with keyset (cursor) pagination, so the first page
+of a directory with thousands of files is a single indexed query.
+
+HTTP validators cannot wait for the ``max_age`` rescan: ``FileCatalog.validator``
+stats the files of each directory and rescans it when one was rewritten in place.
+"""
+
+import os
+import json
+import time
+import base64
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
+
+from src.data.jsonl_io import is_jsonl_path, is_auxiliary_path
+from src.analysis.section_store import is_sections_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = 'catalog.db'
+CATALOG_MAX_AGE = float(os.getenv('CATALOG_MAX_AGE', '60'))
+MAX_PAGE_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_files_dir_mtime ON files (directory, mtime, path);
+CREATE INDEX IF NOT EXISTS idx_files_dir_name ON files (directory, filename, path);
+CREATE INDEX IF NOT EXISTS idx_files_dir_size ON files (directory, size, path);
+
+CREATE TABLE IF NOT EXISTS directories (
+    directory TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    scanned_at REAL
+);
+"""
+
+# Public sort keys and the columns backing them; aliases match the field names
+# the different listing endpoints already return
+SORT_COLUMNS = {
+    'modified': 'mtime',
+    'created': 'mtime',
+    'updated': 'mtime',
+    'date': 'mtime',
+    'name': 'filename',
+    'filename': 'filename',
+    'size': 'size'
+}
+
+
+def file_kind(filename: str) -> str:
+    """
+    Classify a file for filtering listings.
+
+    Returns:
+        'auxiliary' for JSONL sidecars and partial files, 'jsonl', 'sections',
+        or the lowercased extension
+    """
+    if is_auxiliary_path(filename):
+        return 'auxiliary'
+    if is_jsonl_path(filename):
+        return 'jsonl'
+    if is_sections_path(filename):
+        return 'sections'
+    return os.path.splitext(filename)[1].lstrip('.').lower()
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort position of the last returned row as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma separated ``fields`` parameter; None or empty selects every field."""
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    return fields or None
+
+
+def project(entries: Iterable[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Keep only the requested fields of each entry."""
+    if not fields:
+        return list(entries)
+    return [{field: entry[field] for field in fields if field in entry} for entry in entries]
+
+
+def parse_listing_args(args: Mapping[str, Any], default_sort: str = 'modified') -> Dict[str, Any]:
+    """
+    Read the pagination, sort and projection parameters of a listing request.
+
+    Args:
+        args: Request arguments (``sort``, ``order``, ``limit``, ``cursor``, ``fields``)
+        default_sort: Sort key used when none is given
+
+    Returns:
+        Keyword arguments for FileCatalog.page plus ``fields``
+    """
+    sort = args.get('sort') or default_sort
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Unsupported sort key: {sort}")
+
+    order = (args.get('order') or 'desc').lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Unsupported sort order: {order}")
+
+    limit = args.get('limit')
+    if limit is not None and limit != '':
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid limit: {limit}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    else:
+        limit = None
+
+    return {
+        'sort': sort,
+        'order': order,
+        'limit': limit,
+        'cursor': args.get('cursor') or None,
+        'fields': parse_fields(args.get('fields'))
+    }
+
+
+class FileCatalog:
+    """SQLite index of the files in a set of data directories."""
+
+    def __init__(self, db_path: str, max_age: float = CATALOG_MAX_AGE):
+        """
+        Initialize the catalog.
+
+        Args:
+            db_path: Path to the SQLite database (created on first use)
+            max_age: Seconds after which a directory is rescanned even if its mtime is unchanged
+        """
+        self.db_path = db_path
+        self.max_age = max_age
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per call keeps the catalog safe across request threads."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def sync(self, directory: str, force: bool = False) -> bool:
+        """
+        Refresh the rows of one directory if it may have changed.
+
+        Files rewritten in place do not change their directory's mtime; they
+        are picked up by the ``max_age`` rescan, with ``force``, or when
+        ``validator`` finds them rewritten.
+
+        Args:
+            directory: Directory to index
+            force: Rescan even if the directory looks unchanged
+
+        Returns:
+            True if the directory was rescanned
+        """
+        directory = os.path.abspath(directory)
+        if not os.path.isdir(directory):
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM files WHERE directory = ?", (directory,))
+                conn.execute("DELETE FROM directories WHERE directory = ?", (directory,))
+            return False
+
+        dir_mtime_ns = os.stat(directory).st_mtime_ns
+        now = time.time()
+
+        with closing(self._connect()) as conn:
+            if not force:
+                row = conn.execute(
+                    "SELECT mtime_ns, scanned_at FROM directories WHERE directory = ?", (directory,)
+                ).fetchone()
+                if row and row['mtime_ns'] == dir_mtime_ns and now - row['scanned_at'] < self.max_age:
+                    return False
+
+            rows = []
+            for entry in os.scandir(directory):
+                if not entry.is_file():
+                    continue
+                stats = entry.stat()
+                rows.append((entry.path, directory, entry.name, file_kind(entry.name),
+                             stats.st_size, stats.st_mtime, stats.st_mtime_ns))
+
+            with conn:
+                conn.execute("DELETE FROM files WHERE directory = ?", (directory,))
+                conn.executemany(
+                    "INSERT INTO files (path, directory, filename, kind, size, mtime, mtime_ns) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO directories (directory, mtime_ns, scanned_at) VALUES (?, ?, ?)",
+                    (directory, dir_mtime_ns, now)
+                )
+
+        logger.info(f"Catalog indexed {len(rows)} files in {directory}")
+        return True
+
+    def _rewritten(self, directory: str) -> bool:
+        """Check whether a file of an indexed directory no longer matches its row."""
+        with closing(self._connect()) as conn:
+            indexed = {row['path']: (row['size'], row['mtime_ns']) for row in conn.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE directory = ?", (directory,)
+            )}
+        for entry in os.scandir(directory):
+            if entry.is_file():
+                stats = entry.stat()
+                if indexed.get(entry.path) != (stats.st_size, stats.st_mtime_ns):
+                    return True
+        return False
+
+    def sync_files(self, paths: Iterable[str]) -> List[str]:
+        """
+        Index individual files that are listed outside their directory.
+
+        Each file is stat'ed on every call (files such as the post store
+        database are rewritten in place), and missing files are dropped.
+
+        Args:
+            paths: Files to index
+
+        Returns:
+            Absolute paths of the files that exist
+        """
+        indexed = []
+        with closing(self._connect()) as conn, conn:
+            for path in paths:
+                path = os.path.abspath(path)
+                if not os.path.isfile(path):
+                    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                    continue
+                stats = os.stat(path)
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, directory, filename, kind, size, mtime, mtime_ns) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, os.path.dirname(path), os.path.basename(path), file_kind(path),
+                     stats.st_size, stats.st_mtime, stats.st_mtime_ns)
+                )
+                indexed.append(path)
+        return indexed
+
+    def page(self, directories: Iterable[str], kinds: Optional[Iterable[str]] = None,
+             sort: str = 'modified', order: str = 'desc', limit: Optional[int] = None,
+             cursor: Optional[str] = None, files: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Get one page of files from the given directories.
+
+        Args:
+            directories: Directories to list (synced first if they changed)
+            kinds: File kinds to include (see file_kind); None includes all but auxiliary files
+            sort: Sort key (see SORT_COLUMNS)
+            order: 'asc' or 'desc'
+            limit: Page size; None returns every remaining file
+            cursor: ``next_cursor`` of the previous page
+            files: Individual files listed alongside the directories, whatever their kind
+
+        Returns:
+            Dictionary with ``files`` (path, directory, filename, kind, size, mtime),
+            ``next_cursor`` (None on the last page) and ``total``
+        """
+        directories = [os.path.abspath(directory) for directory in directories]
+        for directory in directories:
+            self.sync(directory)
+        files = self.sync_files(files or [])
+
+        column = SORT_COLUMNS[sort]
+        descending = order == 'desc'
+
+        scope = f"directory IN ({','.join('?' * len(directories))})"
+        params = list(directories)
+        if kinds is not None:
+            kinds = list(kinds)
+            scope += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        else:
+            scope += " AND kind != 'auxiliary'"
+        if files:
+            scope = f"({scope}) OR path IN ({','.join('?' * len(files))})"
+            params.extend(files)
+        where = [f"({scope})"]
+
+        with closing(self._connect()) as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM files WHERE {' AND '.join(where)}", params
+            ).fetchone()[0]
+
+            # Keyset pagination: continue strictly after the (sort value, path) of the cursor
+            if cursor:
+                where.append(f"({column}, path) {'<' if descending else '>'} (?, ?)")
+                params.extend(decode_cursor(cursor))
+
+            direction = 'DESC' if descending else 'ASC'
+            query = (f"SELECT path, directory, filename, kind, size, mtime FROM files "
+                     f"WHERE {' AND '.join(where)} ORDER BY {column} {direction}, path {direction}")
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit + 1)
+            rows = [dict(row) for row in conn.execute(query, params)]
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][column], rows[-1]['path']])
+
+        return {'files': rows, 'next_cursor': next_cursor, 'total': total}
+
+    def validator(self, directories: Iterable[str], extra: Any = None,
+                  files: Optional[Iterable[str]] = None) -> Tuple[str, Optional[float]]:
+        """
+        Build an HTTP validator for a listing from the indexed rows.
+
+        Same shape as the validators in ``src.web.http_cache``. Files are
+        stat'ed but not re-indexed unless one was rewritten in place, and the
+        directories' own mtimes count towards the newest mtime, so neither
+        rewrites nor deletions are answered with a stale 304.
+
+        Args:
+            directories: Directories the listing is built from
+            extra: Additional version information, e.g. the post store version
+            files: Individual files listed alongside the directories
+
+        Returns:
+            Tuple of (validator seed, newest mtime or None)
+        """
+        directories = [os.path.abspath(directory) for directory in directories]
+        dir_stamps = []
+        for directory in directories:
+            if not self.sync(directory) and os.path.isdir(directory) and self._rewritten(directory):
+                self.sync(directory, force=True)
+            if os.path.isdir(directory):
+                dir_stamps.append(os.stat(directory))
+        files = self.sync_files(files or [])
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0), MAX(mtime), MAX(mtime_ns) FROM files "
+                f"WHERE directory IN ({','.join('?' * len(directories))}) "
+                f"OR path IN ({','.join('?' * len(files))})", directories + files
+            ).fetchone()
+        newest = max([stats.st_mtime for stats in dir_stamps] + ([row[2]] if row[2] is not None else []),
+                     default=None)
+        dir_mtimes = ':'.join(str(stats.st_mtime_ns) for stats in dir_stamps)
+        return f"{extra!r}|{'|'.join(directories + files)}|{dir_mtimes}|{row[0]}:{row[1]}:{row[3]}", newest
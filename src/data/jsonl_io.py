@@ -0,0 +1,271 @@
+"""
+Streaming JSONL storage for scraped posts.
+
+Scrapes are written one compact JSON object per line while they run, so memory
+stays flat regardless of the number of posts and a crash only loses the post
+that was being fetched. Output is written to a ``.part`` file, optionally
+compressed with gzip or zstd, and atomically renamed into place when the writer
+is closed, together with a sidecar metadata file.
+"""
+
+import os
+import gzip
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional
+    zstandard = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JSONL_SUFFIX = '.jsonl'
+PART_SUFFIX = '.part'
+META_SUFFIX = '.meta.json'
+
+COMPRESSION_SUFFIXES = {
+    None: '',
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+
+def _normalize_compression(compression: Optional[str]) -> Optional[str]:
+    """Map user supplied compression names onto the supported codecs."""
+    if compression in (None, '', 'none'):
+        return None
+    compression = compression.lower()
+    if compression == 'gz':
+        compression = 'gzip'
+    if compression == 'zst':
+        compression = 'zstd'
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compression}. Must be one of: gzip, zstd")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+    return compression
+
+
+def jsonl_filename(stem: str, compression: Optional[str] = None) -> str:
+    """
+    Build a JSONL filename for the given stem and compression.
+
+    Args:
+        stem: Filename without extension, e.g. ``drivingsg_data_20250318_143009``
+        compression: None, 'gzip' or 'zstd'
+
+    Returns:
+        Filename such as ``drivingsg_data_20250318_143009.jsonl.gz``
+    """
+    return stem + JSONL_SUFFIX + COMPRESSION_SUFFIXES[_normalize_compression(compression)]
+
+
+def is_jsonl_path(file_path: str) -> bool:
+    """Check whether a path points at a (possibly compressed) JSONL file."""
+    return any(file_path.endswith(JSONL_SUFFIX + suffix) for suffix in COMPRESSION_SUFFIXES.values())
+
+
+def is_auxiliary_path(file_path: str) -> bool:
+    """Check whether a path is a sidecar or in-progress file rather than a dataset."""
+    return file_path.endswith(META_SUFFIX) or file_path.endswith(PART_SUFFIX)
+
+
+def metadata_path(file_path: str) -> str:
+    """Get the sidecar metadata path for a JSONL file."""
+    return file_path + META_SUFFIX
+
+
+def read_metadata(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the sidecar metadata written alongside a JSONL file.
+
+    Args:
+        file_path: Path to the JSONL file (not the sidecar)
+
+    Returns:
+        Metadata dictionary, or None if there is no readable sidecar
+    """
+    try:
+        with open(metadata_path(file_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _open_binary(file_path: str, mode: str, compression: Optional[str]):
+    """Open a binary stream, wrapping it in the requested codec."""
+    raw = open(file_path, mode)
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode=mode), raw
+    if compression == 'zstd':
+        if mode == 'wb':
+            return zstandard.ZstdCompressor().stream_writer(raw), raw
+        return zstandard.ZstdDecompressor().stream_reader(raw), raw
+    return raw, raw
+
+
+def _compression_for_path(file_path: str) -> Optional[str]:
+    """Infer the codec of a JSONL file from its suffix."""
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if suffix and file_path.endswith(suffix):
+            return compression
+    return None
+
+
+class JsonlWriter:
+    """Incrementally write records to a JSONL file with atomic finalisation."""
+
+    def __init__(self, file_path: str, compression: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None, timestamp_field: str = 'created_utc'):
+        """
+        Open a JSONL writer.
+
+        Args:
+            file_path: Final path of the JSONL file; data goes to ``<file_path>.part`` until close
+            compression: None, 'gzip' or 'zstd'
+            metadata: Extra fields stored in the sidecar metadata file
+            timestamp_field: Record field used to track the date range of the output
+        """
+        self.file_path = file_path
+        self.compression = _normalize_compression(compression)
+        self.metadata = dict(metadata or {})
+        self.timestamp_field = timestamp_field
+        self.records = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.started = datetime.now().isoformat()
+        self.closed = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        self.part_path = file_path + PART_SUFFIX
+        self._stream, self._raw = _open_binary(self.part_path, 'wb', self.compression)
+
+    def write(self, record: Dict[str, Any]):
+        """
+        Append a record and flush it to disk.
+
+        Args:
+            record: JSON serialisable dictionary
+        """
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        self._stream.write(line.encode('utf-8') + b'\n')
+        self._stream.flush()
+        self._raw.flush()
+        self.records += 1
+
+        timestamp = record.get(self.timestamp_field)
+        if timestamp is not None:
+            if self.first_timestamp is None or timestamp < self.first_timestamp:
+                self.first_timestamp = timestamp
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+
+    def close(self, complete: bool = True) -> str:
+        """
+        Finalise the file: rename it into place and write the sidecar metadata.
+
+        Args:
+            complete: False if the scrape stopped early; recorded in the metadata
+
+        Returns:
+            Path to the finalised JSONL file
+        """
+        if self.closed:
+            return self.file_path
+        self.closed = True
+
+        self._stream.close()
+        if self._raw is not self._stream:
+            self._raw.close()
+        os.replace(self.part_path, self.file_path)
+
+        metadata = dict(self.metadata)
+        metadata.update({
+            'format': 'jsonl',
+            'compression': self.compression,
+            'records': self.records,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'started': self.started,
+            'finished': datetime.now().isoformat(),
+            'complete': complete,
+            'size': os.path.getsize(self.file_path)
+        })
+        meta_path = metadata_path(self.file_path)
+        with open(meta_path + PART_SUFFIX, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(meta_path + PART_SUFFIX, meta_path)
+
+        logger.info(f"Wrote {self.records} records to {self.file_path}")
+        return self.file_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Keep whatever was scraped before the failure, flagged as incomplete
+        self.close(complete=exc_type is None)
+        return False
+
+
+def iter_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the records of a (possibly compressed) JSONL file.
+
+    Args:
+        file_path: Path to the JSONL file
+
+    Yields:
+        One dictionary per line
+    """
+    stream, raw = _open_binary(file_path, 'rb', _compression_for_path(file_path))
+    try:
+        buffer = b''
+        while True:
+            chunk = stream.read(1 << 16)
+            if not chunk:
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if buffer.strip():
+            yield json.loads(buffer)
+    finally:
+        stream.close()
+        if raw is not stream:
+            raw.close()
+
+
+def iter_posts(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over posts stored either as JSONL or as a legacy JSON document.
+
+    Legacy documents are a list of posts or a ``{'metadata': ..., 'posts': [...]}`` object.
+
+    Args:
+        file_path: Path to the scrape file
+
+    Yields:
+        Post dictionaries
+    """
+    if is_jsonl_path(file_path):
+        yield from iter_jsonl(file_path)
+        return
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('posts', [])
+    yield from data
+
+
+def load_posts(file_path: str) -> List[Dict[str, Any]]:
+    """Load every post of a scrape file into a list."""
+    return list(iter_posts(file_path))
@@ -0,0 +1,719 @@
+"""
+Deduplicated post store.
+
+Scrapes in ``data/reddit`` overlap heavily, so analysing every file double-counts
+posts. The post store merges every scrape into a single SQLite database keyed by
+post id. Re-ingesting a post keeps the most recently scraped score and comment
+count, and files that have already been ingested are skipped, so syncing the
+store after each scrape only costs the new file.
+
+Ids are only unique within a source, so posts of other sources (e.g. Twitter
+CSVs) are keyed as ``<source>:<id>``, and each source has its own version
+counter: ingesting one source never invalidates analyses of another.
+
+Posts and comments are also indexed with SQLite FTS5 so the corpus can be
+searched with ranked full-text queries.
+"""
+
+import os
+import re
+import csv
+import time
+import sqlite3
+import logging
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+from src.data.jsonl_io import iter_posts, is_jsonl_path, is_auxiliary_path, read_metadata
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STORE_FILENAME = 'posts.db'
+# Source whose ids are stored as scraped; other sources are namespaced (see store_id)
+DEFAULT_SOURCE = 'reddit'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    title TEXT,
+    text TEXT,
+    created_utc REAL,
+    score INTEGER,
+    num_comments INTEGER,
+    flair TEXT,
+    author TEXT,
+    scraped_at REAL,
+    source_file TEXT,
+    added_version INTEGER DEFAULT 0,
+    changed_version INTEGER DEFAULT 0,
+    text_version INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_posts_source_created ON posts (source, created_utc);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id TEXT PRIMARY KEY,
+    post_id TEXT NOT NULL,
+    text TEXT,
+    created_utc REAL,
+    score INTEGER,
+    author TEXT,
+    scraped_at REAL,
+    added_version INTEGER DEFAULT 0,
+    text_version INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_comments_post ON comments (post_id);
+
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    records INTEGER,
+    ingested_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS store_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Store versions at which each row was added and last changed, so analyses can
+# be updated with only the rows ingested since; added to older stores on open
+VERSION_COLUMNS = {
+    'posts': ('added_version', 'changed_version', 'text_version'),
+    'comments': ('added_version', 'text_version')
+}
+
+VERSION_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_posts_added ON posts (added_version);
+CREATE INDEX IF NOT EXISTS idx_posts_changed ON posts (changed_version);
+CREATE INDEX IF NOT EXISTS idx_comments_added ON comments (added_version);
+CREATE INDEX IF NOT EXISTS idx_comments_text ON comments (text_version);
+"""
+
+# External-content FTS5 indexes over the posts and comments tables, kept in step
+# by triggers. Rowids of tables without an INTEGER PRIMARY KEY can change on
+# VACUUM, so the store is never vacuumed; rebuild_index() resyncs if needed.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    title, text, content='posts', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+    text, content='comments', content_rowid='rowid', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF title, text ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+    INSERT INTO posts_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS comments_fts_insert AFTER INSERT ON comments BEGIN
+    INSERT INTO comments_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_fts_delete AFTER DELETE ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_fts_update AFTER UPDATE OF text ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO comments_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+SEARCH_POSTS = """
+SELECT 'post' AS kind, p.id AS doc_id, p.id AS post_id, p.source, p.title, p.text,
+       p.created_utc, p.score, bm25(posts_fts, 2.0, 1.0) AS rank
+FROM posts_fts JOIN posts p ON p.rowid = posts_fts.rowid
+WHERE posts_fts MATCH ?{filters}
+"""
+
+SEARCH_COMMENTS = """
+SELECT 'comment' AS kind, c.id AS doc_id, c.post_id, p.source, p.title, c.text,
+       c.created_utc, c.score, bm25(comments_fts) AS rank
+FROM comments_fts JOIN comments c ON c.rowid = comments_fts.rowid
+JOIN posts p ON p.id = c.post_id
+WHERE comments_fts MATCH ?{filters}
+"""
+
+# Column names used by the CSV exports of each source
+CSV_FIELDS = {
+    'created_utc': ('created_utc', 'timestamp'),
+    'score': ('score', 'upvotes', 'likes'),
+    'num_comments': ('num_comments', 'comments'),
+    'author': ('author', 'user')
+}
+
+# Newer scrapes win; an older file ingested later must not roll scores back.
+# Parameter 12 (posts) / 8 (comments) is the store version of the ingest, which
+# SET evaluates against the old row to mark what changed
+UPSERT_POST = """
+INSERT INTO posts (id, source, title, text, created_utc, score, num_comments, flair, author, scraped_at, source_file,
+                   added_version, changed_version, text_version)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?12, ?12, ?12)
+ON CONFLICT(id) DO UPDATE SET
+    text_version = CASE WHEN posts.title IS NOT excluded.title OR posts.text IS NOT excluded.text
+                        THEN excluded.text_version ELSE posts.text_version END,
+    changed_version = CASE WHEN posts.title IS NOT excluded.title OR posts.text IS NOT excluded.text
+                             OR posts.score IS NOT excluded.score OR posts.num_comments IS NOT excluded.num_comments
+                           THEN excluded.changed_version ELSE posts.changed_version END,
+    title = excluded.title,
+    text = excluded.text,
+    score = excluded.score,
+    num_comments = excluded.num_comments,
+    flair = excluded.flair,
+    scraped_at = excluded.scraped_at,
+    source_file = excluded.source_file
+WHERE excluded.scraped_at >= posts.scraped_at
+"""
+
+UPSERT_COMMENT = """
+INSERT INTO comments (id, post_id, text, created_utc, score, author, scraped_at, added_version, text_version)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?8, ?8)
+ON CONFLICT(id) DO UPDATE SET
+    text_version = CASE WHEN comments.text IS NOT excluded.text
+                        THEN excluded.text_version ELSE comments.text_version END,
+    text = excluded.text,
+    score = excluded.score,
+    scraped_at = excluded.scraped_at
+WHERE excluded.scraped_at >= comments.scraped_at
+"""
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """
+    Normalise a timestamp to seconds since the epoch.
+
+    Scrapes store ``created_utc`` either as epoch floats or ISO 8601 strings.
+
+    Args:
+        value: Epoch number, numeric string or ISO 8601 string
+
+    Returns:
+        Epoch seconds, or None if the value cannot be parsed
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+def store_id(source: str, record_id: Any) -> str:
+    """
+    Key of a post or comment in the store.
+
+    Ids are only unique within a source, so every source but DEFAULT_SOURCE
+    is prefixed with its name (Reddit ids stay unprefixed for existing stores).
+
+    Args:
+        source: Data source the record came from
+        record_id: Id in the scrape
+
+    Returns:
+        Store key, e.g. ``1j5x2ab`` or ``twitter:1234``
+    """
+    record_id = str(record_id)
+    if source == DEFAULT_SOURCE:
+        return record_id
+    return f"{source}:{record_id}"
+
+
+def _version_key(source: str) -> str:
+    """store_info key of a source's version counter."""
+    return f"version:{source}"
+
+
+def read_version(conn: sqlite3.Connection, source: str) -> int:
+    """
+    Read the version of a source on an open store connection.
+
+    Args:
+        conn: Connection to the store (rows as sqlite3.Row)
+        source: Data source
+
+    Returns:
+        Current version of the source (0 before its first ingest)
+    """
+    row = conn.execute("SELECT value FROM store_info WHERE key = ?", (_version_key(source),)).fetchone()
+    return int(row['value']) if row else 0
+
+
+def query_terms(query: str) -> List[str]:
+    """Split a free-text search query into lower-case terms."""
+    return re.findall(r'\w+', query.lower())
+
+
+def _fts_query(query: str) -> str:
+    """Quote each term so user input cannot inject FTS5 query syntax."""
+    return ' '.join(f'"{term}"' for term in query_terms(query))
+
+
+def _iter_csv_posts(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Read a CSV export (e.g. scraped tweets) as post dictionaries."""
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            if not row.get('id'):
+                continue
+            post = {'id': row['id'], 'title': row.get('title', ''), 'text': row.get('text', '')}
+            for field, candidates in CSV_FIELDS.items():
+                value = next((row[name] for name in candidates if row.get(name)), None)
+                post[field] = value
+            post['score'] = int(post['score']) if post['score'] else 0
+            post['num_comments'] = int(post['num_comments']) if post['num_comments'] else 0
+            yield post
+
+
+def _scrape_time(file_path: str) -> float:
+    """Work out when a scrape file was produced."""
+    metadata = read_metadata(file_path) if is_jsonl_path(file_path) else None
+    if metadata and metadata.get('finished'):
+        return to_epoch(metadata['finished'])
+
+    # Legacy files carry the scrape time in the filename, e.g. drivingsg_data_20250318_143009.json
+    match = re.search(r'(\d{8}_\d{6})', os.path.basename(file_path))
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp()
+    return os.path.getmtime(file_path)
+
+
+def _post_dict(conn: sqlite3.Connection, row: sqlite3.Row) -> Dict[str, Any]:
+    """Build a scrape-format post, with its comments, from a posts row."""
+    comments = conn.execute(
+        "SELECT id, text, created_utc, score, author FROM comments WHERE post_id = ? ORDER BY created_utc",
+        (row['id'],)
+    ).fetchall()
+    return {
+        'id': row['id'],
+        'title': row['title'] or '',
+        'text': row['text'] or '',
+        'created_utc': row['created_utc'],
+        'score': row['score'] or 0,
+        'num_comments': row['num_comments'] or 0,
+        'flair': row['flair'],
+        'author': row['author'],
+        'comments': [dict(comment) for comment in comments]
+    }
+
+
+class PostStore:
+    """SQLite-backed store of deduplicated posts and comments."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the post store.
+
+        Args:
+            db_path: Path to the SQLite database file; created on first write
+        """
+        self.db_path = db_path
+        self.fts_enabled = None
+        self.migrated = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per call keeps the store safe across request threads."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        if not self.migrated:
+            self._migrate(conn)
+        self._ensure_fts(conn)
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Bring stores created by older versions up to date."""
+        with conn:
+            # Row version columns
+            for table, columns in VERSION_COLUMNS.items():
+                existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for column in columns:
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER DEFAULT 0")
+            conn.executescript(VERSION_INDEXES)
+
+            # Ids of other sources were stored unprefixed and could collide with Reddit's
+            unprefixed = "source != ? AND substr(id, 1, length(source) + 1) != source || ':'"
+            conn.execute(
+                "UPDATE OR IGNORE comments SET "
+                "id = (SELECT p.source FROM posts p WHERE p.id = comments.post_id) || ':' || id, "
+                "post_id = (SELECT p.source FROM posts p WHERE p.id = comments.post_id) || ':' || post_id "
+                f"WHERE post_id IN (SELECT id FROM posts WHERE {unprefixed})", (DEFAULT_SOURCE,)
+            )
+            conn.execute(f"UPDATE OR IGNORE posts SET id = source || ':' || id WHERE {unprefixed}",
+                         (DEFAULT_SOURCE,))
+
+            # The single store-wide version becomes the starting point of every source's version
+            row = conn.execute("SELECT value FROM store_info WHERE key = 'version'").fetchone()
+            if row:
+                for source_row in conn.execute("SELECT DISTINCT source FROM posts").fetchall():
+                    conn.execute("INSERT OR IGNORE INTO store_info (key, value) VALUES (?, ?)",
+                                 (_version_key(source_row['source']), row['value']))
+                conn.execute("DELETE FROM store_info WHERE key = 'version'")
+        self.migrated = True
+
+    def _ensure_fts(self, conn: sqlite3.Connection):
+        """Create the full-text indexes, backfilling them for stores created without one."""
+        if self.fts_enabled is False:
+            return
+        try:
+            created = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'posts_fts'"
+            ).fetchone() is None
+            conn.executescript(FTS_SCHEMA)
+            if created:
+                self._rebuild_fts(conn)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, falling back to substring search: {str(e)}")
+            self.fts_enabled = False
+
+    def _rebuild_fts(self, conn: sqlite3.Connection):
+        """Rebuild both full-text indexes from the content tables."""
+        with conn:
+            conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO comments_fts (comments_fts) VALUES ('rebuild')")
+
+    def rebuild_index(self):
+        """Resynchronise the full-text indexes with the stored posts and comments."""
+        with closing(self._connect()) as conn:
+            if self.fts_enabled:
+                self._rebuild_fts(conn)
+
+    def exists(self) -> bool:
+        """Check whether the store has been created."""
+        return os.path.exists(self.db_path)
+
+    def is_store_path(self, file_path: str) -> bool:
+        """Check whether a dataset path refers to this store."""
+        return os.path.realpath(file_path) == os.path.realpath(self.db_path)
+
+    def version(self, source: str = DEFAULT_SOURCE) -> int:
+        """Counter bumped whenever ingestion changes the posts of a source."""
+        if not self.exists():
+            return 0
+        with closing(self._connect()) as conn:
+            return read_version(conn, source)
+
+    def ingest_file(self, file_path: str, source: str = DEFAULT_SOURCE, force: bool = False) -> int:
+        """
+        Merge a scrape file into the store.
+
+        Args:
+            file_path: Path to a JSON, JSONL or CSV scrape file
+            source: Data source the posts came from
+            force: Re-ingest even if the file is unchanged since the last ingest
+
+        Returns:
+            Number of posts read from the file (0 if it was skipped)
+        """
+        stats = os.stat(file_path)
+        abs_path = os.path.abspath(file_path)
+
+        with closing(self._connect()) as conn:
+            if not force:
+                row = conn.execute(
+                    "SELECT size, mtime FROM ingested_files WHERE path = ?", (abs_path,)
+                ).fetchone()
+                if row and row['size'] == stats.st_size and row['mtime'] == stats.st_mtime:
+                    return 0
+
+            scraped_at = _scrape_time(file_path)
+            records = 0
+            posts = _iter_csv_posts(file_path) if file_path.endswith('.csv') else iter_posts(file_path)
+            with conn:
+                # Claim the source's next version up front so the rows written below are tagged with it
+                version_key = _version_key(source)
+                conn.execute(
+                    "INSERT INTO store_info (key, value) VALUES (?, '1') "
+                    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1", (version_key,)
+                )
+                version = read_version(conn, source)
+                changes_before = conn.total_changes
+                for post in posts:
+                    post_id = store_id(source, post['id'])
+                    conn.execute(UPSERT_POST, (
+                        post_id,
+                        source,
+                        post.get('title'),
+                        post.get('text'),
+                        to_epoch(post.get('created_utc')),
+                        post.get('score'),
+                        post.get('num_comments'),
+                        post.get('flair'),
+                        post.get('author'),
+                        scraped_at,
+                        abs_path,
+                        version
+                    ))
+                    conn.executemany(UPSERT_COMMENT, [
+                        (
+                            store_id(source, comment['id']),
+                            post_id,
+                            comment.get('text'),
+                            to_epoch(comment.get('created_utc')),
+                            comment.get('score'),
+                            comment.get('author'),
+                            scraped_at,
+                            version
+                        )
+                        for comment in post.get('comments', [])
+                    ])
+                    records += 1
+                # Upserts older than the stored rows are rejected and change nothing
+                changed = conn.total_changes > changes_before
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO ingested_files (path, size, mtime, records, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                    (abs_path, stats.st_size, stats.st_mtime, records, time.time())
+                )
+                if not changed:
+                    conn.execute("UPDATE store_info SET value = ? WHERE key = ?", (str(version - 1), version_key))
+
+        logger.info(f"Ingested {records} posts from {file_path} into {self.db_path}")
+        return records
+
+    def sync_directory(self, directory: str, source: str = DEFAULT_SOURCE,
+                       include_csv: bool = False) -> Dict[str, int]:
+        """
+        Ingest every new or changed scrape file in a directory.
+
+        Args:
+            directory: Directory containing JSON/JSONL scrape files
+            source: Data source the posts came from
+            include_csv: Also ingest CSV exports (used for Twitter scrapes)
+
+        Returns:
+            Dictionary with the number of files and posts ingested
+        """
+        files_ingested = 0
+        posts_ingested = 0
+        if not os.path.exists(directory):
+            return {'files': 0, 'posts': 0}
+
+        for filename in sorted(os.listdir(directory)):
+            file_path = os.path.join(directory, filename)
+            is_csv = include_csv and filename.endswith('.csv')
+            if is_auxiliary_path(file_path) or not (is_jsonl_path(file_path) or filename.endswith('.json') or is_csv):
+                continue
+            try:
+                records = self.ingest_file(file_path, source)
+            except (OSError, ValueError, KeyError, TypeError, csv.Error) as e:
+                logger.warning(f"Skipping {file_path}: {str(e)}")
+                continue
+            if records:
+                files_ingested += 1
+                posts_ingested += records
+
+        return {'files': files_ingested, 'posts': posts_ingested}
+
+    def iter_posts(self, source: str = 'reddit', since: Optional[float] = None,
+                   until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over deduplicated posts in the same shape as a scrape file.
+
+        Args:
+            source: Data source to read
+            since: Only posts created at or after this epoch time
+            until: Only posts created before this epoch time
+
+        Yields:
+            Post dictionaries with their comments
+        """
+        query = "SELECT * FROM posts WHERE source = ?"
+        params: List[Any] = [source]
+        if since is not None:
+            query += " AND created_utc >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND created_utc < ?"
+            params.append(until)
+        query += " ORDER BY created_utc"
+
+        with closing(self._connect()) as conn:
+            for row in conn.execute(query, params):
+                yield _post_dict(conn, row)
+
+    def load_posts(self, source: str = 'reddit') -> List[Dict[str, Any]]:
+        """Load every deduplicated post of a source into a list."""
+        return list(self.iter_posts(source))
+
+    def changes_since(self, version: int, source: str = DEFAULT_SOURCE) -> Dict[str, Any]:
+        """
+        Get what ingestion changed after a store version.
+
+        Args:
+            version: Store version an earlier analysis was computed at
+            source: Data source to read
+
+        Returns:
+            Dictionary with the current ``version``; ``posts``: new posts with
+            their comments, followed by ``comments_only`` stubs carrying the new
+            comments of older posts; ``updated``: older posts whose score or
+            comment count changed; and ``text_changed``: whether the title or
+            text of an older post or comment changed, which additive updates
+            cannot express
+        """
+        with closing(self._connect()) as conn:
+            # One read transaction: every query sees the same snapshot of the store
+            conn.execute('BEGIN')
+            current = read_version(conn, source)
+            text_changed = conn.execute(
+                "SELECT 1 FROM posts WHERE source = ? AND text_version > ? AND added_version <= ? LIMIT 1",
+                (source, version, version)
+            ).fetchone() is not None or conn.execute(
+                "SELECT 1 FROM comments c JOIN posts p ON p.id = c.post_id "
+                "WHERE p.source = ? AND c.text_version > ? AND c.added_version <= ? LIMIT 1",
+                (source, version, version)
+            ).fetchone() is not None
+
+            updated = [dict(row) for row in conn.execute(
+                "SELECT id, score, num_comments FROM posts "
+                "WHERE source = ? AND changed_version > ? AND added_version <= ?",
+                (source, version, version)
+            )]
+            for post in updated:
+                post['score'] = post['score'] or 0
+                post['num_comments'] = post['num_comments'] or 0
+
+            stubs = {}
+            for row in conn.execute(
+                "SELECT c.id, c.post_id, c.text, c.created_utc, c.score, c.author, p.created_utc AS post_created "
+                "FROM comments c JOIN posts p ON p.id = c.post_id "
+                "WHERE p.source = ? AND c.added_version > ? AND p.added_version <= ? "
+                "ORDER BY p.created_utc, c.created_utc",
+                (source, version, version)
+            ):
+                stub = stubs.setdefault(row['post_id'], {
+                    'id': row['post_id'],
+                    'title': '',
+                    'text': '',
+                    'created_utc': row['post_created'],
+                    'comments_only': True,
+                    'comments': []
+                })
+                stub['comments'].append({key: row[key] for key in ('id', 'text', 'created_utc', 'score', 'author')})
+
+            posts = [_post_dict(conn, row) for row in conn.execute(
+                "SELECT * FROM posts WHERE source = ? AND added_version > ? ORDER BY created_utc",
+                (source, version)
+            ).fetchall()]
+            conn.rollback()
+
+        return {
+            'version': current,
+            'posts': posts + list(stubs.values()),
+            'updated': updated,
+            'text_changed': text_changed
+        }
+
+    def get_stats(self, source: str = DEFAULT_SOURCE) -> Dict[str, Any]:
+        """
+        Summarise the posts of one source.
+
+        Args:
+            source: Data source to count
+
+        Returns:
+            Dictionary with post, comment and file counts and the source's version
+        """
+        if not self.exists():
+            return {'source': source, 'posts': 0, 'comments': 0, 'files': 0, 'version': 0}
+
+        with closing(self._connect()) as conn:
+            return {
+                'source': source,
+                'posts': conn.execute("SELECT COUNT(*) FROM posts WHERE source = ?", (source,)).fetchone()[0],
+                'comments': conn.execute(
+                    "SELECT COUNT(*) FROM comments c JOIN posts p ON p.id = c.post_id WHERE p.source = ?",
+                    (source,)
+                ).fetchone()[0],
+                'files': conn.execute(
+                    "SELECT COUNT(DISTINCT source_file) FROM posts WHERE source = ?", (source,)
+                ).fetchone()[0],
+                'version': read_version(conn, source)
+            }
+
+    def search(self, query: str, source: Optional[str] = None, since: Optional[float] = None,
+               until: Optional[float] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search over posts and comments, best matches first.
+
+        Every term of the query must appear in a matching document. Ranking uses
+        BM25, with title matches weighted above body matches.
+
+        Args:
+            query: Free-text query, e.g. ``PIE accident``
+            source: Restrict hits to one data source
+            since: Only documents created at or after this epoch time
+            until: Only documents created before this epoch time
+            limit: Maximum number of hits
+
+        Returns:
+            List of hit dictionaries (kind, doc_id, post_id, source, title, text, created_utc, score, rank)
+        """
+        if not query_terms(query) or not self.exists():
+            return []
+
+        with closing(self._connect()) as conn:
+            if not self.fts_enabled:
+                return self._search_substring(conn, query, source, since, until, limit)
+
+            def filters(prefix):
+                clauses, params = '', []
+                if source:
+                    clauses += " AND p.source = ?"
+                    params.append(source)
+                if since is not None:
+                    clauses += f" AND {prefix}.created_utc >= ?"
+                    params.append(since)
+                if until is not None:
+                    clauses += f" AND {prefix}.created_utc < ?"
+                    params.append(until)
+                return clauses, params
+
+            match = _fts_query(query)
+            post_filters, post_params = filters('p')
+            comment_filters, comment_params = filters('c')
+            sql = (SEARCH_POSTS.format(filters=post_filters) + " UNION ALL " +
+                   SEARCH_COMMENTS.format(filters=comment_filters) + " ORDER BY rank LIMIT ?")
+            rows = conn.execute(sql, [match, *post_params, match, *comment_params, limit]).fetchall()
+            return [dict(row) for row in rows]
+
+    def _search_substring(self, conn: sqlite3.Connection, query: str, source: Optional[str],
+                          since: Optional[float], until: Optional[float], limit: int) -> List[Dict[str, Any]]:
+        """Unranked fallback for SQLite builds without FTS5."""
+        sql = ("SELECT 'post' AS kind, id AS doc_id, id AS post_id, source, title, text, created_utc, score, 0 AS rank "
+               "FROM posts WHERE 1 = 1")
+        params: List[Any] = []
+        for term in query_terms(query):
+            sql += " AND (LOWER(title) LIKE ? OR LOWER(text) LIKE ?)"
+            params.extend([f'%{term}%', f'%{term}%'])
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        if since is not None:
+            sql += " AND created_utc >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND created_utc < ?"
+            params.append(until)
+        sql += " ORDER BY created_utc DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in conn.execute(sql, params).fetchall()]
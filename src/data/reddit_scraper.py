@@ -11,7 +11,7 @@ import time
 import logging
 import datetime
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 import praw
 from praw.models import Submission
 import sys
@@ -24,6 +24,8 @@ load_dotenv()
 # Add the project root to the path so we can import the config
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+from src.data.jsonl_io import JsonlWriter, jsonl_filename
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -55,6 +57,78 @@ class RedditScraper:
             logger.error(f"Failed to initialize Reddit API client: {str(e)}")
             raise
     
+    def iter_subreddit(self, subreddit_name: str, limit: int = 100,
+                       sort_by: str = 'hot', time_filter: str = 'all') -> Iterator[Dict[str, Any]]:
+        """
+        Lazily scrape posts and comments from a subreddit, one post at a time.
+        
+        Args:
+            subreddit_name: Name of the subreddit to scrape (without the 'r/')
+            limit: Maximum number of posts to scrape
+            sort_by: How to sort posts ('hot', 'new', 'top', 'rising', 'controversial')
+            time_filter: Time filter for 'top' and 'controversial' ('all', 'day', 'week', 'month', 'year')
+            
+        Yields:
+            Dictionaries containing post and comment data
+        """
+        logger.info(f"Scraping {limit} posts from r/{subreddit_name} sorted by {sort_by}")
+        
+        # Get the subreddit
+        subreddit = self.reddit.subreddit(subreddit_name)
+        
+        # Get posts based on sort method
+        if sort_by == 'hot':
+            posts = subreddit.hot(limit=limit)
+        elif sort_by == 'new':
+            posts = subreddit.new(limit=limit)
+        elif sort_by == 'top':
+            posts = subreddit.top(time_filter=time_filter, limit=limit)
+        elif sort_by == 'rising':
+            posts = subreddit.rising(limit=limit)
+        elif sort_by == 'controversial':
+            posts = subreddit.controversial(time_filter=time_filter, limit=limit)
+        else:
+            logger.error(f"Invalid sort_by value: {sort_by}")
+            raise ValueError(f"Invalid sort_by value: {sort_by}. Must be one of: hot, new, top, rising, controversial")
+        
+        # Process posts
+        for post in posts:
+            try:
+                # Add a small delay to avoid hitting rate limits
+                time.sleep(0.5)
+                
+                # Get comments
+                post.comments.replace_more(limit=0)  # Only get top-level comments
+                comments = []
+                for comment in post.comments:
+                    try:
+                        comments.append({
+                            'id': comment.id,
+                            'text': comment.body,
+                            'score': comment.score,
+                            'created_utc': datetime.datetime.fromtimestamp(comment.created_utc).isoformat(),
+                            'author': str(comment.author) if comment.author else '[deleted]'
+                        })
+                    except Exception as e:
+                        logger.warning(f"Error processing comment {comment.id}: {str(e)}")
+                        continue
+                
+                # Extract post data
+                yield {
+                    'id': post.id,
+                    'title': post.title,
+                    'text': post.selftext,
+                    'score': post.score,
+                    'num_comments': post.num_comments,
+                    'created_utc': datetime.datetime.fromtimestamp(post.created_utc).isoformat(),
+                    'author': str(post.author) if post.author else '[deleted]',
+                    'flair': post.link_flair_text,
+                    'comments': comments
+                }
+            except Exception as e:
+                logger.warning(f"Error processing post {post.id}: {str(e)}")
+                continue
+    
     def scrape_subreddit(self, subreddit_name: str, limit: int = 100, 
                          sort_by: str = 'hot', time_filter: str = 'all') -> List[Dict[str, Any]]:
         """
@@ -70,66 +144,7 @@ class RedditScraper:
             List of dictionaries containing post and comment data
         """
         try:
-            logger.info(f"Scraping {limit} posts from r/{subreddit_name} sorted by {sort_by}")
-            
-            # Get the subreddit
-            subreddit = self.reddit.subreddit(subreddit_name)
-            
-            # Get posts based on sort method
-            if sort_by == 'hot':
-                posts = subreddit.hot(limit=limit)
-            elif sort_by == 'new':
-                posts = subreddit.new(limit=limit)
-            elif sort_by == 'top':
-                posts = subreddit.top(time_filter=time_filter, limit=limit)
-            elif sort_by == 'rising':
-                posts = subreddit.rising(limit=limit)
-            elif sort_by == 'controversial':
-                posts = subreddit.controversial(time_filter=time_filter, limit=limit)
-            else:
-                logger.error(f"Invalid sort_by value: {sort_by}")
-                raise ValueError(f"Invalid sort_by value: {sort_by}. Must be one of: hot, new, top, rising, controversial")
-            
-            # Process posts
-            post_data = []
-            for post in posts:
-                try:
-                    # Add a small delay to avoid hitting rate limits
-                    time.sleep(0.5)
-                    
-                    # Get comments
-                    post.comments.replace_more(limit=0)  # Only get top-level comments
-                    comments = []
-                    for comment in post.comments:
-                        try:
-                            comments.append({
-                                'id': comment.id,
-                                'text': comment.body,
-                                'score': comment.score,
-                                'created_utc': datetime.datetime.fromtimestamp(comment.created_utc).isoformat(),
-                                'author': str(comment.author) if comment.author else '[deleted]'
-                            })
-                        except Exception as e:
-                            logger.warning(f"Error processing comment {comment.id}: {str(e)}")
-                            continue
-                    
-                    # Extract post data
-                    post_dict = {
-                        'id': post.id,
-                        'title': post.title,
-                        'text': post.selftext,
-                        'score': post.score,
-                        'num_comments': post.num_comments,
-                        'created_utc': datetime.datetime.fromtimestamp(post.created_utc).isoformat(),
-                        'author': str(post.author) if post.author else '[deleted]',
-                        'flair': post.link_flair_text,
-                        'comments': comments
-                    }
-                    post_data.append(post_dict)
-                except Exception as e:
-                    logger.warning(f"Error processing post {post.id}: {str(e)}")
-                    continue
-            
+            post_data = list(self.iter_subreddit(subreddit_name, limit, sort_by, time_filter))
             logger.info(f"Successfully scraped {len(post_data)} posts from r/{subreddit_name}")
             return post_data
             
@@ -186,15 +201,54 @@ class RedditScraper:
             logger.error(f"Error saving posts to JSON: {str(e)}")
             raise
 
+    def save_to_jsonl(self, posts: Iterable[Dict[str, Any]], output_dir: str,
+                      subreddit_name: str, compression: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Stream scraped posts to a compact JSONL file as they arrive.
+        
+        Each post is flushed as soon as it is written, and the file is renamed into
+        place with a sidecar metadata file once the iterator is exhausted.
+        
+        Args:
+            posts: Iterable of post dictionaries, typically from iter_subreddit
+            output_dir: Directory to save the JSONL file
+            subreddit_name: Name of the subreddit (for filename and metadata)
+            compression: None, 'gzip' or 'zstd'
+            
+        Returns:
+            Tuple of (path to the saved JSONL file, number of posts written)
+        """
+        scrape_time = datetime.datetime.now()
+        filename = jsonl_filename(f"Reddit_{subreddit_name}_{scrape_time.strftime('%Y%m%d_%H%M%S')}", compression)
+        file_path = os.path.join(output_dir, filename)
+        
+        metadata = {
+            'subreddit': subreddit_name,
+            'scrape_date': scrape_time.strftime('%Y%m%d')
+        }
+        
+        try:
+            with JsonlWriter(file_path, compression=compression, metadata=metadata) as writer:
+                for post in posts:
+                    writer.write(post)
+                    
+            logger.info(f"Saved {writer.records} posts to {file_path}")
+            return file_path, writer.records
+        except Exception as e:
+            logger.error(f"Error saving posts to JSONL: {str(e)}")
+            raise
+
 def scrape_reddit_data(subreddit: str, limit: int = 100, 
-                       output_dir: str = 'data/reddit') -> Dict[str, Any]:
+                       output_dir: str = 'data/reddit',
+                       compression: Optional[str] = None) -> Dict[str, Any]:
     """
-    Scrape data from a subreddit and save to JSON.
+    Scrape data from a subreddit and stream it to a JSONL file.
     
     Args:
         subreddit: Name of the subreddit to scrape (without the 'r/')
         limit: Maximum number of posts to scrape
-        output_dir: Directory to save the JSON file
+        output_dir: Directory to save the JSONL file
+        compression: None, 'gzip' or 'zstd'
         
     Returns:
         Dictionary with scraping results
@@ -203,17 +257,15 @@ def scrape_reddit_data(subreddit: str, limit: int = 100,
         # Initialize scraper
         scraper = RedditScraper()
         
-        # Scrape posts
-        posts = scraper.scrape_subreddit(subreddit, limit=limit)
-        
-        # Save to JSON
-        file_path = scraper.save_to_json(posts, output_dir, subreddit)
+        # Scrape posts and write them out as they arrive
+        posts = scraper.iter_subreddit(subreddit, limit=limit)
+        file_path, records = scraper.save_to_jsonl(posts, output_dir, subreddit, compression)
         
         return {
             "success": True,
             "file_path": file_path,
-            "records": len(posts),
-            "message": f"Successfully scraped {len(posts)} posts from r/{subreddit}"
+            "records": records,
+            "message": f"Successfully scraped {records} posts from r/{subreddit}"
         }
     except Exception as e:
         logger.error(f"Error in scrape_reddit_data: {str(e)}")
@@ -7,6 +7,8 @@ from pyspark.sql.functions import *
 from typing import Dict, Any
 import logging
 
+from src.analysis.streaming import DEFAULT_CONFIG, TrendMonitor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,13 +44,21 @@ class SparkAnalyzer:
         
     def analyze_trends(self):
         """
-        TODO: Implement trend analysis
-        - Identify popular topics
-        - Calculate engagement metrics
-        - Perform time-series analysis
+        Detect trending terms with the streaming trend detector.
+        
+        Replays the JSONL files under ``input_path`` through sliding windows of
+        ``window_size`` and reports top terms and z-score bursts.
+        
+        Returns:
+            Dict: Trend snapshot (see TrendDetector.snapshot)
         """
         logger.info("Analyzing trends...")
-        raise NotImplementedError("Trend analysis needs to be implemented")
+        config = {key: self.config[key] for key in DEFAULT_CONFIG if key in self.config}
+        monitor = TrendMonitor(self.config['input_path'], config)
+        monitor.poll()
+        self.trends = monitor.snapshot()
+        logger.info(f"Found {len(self.trends['bursts'])} trend bursts")
+        return self.trends
         
     def analyze_sentiment(self):
         """
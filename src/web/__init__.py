@@ -13,6 +13,10 @@ def create_app():
     # Initialize Flask-Bootstrap
     Bootstrap5(app)
     
+    # Compress large JSON and HTML responses
+    from .http_cache import init_compression
+    init_compression(app)
+    
     # Import and register blueprints
     from .views import main_bp
     app.register_blueprint(main_bp)
@@ -0,0 +1,218 @@
+"""
+In-process LRU cache of parsed analysis files.
+
+Every chart refresh used to re-open and ``json.load`` the same analysis file.
+Entries are keyed by (path, mtime, size), so a rewritten file is re-parsed on the
+next request while unchanged files are served straight from memory. The cache
+is bounded by the total on-disk size of the cached files. Sections files are
+cached per section, so a chart only pays for the sections it shows.
+
+Cached objects are shared between requests and must be treated as read-only.
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.analysis.section_store import is_sections_path, read_index, read_section
+from src.analysis.rollups import load_rollup, strip_raw_series
+from src.analysis.downsample import downsample_raw_series
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.getenv('ANALYSIS_CACHE_MAX_MB', '64')) * 1024 * 1024
+DEFAULT_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '128'))
+
+
+def _load_json(file_path: str) -> Any:
+    """Default loader: parse a JSON file."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _file_version(file_path: str) -> Optional[Tuple[int, int]]:
+    """(mtime, size) of a file, or None if it does not exist."""
+    try:
+        stats = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stats.st_mtime_ns, stats.st_size
+
+
+class AnalysisCache:
+    """Thread-safe LRU cache of parsed files validated by mtime and size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Cap on the summed on-disk size of cached files
+            max_entries: Cap on the number of cached files
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def load(self, file_path: str, loader: Optional[Callable[[str], Any]] = None,
+             part: Optional[str] = None, weight: Optional[int] = None,
+             depends_on: Iterable[str] = ()) -> Any:
+        """
+        Get the parsed contents of a file, parsing it only if it changed.
+
+        Args:
+            file_path: Path to the file
+            loader: Function that parses the file (defaults to json.load)
+            part: Name of a part of the file cached separately, e.g. one section
+                of a sections file; None caches the whole file
+            weight: Bytes charged against ``max_bytes`` (defaults to the file size)
+            depends_on: Other files the parsed value is derived from (may be missing);
+                changing any of them also invalidates the entry
+
+        Returns:
+            Parsed contents (shared; do not modify)
+        """
+        path = os.path.abspath(file_path)
+        stats = os.stat(path)
+        key = (path, stats.st_mtime_ns, stats.st_size, tuple(_file_version(other) for other in depends_on))
+        slot = (path, part)
+        weight = stats.st_size if weight is None else weight
+
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(slot)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        data = (loader or _load_json)(path)
+
+        with self._lock:
+            old = self._entries.pop(slot, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if weight <= self.max_bytes:
+                self._entries[slot] = (key, weight, data)
+                self._bytes += weight
+                self._evict()
+        return data
+
+    def _evict(self):
+        """Drop least recently used entries until the caps are respected."""
+        while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            _, (_, weight, _) = self._entries.popitem(last=False)
+            self._bytes -= weight
+            self.evictions += 1
+
+    def invalidate(self, file_path: str):
+        """Forget a cached file, including its separately cached parts."""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            for slot in [slot for slot in self._entries if slot[0] == path]:
+                self._bytes -= self._entries.pop(slot)[1]
+
+    def clear(self):
+        """Forget every cached file and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache usage.
+
+        Returns:
+            Dictionary with hit/miss/eviction counters, hit rate, entries and bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries
+            }
+
+
+# Shared by every view and service in the process
+analysis_cache = AnalysisCache()
+
+
+def load_analysis(file_path: str) -> Any:
+    """Load a parsed analysis file through the shared cache."""
+    return analysis_cache.load(file_path)
+
+
+def load_analysis_sections(file_path: str, names: Optional[Iterable[str]] = None,
+                           prefix: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load selected sections of a sections file through the shared cache.
+
+    Args:
+        file_path: Path to the sections file
+        names: Sections to load (all sections if None); unknown names are ignored
+        prefix: Only load sections whose name starts with this prefix
+
+    Returns:
+        Mapping of section name to parsed data (shared; do not modify)
+    """
+    index = analysis_cache.load(file_path, loader=read_index, part='__index__', weight=0)
+    table = index['sections']
+    names = list(table) if names is None else [name for name in names if name in table]
+    if prefix:
+        names = [name for name in names if name.startswith(prefix)]
+    return {
+        name: analysis_cache.load(file_path, loader=lambda path, name=name: read_section(path, name),
+                                  part=name, weight=table[name][1])
+        for name in names
+    }
+
+
+@timed('load_visualizations')
+def load_visualization_data(file_path: str, viz_type: str = 'all', timeframe: str = '30d',
+                            max_points: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Load the chart data of an analysis file, as served by the get-visualizations endpoints.
+
+    Args:
+        file_path: Analysis file (JSON or sections)
+        viz_type: Section prefix to keep, or 'all'
+        timeframe: Rollup timeframe served in place of the raw per-post series
+        max_points: Maximum points per chart series (None keeps every point)
+
+    Returns:
+        Sections matching ``viz_type``, with a ``rollup`` entry when one was precomputed
+    """
+    prefix = None if viz_type == 'all' else viz_type
+    if is_sections_path(file_path):
+        # Decode only the sections matching the visualization type
+        analysis_data = load_analysis_sections(file_path, prefix=prefix)
+    else:
+        # Parsed once per file version; filter without touching the cached object
+        analysis_data = load_analysis(file_path)
+        if prefix:
+            analysis_data = {key: value for key, value in analysis_data.items() if key.startswith(prefix)}
+
+    # Serve the precomputed rollup for the timeframe instead of raw per-post series
+    rollup = load_rollup(file_path, timeframe, loader=load_analysis)
+    if rollup:
+        analysis_data = strip_raw_series(analysis_data)
+        analysis_data['rollup'] = rollup
+
+    # Bound the number of points per chart series
+    return downsample_raw_series(analysis_data, max_points)
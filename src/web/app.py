@@ -7,10 +7,12 @@ from flask import Flask, render_template, send_from_directory
 import os
 from flask_cors import CORS
 from .routes.api import api
+from .http_cache import init_compression
 
 def create_app():
     app = Flask(__name__)
     CORS(app)  # Enable CORS for all routes
+    init_compression(app)
     app.config['SECRET_KEY'] = os.urandom(24)
     
     # Register blueprints
@@ -0,0 +1,201 @@
+"""
+HTTP validators and response compression for JSON payloads.
+
+Dashboards poll the visualization and dataset endpoints. Responses carry a
+weak ETag and Last-Modified derived from the files they are built from, so an
+unchanged poll is answered with ``304 Not Modified`` and no body. Bodies above a
+size threshold are compressed with brotli (when installed) or gzip.
+"""
+
+import os
+import gzip
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional, Tuple
+
+from flask import current_app, jsonify, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'application/javascript',
+    'text/javascript'
+)
+
+
+def file_validator(*paths: Optional[str]) -> Tuple[str, Optional[float]]:
+    """
+    Build a validator seed and last-modified time from a set of files.
+
+    Missing paths are skipped, so optional companions (such as rollups) can be
+    passed unconditionally.
+
+    Args:
+        paths: Files the response is derived from
+
+    Returns:
+        Tuple of (validator seed, newest mtime or None)
+    """
+    parts = []
+    newest = None
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        stats = os.stat(path)
+        parts.append(f"{os.path.abspath(path)}:{stats.st_mtime_ns}:{stats.st_size}")
+        newest = stats.st_mtime if newest is None else max(newest, stats.st_mtime)
+    return '|'.join(parts), newest
+
+
+def directory_validator(directories: Iterable[str], extra: Any = None) -> Tuple[str, Optional[float]]:
+    """
+    Build a validator seed from the entries of one or more directories.
+
+    Adding, removing or rewriting any file changes the seed, without reading
+    file contents. The directory's own mtime counts towards the newest mtime,
+    so a deletion also moves Last-Modified forward.
+
+    Args:
+        directories: Directories the listing is built from
+        extra: Additional version information, e.g. the post store version
+
+    Returns:
+        Tuple of (validator seed, newest mtime or None)
+    """
+    parts = [repr(extra)]
+    newest = None
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        stats = os.stat(directory)
+        parts.append(f"{os.path.abspath(directory)}:{stats.st_mtime_ns}")
+        newest = stats.st_mtime if newest is None else max(newest, stats.st_mtime)
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            stats = entry.stat()
+            parts.append(f"{entry.path}:{stats.st_mtime_ns}:{stats.st_size}")
+            newest = stats.st_mtime if newest is None else max(newest, stats.st_mtime)
+    return '|'.join(parts), newest
+
+
+def _validator_headers(response, etag: str, last_modified: Optional[float]):
+    """Set the validator and revalidation headers of a response."""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+    # Let browsers keep the body but revalidate on every poll
+    response.cache_control.no_cache = True
+    return response
+
+
+def _etag(seed: str) -> str:
+    """ETag of a validator seed for the current request."""
+    # Covers the query string too: the same file yields different payloads for different parameters
+    return hashlib.sha1(f"{seed}?{request.query_string.decode()}".encode('utf-8')).hexdigest()
+
+
+def not_modified(validator: Tuple[str, Optional[float]]):
+    """
+    Answer a conditional request from its validators alone.
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+
+    Args:
+        validator: Output of file_validator or directory_validator
+
+    Returns:
+        Bare 304 response if the client copy is current, otherwise None
+    """
+    seed, last_modified = validator
+    etag = _etag(seed)
+
+    if request.if_none_match:
+        current = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since is not None and last_modified is not None:
+        # HTTP dates have one-second resolution
+        current = int(last_modified) <= request.if_modified_since.timestamp()
+    else:
+        current = False
+
+    if not current:
+        return None
+    return _validator_headers(current_app.response_class(status=304), etag, last_modified)
+
+
+def conditional_json(payload: Any, validator: Tuple[str, Optional[float]]):
+    """
+    Build a JSON response that honours If-None-Match and If-Modified-Since.
+
+    Endpoints whose payload is expensive to build should return
+    ``not_modified(validator)`` first when it is not None.
+
+    Args:
+        payload: JSON serialisable response body
+        validator: Output of file_validator or directory_validator
+
+    Returns:
+        Flask response (304 with no body if the client copy is current)
+    """
+    response = not_modified(validator)
+    if response is not None:
+        return response
+
+    seed, last_modified = validator
+    return _validator_headers(jsonify(payload), _etag(seed), last_modified)
+
+
+def _preferred_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding offered by the client."""
+    offered = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in offered:
+        return 'br'
+    if 'gzip' in offered:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """
+    Compress a response body in place when it is worth it.
+
+    Registered as an ``after_request`` hook by init_compression.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or
+            'Content-Encoding' in response.headers or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    encoding = _preferred_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=min(COMPRESSION_LEVEL, 11))
+    else:
+        compressed = gzip.compress(body, compresslevel=COMPRESSION_LEVEL)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(compressed))
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_compression(app):
+    """Enable response compression for every route of a Flask app."""
+    app.after_request(compress_response)
@@ -0,0 +1,235 @@
+"""
+Background jobs for long-running scrapes and analyses.
+
+A request submits a job and gets its id back immediately; the work runs on an
+executor and clients poll the job until it finishes::
+
+    job = jobs.submit('analyze_reddit_data', 'cpu', run_reddit_analysis, file_path)
+    jobs.get(job['id'])['status']   # queued -> running -> succeeded / failed
+
+I/O-bound jobs (scraping) share a thread pool. CPU-bound jobs (analysis) run
+in a process pool so they neither hold the GIL of the web worker nor block its
+request threads; their functions and arguments must be picklable, i.e.
+module-level functions. Executors are created on first use, after any
+pre-fork of the serving process.
+
+Job state is kept in one JSON file per job under ``data/jobs``, so any worker
+of a multi-process server can answer a poll for a job another worker started.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import multiprocessing
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOBS_DIRNAME = 'jobs'
+JOB_KINDS = ('io', 'cpu')
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+DEFAULT_IO_WORKERS = int(os.getenv('JOB_IO_WORKERS', 8))
+DEFAULT_CPU_WORKERS = int(os.getenv('JOB_CPU_WORKERS', os.cpu_count() or 1))
+# Finished jobs older than this are deleted when new jobs are submitted
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+def _write_job(path: str, job: Dict[str, Any]):
+    """Atomically replace a job file."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(job, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def _read_job(path: str) -> Optional[Dict[str, Any]]:
+    """Read a job file, or None if it does not exist."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _run_job(path: str, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+    """Mark a job running and execute it (runs on the executor, possibly in another process)."""
+    job = _read_job(path)
+    if job is not None:
+        job.update({'status': 'running', 'started': time.time(), 'pid': os.getpid()})
+        _write_job(path, job)
+    return func(*args, **kwargs)
+
+
+class JobManager:
+    """Runs jobs on shared executors and records their state on disk."""
+
+    def __init__(self, jobs_dir: str, io_workers: int = DEFAULT_IO_WORKERS,
+                 cpu_workers: int = DEFAULT_CPU_WORKERS):
+        """
+        Initialize the manager.
+
+        Args:
+            jobs_dir: Directory holding one JSON file per job
+            io_workers: Threads running I/O-bound jobs
+            cpu_workers: Processes running CPU-bound jobs
+        """
+        self.jobs_dir = jobs_dir
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self._executors = {}
+        self._lock = threading.Lock()
+
+    def _executor(self, kind: str):
+        """Get the executor of a job kind, creating it on first use."""
+        with self._lock:
+            executor = self._executors.get(kind)
+            if executor is None:
+                if kind == 'io':
+                    executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='job-io')
+                else:
+                    # spawn: forking a process that runs request threads is unsafe
+                    executor = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                                   mp_context=multiprocessing.get_context('spawn'))
+                self._executors[kind] = executor
+            return executor
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def submit(self, name: str, kind: str, func: Callable, *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               params: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Queue a job.
+
+        Args:
+            name: Job name, e.g. ``scrape_reddit``
+            kind: 'io' for the thread pool, 'cpu' for the process pool
+            func: Function to run; must be picklable for 'cpu' jobs
+            *args: Positional arguments of func
+            on_success: Called in this process with the result once the job succeeds
+            params: Request parameters recorded with the job
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            The queued job
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of {JOB_KINDS}")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self.prune()
+
+        job_id = uuid.uuid4().hex
+        path = self._path(job_id)
+        job = {
+            'id': job_id,
+            'name': name,
+            'kind': kind,
+            'status': 'queued',
+            'params': params or {},
+            'submitted': time.time(),
+            'started': None,
+            'finished': None,
+            'result': None,
+            'error': None
+        }
+        _write_job(path, job)
+
+        future = self._executor(kind).submit(_run_job, path, func, args, kwargs)
+        future.add_done_callback(lambda done: self._finish(path, done, on_success))
+        logger.info(f"Queued {kind} job {name} ({job_id})")
+        return job
+
+    def _finish(self, path: str, future: Future, on_success: Optional[Callable[[Any], None]]):
+        """Record the outcome of a finished job."""
+        job = _read_job(path) or {}
+        job['finished'] = time.time()
+        error = future.exception()
+        if error is None:
+            job.update({'status': 'succeeded', 'result': future.result()})
+        else:
+            job.update({'status': 'failed', 'error': str(error)})
+            logger.error(f"Job {job.get('name')} ({job.get('id')}) failed: "
+                         f"{''.join(traceback.format_exception_only(type(error), error)).strip()}")
+        try:
+            _write_job(path, job)
+        except (OSError, TypeError) as e:
+            logger.error(f"Could not record job {job.get('id')}: {str(e)}")
+        if error is None and on_success is not None:
+            try:
+                on_success(job['result'])
+            except Exception as e:
+                logger.warning(f"Success callback of job {job.get('id')} failed: {str(e)}")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job submitted by any worker.
+
+        Args:
+            job_id: Job id returned by submit
+
+        Returns:
+            The job, or None if it is unknown
+        """
+        if not job_id.isalnum():
+            return None
+        return _read_job(self._path(job_id))
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Get the most recently submitted jobs.
+
+        Args:
+            limit: Maximum number of jobs
+
+        Returns:
+            Jobs without their results, newest first
+        """
+        if not os.path.isdir(self.jobs_dir):
+            return []
+        jobs = []
+        for filename in os.listdir(self.jobs_dir):
+            if filename.endswith('.json'):
+                job = _read_job(os.path.join(self.jobs_dir, filename))
+                if job is not None:
+                    job.pop('result', None)
+                    jobs.append(job)
+        jobs.sort(key=lambda job: job.get('submitted') or 0, reverse=True)
+        return jobs[:limit]
+
+    def prune(self, max_age: float = JOB_RETENTION_SECONDS) -> int:
+        """
+        Delete finished jobs older than max_age seconds.
+
+        Returns:
+            Number of jobs deleted
+        """
+        if not os.path.isdir(self.jobs_dir):
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for filename in os.listdir(self.jobs_dir):
+            path = os.path.join(self.jobs_dir, filename)
+            try:
+                if filename.endswith('.json') and os.path.getmtime(path) < cutoff:
+                    job = _read_job(path)
+                    if job and job.get('status') in ('succeeded', 'failed'):
+                        os.remove(path)
+                        removed += 1
+            except (OSError, ValueError):
+                continue
+        return removed
+
+    def shutdown(self, wait: bool = True):
+        """Stop the executors."""
+        with self._lock:
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,314 @@
+"""
+Lightweight instrumentation of the analysis pipeline.
+
+A ``Profile`` times the stages of one analysis run::
+
+    profile = Profile('analyze_reddit_data')
+    with profile.stage('load') as stage:
+        posts = load_posts(path)
+        stage.add_records(len(posts))
+    report = profile.report()
+
+Stages also feed the process-wide ``metrics`` registry, which the ``/metrics``
+endpoint renders in the Prometheus text format together with peak RSS and the
+analysis cache counters. Functions can be timed with the ``timed`` decorator.
+
+Set ``METRICS_ENABLED=0`` to turn instrumentation off: stages then return a
+shared no-op context manager and nothing is recorded.
+"""
+
+import os
+import json
+import sys
+import time
+import logging
+import functools
+import threading
+from typing import Dict, Any, Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+METRICS_DIRNAME = 'metrics'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process in bytes, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _cache_stats() -> Dict[str, Any]:
+    """Counters of the shared analysis cache."""
+    from .analysis_cache import analysis_cache
+    return analysis_cache.stats()
+
+
+class MetricsRegistry:
+    """Thread-safe process-wide totals of stage timings and analysis runs."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        """
+        Initialize an empty registry.
+
+        Args:
+            enabled: Whether stages and runs are recorded
+        """
+        self.enabled = enabled
+        self._stages = {}   # stage -> [count, seconds, records]
+        self._runs = {}     # (name, status) -> count
+        self._lock = threading.Lock()
+
+    def observe_stage(self, stage: str, seconds: float, records: int = 0):
+        """Record one execution of a stage."""
+        with self._lock:
+            totals = self._stages.setdefault(stage, [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += records
+
+    def count_run(self, name: str, status: str = 'success'):
+        """Record one analysis run."""
+        with self._lock:
+            self._runs[(name, status)] = self._runs.get((name, status), 0) + 1
+
+    def record_report(self, report: Optional[Dict[str, Any]]):
+        """Add the stages and outcome of a Profile report made in another process."""
+        if not report or not self.enabled:
+            return
+        for stage in report.get('stages', []):
+            self.observe_stage(stage['stage'], stage['seconds'], stage.get('records', 0))
+        self.count_run(report['name'], report.get('status', 'success'))
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            Metrics text, one sample per line
+        """
+        with self._lock:
+            stages = {stage: list(totals) for stage, totals in self._stages.items()}
+            runs = dict(self._runs)
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            # samples: (sample name suffix, labels, value)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text
+                             else f"{name}{suffix} {value}")
+
+        family('analysis_runs_total', 'counter', 'Analysis runs by entry point and outcome.',
+               [('', {'name': name, 'status': status}, count)
+                for (name, status), count in sorted(runs.items())])
+        family('analysis_stage_seconds', 'summary', 'Time spent in analysis stages.',
+               [sample for stage, (count, seconds, _) in sorted(stages.items())
+                for sample in (('_sum', {'stage': stage}, seconds), ('_count', {'stage': stage}, count))])
+        family('analysis_stage_records_total', 'counter', 'Records processed by analysis stages.',
+               [('', {'stage': stage}, records) for stage, (_, _, records) in sorted(stages.items())])
+
+        peak = peak_rss_bytes()
+        if peak is not None:
+            family('process_peak_rss_bytes', 'gauge', 'Peak resident set size of the process.', [('', {}, peak)])
+
+        cache = _cache_stats()
+        family('analysis_cache_hits_total', 'counter', 'Analysis cache hits.', [('', {}, cache['hits'])])
+        family('analysis_cache_misses_total', 'counter', 'Analysis cache misses.', [('', {}, cache['misses'])])
+        family('analysis_cache_evictions_total', 'counter', 'Analysis cache evictions.', [('', {}, cache['evictions'])])
+        family('analysis_cache_hit_ratio', 'gauge', 'Share of analysis cache lookups served from memory.',
+               [('', {}, cache['hit_rate'])])
+        family('analysis_cache_bytes', 'gauge', 'On-disk size of the cached analysis files.', [('', {}, cache['bytes'])])
+        family('analysis_cache_entries', 'gauge', 'Cached analysis files and sections.', [('', {}, cache['entries'])])
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: Any) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared registry rendered by the /metrics endpoint
+metrics = MetricsRegistry()
+
+
+class _Stage:
+    """Context manager timing one stage of a profile."""
+
+    __slots__ = ('profile', 'name', 'records', 'start')
+
+    def __init__(self, profile: 'Profile', name: str, records: int):
+        self.profile = profile
+        self.name = name
+        self.records = records
+        self.start = None
+
+    def add_records(self, count: int):
+        """Count records processed by the stage."""
+        self.records += count
+
+    def __enter__(self) -> '_Stage':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profile._finish(self, time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    """Shared stand-in returned while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def add_records(self, count: int):
+        pass
+
+    def __enter__(self) -> '_NullStage':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profile:
+    """Per-stage timings, throughput, peak RSS and cache hit rates of one analysis run."""
+
+    def __init__(self, name: str, registry: MetricsRegistry = metrics):
+        """
+        Start profiling a run.
+
+        Args:
+            name: Entry point being profiled, e.g. ``analyze_reddit_data``
+            registry: Registry that stage timings are added to
+        """
+        self.name = name
+        self.registry = registry
+        self.enabled = registry.enabled
+        self.stages: List[Dict[str, Any]] = []
+        if self.enabled:
+            self._start = time.perf_counter()
+            self._cache_start = _cache_stats()
+
+    def stage(self, name: str, records: int = 0):
+        """
+        Time a stage.
+
+        Args:
+            name: Stage name, e.g. ``sentiment``
+            records: Records processed, if known up front (see ``add_records``)
+
+        Returns:
+            Context manager; a shared no-op when instrumentation is disabled
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, records)
+
+    def _finish(self, stage: _Stage, seconds: float):
+        entry = {'stage': stage.name, 'seconds': round(seconds, 6), 'records': stage.records}
+        if stage.records and seconds > 0:
+            entry['records_per_second'] = round(stage.records / seconds, 1)
+        self.stages.append(entry)
+        self.registry.observe_stage(stage.name, seconds, stage.records)
+
+    def report(self, status: str = 'success') -> Dict[str, Any]:
+        """
+        Finish the run and summarise it.
+
+        Args:
+            status: Outcome counted in ``analysis_runs_total``
+
+        Returns:
+            Dictionary with the stages, total time, peak RSS and the analysis
+            cache lookups made during the run ({} when disabled)
+        """
+        if not self.enabled:
+            return {}
+        self.registry.count_run(self.name, status)
+
+        cache = _cache_stats()
+        hits = cache['hits'] - self._cache_start['hits']
+        misses = cache['misses'] - self._cache_start['misses']
+        return {
+            'name': self.name,
+            'status': status,
+            'total_seconds': round(time.perf_counter() - self._start, 6),
+            'stages': self.stages,
+            'peak_rss_bytes': peak_rss_bytes(),
+            'cache': {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else None
+            }
+        }
+
+
+def timed(stage: str, registry: MetricsRegistry = metrics) -> Callable:
+    """
+    Decorator adding a function's run time to the registry as a stage.
+
+    Args:
+        stage: Stage name
+        registry: Registry to record into
+
+    Returns:
+        Decorator; functions are returned unchanged while instrumentation is disabled
+    """
+    def decorator(func: Callable) -> Callable:
+        if not registry.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe_stage(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def metrics_path_for(analysis_path: str) -> str:
+    """Get the metrics file that belongs to an analysis file (JSON or sections)."""
+    directory, filename = os.path.split(analysis_path)
+    return os.path.join(directory, METRICS_DIRNAME, os.path.splitext(filename)[0] + '.json')
+
+
+def save_profile(analysis_path: str, report: Dict[str, Any]) -> Optional[str]:
+    """
+    Write a run report next to its analysis file.
+
+    Args:
+        analysis_path: Path of the analysis file
+        report: Result of Profile.report
+
+    Returns:
+        Path to the metrics file, or None if there was nothing to save
+    """
+    if not report:
+        return None
+    metrics_path = metrics_path_for(analysis_path)
+    os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
+    with open(metrics_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return metrics_path
@@ -3,6 +3,11 @@ import os
 import json
 import csv
 from datetime import datetime
+from src.analysis.rollups import rollup_path_for
+from src.analysis.downsample import parse_max_points
+from src.data.file_catalog import FileCatalog, CATALOG_FILENAME, parse_listing_args, project
+from ..analysis_cache import load_visualization_data
+from ..http_cache import conditional_json, not_modified, file_validator, directory_validator
 
 api = Blueprint('api', __name__)
 
@@ -16,6 +21,10 @@ def get_datasets():
         data_dir = os.path.join(base_dir, 'data')
         
         print(f"Looking for datasets in: {data_dir}")
+        validator = directory_validator([os.path.join(data_dir, 'reddit'), os.path.join(data_dir, 'twitter')])
+        cached = not_modified(validator)
+        if cached is not None:
+            return cached
         
         # Reddit datasets
         reddit_dir = os.path.join(data_dir, 'reddit')
@@ -50,10 +59,10 @@ def get_datasets():
         
         print(f"Total datasets found: {len(sorted_datasets)}")
         
-        return jsonify({
+        return conditional_json({
             'success': True,
             'datasets': sorted_datasets
-        })
+        }, validator)
     except Exception as e:
         current_app.logger.error(f"Error in get_datasets: {str(e)}")
         print(f"Error occurred: {str(e)}")
@@ -156,7 +165,7 @@ def analyze_dataset():
 
 @api.route('/get-analysis-files', methods=['GET'])
 def get_analysis_files():
-    """API endpoint to get available analysis files"""
+    """API endpoint to get available analysis files (paginated with ``limit``/``cursor``)"""
     try:
         # Get the absolute path to the data directory
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -165,47 +174,55 @@ def get_analysis_files():
         
         print(f"Looking for analysis files in: {analysis_dir}")
         
-        files = []
+        try:
+            listing = parse_listing_args(request.args, default_sort='date')
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        fields = listing.pop('fields')
+        
+        catalog = FileCatalog(os.path.join(base_dir, 'data', 'store', CATALOG_FILENAME))
+        validator = catalog.validator([analysis_dir])
+        cached = not_modified(validator)
+        if cached is not None:
+            return cached
+        page = catalog.page([analysis_dir], kinds=['json', 'sections'], **listing)
         
-        if os.path.exists(analysis_dir):
-            for filename in os.listdir(analysis_dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(analysis_dir, filename)
-                    stats = os.stat(file_path)
-                    
-                    # Format size for display
-                    size = stats.st_size
-                    if size < 1024:
-                        size_str = f"{size} B"
-                    elif size < 1024 * 1024:
-                        size_str = f"{size/1024:.1f} KB"
-                    else:
-                        size_str = f"{size/(1024*1024):.1f} MB"
-                    
-                    # Get date from the file modification time
-                    modified_date = datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    # Create a formatted display name
-                    display_name = os.path.splitext(filename)[0].replace('_', ' ').title()
-                    
-                    # Create a relative path for the file
-                    relative_path = '/data/analysis/' + filename
-                    
-                    files.append({
-                        'filename': display_name,
-                        'size': size_str,
-                        'date': modified_date,
-                        'path': relative_path,
-                        'raw_filename': filename
-                    })
+        files = []
+        for entry in page['files']:
+            filename = entry['filename']
+            
+            # Format size for display
+            size = entry['size']
+            if size < 1024:
+                size_str = f"{size} B"
+            elif size < 1024 * 1024:
+                size_str = f"{size/1024:.1f} KB"
+            else:
+                size_str = f"{size/(1024*1024):.1f} MB"
+            
+            # Get date from the file modification time
+            modified_date = datetime.fromtimestamp(entry['mtime']).strftime('%Y-%m-%d %H:%M:%S')
             
-            # Sort files by creation time (newest first)
-            files = sorted(files, key=lambda x: x['date'], reverse=True)
+            # Create a formatted display name
+            display_name = os.path.splitext(filename)[0].replace('_', ' ').title()
+            
+            # Create a relative path for the file
+            relative_path = '/data/analysis/' + filename
+            
+            files.append({
+                'filename': display_name,
+                'size': size_str,
+                'date': modified_date,
+                'path': relative_path,
+                'raw_filename': filename
+            })
         
-        return jsonify({
+        return conditional_json({
             'status': 'success',
-            'files': files
-        })
+            'files': project(files, fields),
+            'next_cursor': page['next_cursor'],
+            'total': page['total']
+        }, validator)
     except Exception as e:
         current_app.logger.error(f"Error in get_analysis_files: {str(e)}")
         print(f"Error occurred while getting analysis files: {str(e)}")
@@ -222,6 +239,7 @@ def get_visualizations():
         file_path = request.args.get('file')
         viz_type = request.args.get('type', 'all')
         timeframe = request.args.get('timeframe', '30d')
+        max_points = parse_max_points(request.args.get('max_points'))
         
         # Get the absolute path to the file
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -240,25 +258,17 @@ def get_visualizations():
                 'message': f"Analysis file not found: {file_path}"
             })
         
-        # Read the analysis file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            analysis_data = json.load(f)
-        
-        # Filter data based on visualization type if needed
-        if viz_type != 'all':
-            filtered_data = {}
-            for key, value in analysis_data.items():
-                if key.startswith(viz_type):
-                    filtered_data[key] = value
-            analysis_data = filtered_data
+        validator = file_validator(file_path, rollup_path_for(file_path))
+        cached = not_modified(validator)
+        if cached is not None:
+            return cached
         
-        # Apply timeframe filtering if applicable
-        # This would be applied to any time series data in the analysis
+        analysis_data = load_visualization_data(file_path, viz_type, timeframe, max_points)
         
-        return jsonify({
+        return conditional_json({
             'status': 'success',
             'data': analysis_data
-        })
+        }, validator)
     except Exception as e:
         current_app.logger.error(f"Error in get_visualizations: {str(e)}")
         print(f"Error occurred while getting visualizations: {str(e)}")
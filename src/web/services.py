@@ -2,23 +2,40 @@
 Services for handling business logic
 """
 
-from pyspark.sql import SparkSession
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import logging
-import requests
 import os
 import re
-from bs4 import BeautifulSoup
 import time
 import random
+from src.data.jsonl_io import is_jsonl_path, is_auxiliary_path, read_metadata
+from src.data.file_catalog import FileCatalog, CATALOG_FILENAME, project
+from src.data.post_store import to_epoch
+from src.analysis.downsample import downsample_series, parse_max_points
+from src.analysis.rollups import GRANULARITIES, TIMEFRAMES, WEEK_OFFSET, rollup_path_for, select_rollup
+from src.analysis.section_store import is_sections_path
+from src.analysis.streaming import DEFAULT_CONFIG as DEFAULT_STREAMING_CONFIG, get_monitor, stop_monitors
+from .analysis_cache import analysis_cache, load_analysis, load_analysis_sections
+from .metrics import Profile, save_profile, timed
+from .startup import lazy_import
+
+# Loaded on first use to keep application start-up fast
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Result sections each visualization type reads (None means every section)
+VIZ_SECTIONS = {
+    'sentiment': ['sentiment_analysis'],
+    'engagement': ['engagement_analysis', 'trend_analysis'],
+    'location': ['location_analysis'],
+    'issues': ['issues_analysis']
+}
+
 class SparkService:
     def __init__(self):
         self.spark = None
@@ -26,6 +43,7 @@ class SparkService:
     
     def _initialize_spark(self, spark_settings=None):
         """Initialize Spark session with custom settings"""
+        from pyspark.sql import SparkSession
         builder = SparkSession.builder.appName("Social Media Analysis")
         
         # Apply custom settings if provided
@@ -59,6 +77,10 @@ class SparkService:
         try:
             logger.info(f"Starting analysis with parameters: {params}")
             
+            # Streaming mode tails the scrape directory instead of running a Spark job
+            if params.get('processingMode') == 'streaming':
+                return self._run_streaming(params)
+            
             # Initialize Spark with custom settings if provided
             if 'sparkSettings' in params:
                 self._initialize_spark(params['sparkSettings'])
@@ -128,11 +150,42 @@ class SparkService:
             logger.error(f"Analysis failed: {str(e)}")
             raise Exception(f"Analysis failed: {str(e)}")
     
+    def _run_streaming(self, params):
+        """
+        Start (or poll) the streaming trend monitor of a dataset directory.
+
+        The monitor is shared across requests: the first call replays the
+        directory and starts a background poller, later calls return the
+        current windows and bursts.
+        """
+        start_time = time.time()
+        dataset = params.get('dataset', 'reddit')
+        if dataset not in ('reddit', 'twitter', 'yelp', 'amazon'):
+            dataset = 'reddit'
+        
+        streaming_settings = params.get('streamingSettings', {})
+        config = {key: streaming_settings[key] for key in DEFAULT_STREAMING_CONFIG if key in streaming_settings}
+        monitor = get_monitor(os.path.join('data', dataset), config)
+        monitor.poll()
+        monitor.start(float(streaming_settings.get('pollInterval', 30)))
+        snapshot = monitor.snapshot()
+        
+        logger.info(f"Streaming snapshot for {dataset}: {len(snapshot['bursts'])} bursts")
+        return {
+            "processing_time": round(time.time() - start_time, 3),
+            "records_processed": snapshot['records_processed'],
+            "trends_found": len(snapshot['bursts']),
+            "streaming": snapshot
+        }
+    
     def stop_analysis(self):
         """Stop the running analysis"""
         try:
             logger.info("Stopping analysis")
             
+            # Stop streaming trend monitors
+            stop_monitors()
+            
             # If we have a running Spark session, stop it
             if self.spark:
                 self.spark.stop()
@@ -151,68 +204,266 @@ class SparkService:
             raise Exception(f"Failed to stop analysis: {str(e)}")
 
 class VisualizationService:
+    """
+    Dashboard charts computed from stored analysis results and rollups.
+
+    Charts are built once per (analysis file, timeframe) and kept in the shared
+    analysis cache, validated against the analysis file and its rollup, so the dashboard
+    only recomputes after a new analysis is written.
+    """
+
+    SENTIMENT_COLORS = ["#2ecc71", "#3498db", "#e74c3c"]
+    TOPIC_COLORS = ["#3498db", "#2ecc71", "#e74c3c", "#f1c40f", "#9b59b6"]
+
+    def __init__(self, analysis_dir=os.path.join('data', 'analysis')):
+        """
+        Initialize the visualization service.
+
+        Args:
+            analysis_dir: Directory holding analysis results (JSON or sections files)
+        """
+        self.analysis_dir = analysis_dir
+        self.catalog = FileCatalog(os.path.join(os.path.dirname(analysis_dir), 'store', CATALOG_FILENAME))
+
     def get_data(self, params):
-        """Get visualization data based on parameters"""
+        """
+        Get dashboard visualization data.
+
+        Args:
+            params: Request parameters: ``dataset`` (analysis file name, newest if
+                omitted), ``timeframe`` (see rollups.TIMEFRAMES) and ``max_points``
+
+        Returns:
+            Dictionary with ``trends``, ``sentiment``, ``engagement`` and ``topics`` charts
+        """
         try:
-            # TODO: Implement actual data retrieval
-            # This is a placeholder that returns dummy data
-            return {
-                "trends": self._get_trend_data(),
-                "sentiment": self._get_sentiment_data(),
-                "engagement": self._get_engagement_data(),
-                "topics": self._get_topic_data()
-            }
+            timeframe = params.get('timeframe', '30d')
+            if timeframe not in TIMEFRAMES:
+                timeframe = '30d'
+            max_points = parse_max_points(params.get('max_points'))
+
+            file_path = self._resolve_dataset(params.get('dataset'))
+            if file_path is None:
+                return self._empty_charts()
+
+            # One entry per timeframe, rebuilt when the analysis file or its rollup is rewritten
+            charts = analysis_cache.load(
+                file_path,
+                loader=lambda path: self._build_charts(path, timeframe),
+                part=f'dashboard:{timeframe}',
+                weight=0,
+                depends_on=[rollup_path_for(file_path)]
+            )
+
+            trends = charts['trends']
+            if max_points and len(trends['labels']) > max_points:
+                reduced = downsample_series(trends['labels'], [d['data'] for d in trends['datasets']], max_points)
+                trends = {
+                    "labels": reduced['labels'],
+                    "datasets": [dict(d, data=values) for d, values in zip(trends['datasets'], reduced['series'])]
+                }
+            return dict(charts, trends=trends, dataset=os.path.basename(file_path))
         except Exception as e:
             raise Exception(f"Data retrieval failed: {str(e)}")
-    
-    def _get_trend_data(self):
-        """Generate dummy trend data"""
-        dates = pd.date_range(end=datetime.now(), periods=7, freq='D')
+
+    def _resolve_dataset(self, dataset):
+        """Get the analysis file for a dataset name, defaulting to the newest analysis"""
+        if dataset:
+            file_path = os.path.join(self.analysis_dir, os.path.basename(dataset))
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Analysis file not found: {dataset}")
+            return file_path
+
+        newest = self.catalog.page([self.analysis_dir], kinds=['json', 'sections'], limit=1)['files']
+        return newest[0]['path'] if newest else None
+
+    def _empty_charts(self):
+        """Charts for when no analysis has been run yet"""
+        return {
+            "trends": {"labels": [], "datasets": []},
+            "sentiment": {"labels": ["Positive", "Neutral", "Negative"],
+                          "datasets": [{"data": [0, 0, 0], "backgroundColor": self.SENTIMENT_COLORS}]},
+            "engagement": {"labels": [f"{hour:02d}:00" for hour in range(24)],
+                           "datasets": [{"label": "User Engagement", "data": [0] * 24}]},
+            "topics": {"labels": [], "datasets": [{"data": [], "backgroundColor": []}]}
+        }
+
+    def _load_results(self, file_path):
+        """Load analysis results, accepting both flat and ``results``-wrapped documents"""
+        if is_sections_path(file_path):
+            return load_analysis_sections(file_path)
+        data = load_analysis(file_path)
+        return data['results'] if isinstance(data.get('results'), dict) else data
+
+    @timed('dashboard_charts')
+    def _build_charts(self, file_path, timeframe):
+        """Compute every dashboard chart for one analysis file and timeframe"""
+        results = self._load_results(file_path)
+        posts = self._post_frame(results)
+
+        rollup_path = rollup_path_for(file_path)
+        rollup = load_analysis(rollup_path) if os.path.exists(rollup_path) else None
+
+        # Restrict per-post data to the timeframe, anchored at the newest post like the rollups
+        window = TIMEFRAMES[timeframe][1]
+        if window is not None and not posts.empty:
+            posts = posts[posts['timestamp'] > posts['timestamp'].max() - window]
+
         return {
-            "labels": [d.strftime('%Y-%m-%d') for d in dates],
+            "trends": self._get_trend_data(results, posts, rollup, timeframe),
+            "sentiment": self._get_sentiment_data(results, posts, timeframe),
+            "engagement": self._get_engagement_data(posts, rollup, timeframe),
+            "topics": self._get_topic_data(results)
+        }
+
+    @staticmethod
+    def _epoch_seconds(values):
+        """Convert a series of epoch numbers or ISO strings to float epoch seconds"""
+        numeric = pd.to_numeric(values, errors='coerce')
+        missing = numeric.isna() & values.notna()
+        if missing.any():
+            parsed = pd.to_datetime(values[missing], utc=True, errors='coerce')
+            numeric[missing] = (parsed - pd.Timestamp(0, tz='UTC')).dt.total_seconds()
+        return numeric.astype(float)
+
+    def _post_frame(self, results):
+        """
+        Build a per-post frame (timestamp, sentiment, score, num_comments) from
+        the raw series stored by the sentiment and trend analyzers.
+        """
+        frames = []
+        over_time = results.get('sentiment_analysis', {}).get('sentiment_over_time', {})
+        if over_time.get('timestamps'):
+            frames.append(pd.DataFrame({
+                'timestamp': self._epoch_seconds(pd.Series(over_time['timestamps'], dtype=object)),
+                'sentiment': pd.to_numeric(pd.Series(over_time['sentiments']), errors='coerce')
+            }))
+
+        patterns = results.get('trend_analysis', {}).get('engagement_patterns')
+        if patterns:
+            engagement = pd.DataFrame(patterns, columns=['timestamp', 'score', 'num_comments'])
+            engagement['timestamp'] = self._epoch_seconds(engagement['timestamp'].astype(object))
+            frames.append(engagement)
+
+        if not frames:
+            return pd.DataFrame(columns=['timestamp', 'sentiment', 'score', 'num_comments'])
+
+        # Both series have one entry per post in the same order, so align by position
+        posts = pd.concat(frames, axis=1)
+        posts = posts.loc[:, ~posts.columns.duplicated()]
+        for column in ['sentiment', 'score', 'num_comments']:
+            if column not in posts:
+                posts[column] = np.nan
+        return posts.dropna(subset=['timestamp'])
+
+    @staticmethod
+    def _bucket_posts(posts, granularity):
+        """Group posts into rollup-compatible time buckets with vectorized group-bys"""
+        width = GRANULARITIES[granularity]
+        offset = WEEK_OFFSET if granularity == 'weekly' else 0
+        starts = ((posts['timestamp'] - offset) // width * width + offset).astype('int64')
+        buckets = posts.assign(start=starts, comments=posts['num_comments'].fillna(0)).groupby('start').agg(
+            posts=('timestamp', 'size'),
+            comments=('comments', 'sum'),
+            mean_sentiment=('sentiment', 'mean')
+        ).reset_index()
+        label_format = '%Y-%m-%d %H:00' if granularity == 'hourly' else '%Y-%m-%d'
+        buckets['label'] = pd.to_datetime(buckets['start'], unit='s', utc=True).dt.strftime(label_format)
+        return buckets
+
+    def _get_trend_data(self, results, posts, rollup, timeframe):
+        """Posts and comments per time bucket for the timeframe"""
+        if rollup is not None:
+            buckets = pd.DataFrame(select_rollup(rollup, timeframe)['buckets'],
+                                   columns=['start', 'label', 'posts', 'comments'])
+        elif not posts.empty:
+            buckets = self._bucket_posts(posts, TIMEFRAMES[timeframe][0])
+        else:
+            # Pre-aggregated trend results (time periods with mention counts)
+            trend = results.get('trend_analysis', {})
+            return {
+                "labels": list(trend.get('time_periods', [])),
+                "datasets": [{"label": "Mentions", "data": list(trend.get('mention_counts', []))}]
+            }
+
+        return {
+            "labels": buckets['label'].tolist(),
             "datasets": [{
-                "label": "Trend 1",
-                "data": np.random.randint(100, 1000, 7).tolist()
+                "label": "Posts",
+                "data": buckets['posts'].astype(int).tolist()
             }, {
-                "label": "Trend 2",
-                "data": np.random.randint(100, 1000, 7).tolist()
+                "label": "Comments",
+                "data": buckets['comments'].fillna(0).astype(int).tolist()
             }]
         }
-    
-    def _get_sentiment_data(self):
-        """Generate dummy sentiment data"""
+
+    def _get_sentiment_data(self, results, posts, timeframe):
+        """
+        Positive/neutral/negative split.
+
+        Windowed timeframes classify the per-post polarities inside the window;
+        'all' (or results without per-post polarities) uses the stored counts,
+        which also include comments.
+        """
+        sentiment = results.get('sentiment_analysis', {})
+        polarity = posts['sentiment'].dropna()
+        if timeframe != 'all' and not polarity.empty:
+            counts = [int((polarity > 0.1).sum()),
+                      int(((polarity >= -0.1) & (polarity <= 0.1)).sum()),
+                      int((polarity < -0.1).sum())]
+        else:
+            counts = [sentiment.get('positive_count', sentiment.get('positive', 0)),
+                      sentiment.get('neutral_count', sentiment.get('neutral', 0)),
+                      sentiment.get('negative_count', sentiment.get('negative', 0))]
         return {
             "labels": ["Positive", "Neutral", "Negative"],
             "datasets": [{
-                "data": [60, 30, 10],
-                "backgroundColor": ["#2ecc71", "#3498db", "#e74c3c"]
+                "data": counts,
+                "backgroundColor": self.SENTIMENT_COLORS
             }]
         }
-    
-    def _get_engagement_data(self):
-        """Generate dummy engagement data"""
-        hours = pd.date_range(end=datetime.now(), periods=24, freq='H')
+
+    def _get_engagement_data(self, posts, rollup, timeframe):
+        """Activity (posts plus comments) by hour of day, in UTC"""
+        if rollup is not None:
+            hourly = pd.DataFrame(rollup['granularities'].get('hourly', []),
+                                  columns=['start', 'posts', 'comments'])
+            window = TIMEFRAMES[timeframe][1]
+            if window is not None and rollup.get('last_timestamp') is not None:
+                hourly = hourly[hourly['start'] + GRANULARITIES['hourly'] > rollup['last_timestamp'] - window]
+            hours = (hourly['start'] // 3600) % 24
+            activity = hourly['posts'] + hourly['comments']
+        else:
+            hours = (posts['timestamp'] // 3600).astype('int64') % 24
+            activity = 1 + posts['num_comments'].fillna(0)
+
+        by_hour = activity.groupby(hours).sum().reindex(range(24), fill_value=0)
         return {
-            "labels": [h.strftime('%H:%M') for h in hours],
+            "labels": [f"{hour:02d}:00" for hour in range(24)],
             "datasets": [{
                 "label": "User Engagement",
-                "data": np.random.randint(50, 500, 24).tolist()
+                "data": by_hour.astype(int).tolist()
             }]
         }
-    
-    def _get_topic_data(self):
-        """Generate dummy topic distribution data"""
+
+    def _get_topic_data(self, results):
+        """Topic shares from topic modeling, or the most common phrases as a fallback"""
+        topics = results.get('topic_analysis', {})
+        distribution = topics.get('topic_distribution')
+        if isinstance(distribution, dict):
+            shares = pd.Series(distribution, dtype=float)
+        elif isinstance(distribution, list) and distribution:
+            shares = pd.Series(distribution, index=topics.get('topics') or
+                               [f"Topic {i + 1}" for i in range(len(distribution))], dtype=float)
+        else:
+            shares = pd.Series(results.get('trend_analysis', {}).get('common_phrases', {}), dtype=float)
+
+        shares = shares.sort_values(ascending=False).head(len(self.TOPIC_COLORS))
         return {
-            "labels": ["Topic 1", "Topic 2", "Topic 3", "Topic 4", "Topic 5"],
+            "labels": shares.index.tolist(),
             "datasets": [{
-                "data": np.random.randint(100, 1000, 5).tolist(),
-                "backgroundColor": [
-                    "#3498db",
-                    "#2ecc71",
-                    "#e74c3c",
-                    "#f1c40f",
-                    "#9b59b6"
-                ]
+                "data": shares.round(4).tolist(),
+                "backgroundColor": self.TOPIC_COLORS[:len(shares)]
             }]
         }
 
@@ -478,8 +729,21 @@ class DatasetService:
             type_dir = os.path.join(self.data_dir, dataset_type)
             if os.path.exists(type_dir):
                 for filename in os.listdir(type_dir):
-                    if filename.endswith('.csv') or filename.endswith('.json'):
-                        file_path = os.path.join(type_dir, filename)
+                    file_path = os.path.join(type_dir, filename)
+                    if is_jsonl_path(file_path):
+                        # Streamed scrapes carry their record count in the sidecar metadata
+                        metadata = read_metadata(file_path) or {}
+                        dataset_id = filename.split('.')[0]
+                        available_datasets.append({
+                            "id": dataset_id,
+                            "title": f"{dataset_type.capitalize()} Dataset: {dataset_id}",
+                            "file_path": file_path,
+                            "size": f"{os.path.getsize(file_path) / (1024*1024):.2f}MB",
+                            "records": metadata.get('records', "Unknown"),
+                            "type": dataset_type,
+                            "format": "JSONL"
+                        })
+                    elif (filename.endswith('.csv') or filename.endswith('.json')) and not is_auxiliary_path(file_path):
                         file_size = os.path.getsize(file_path)
                         
                         # Count lines in the file to estimate records
@@ -514,37 +778,22 @@ class DatasetService:
             # Simulate network delay
             time.sleep(2)
             
-            # Generate simulated tweets
-            tweets = []
-            for i in range(limit):
-                sentiment = random.choice(["positive", "neutral", "negative"])
-                tweet = {
-                    "id": f"tweet_{i}_{int(time.time())}",
-                    "text": f"This is a simulated tweet about {query}. #{query.replace(' ', '')} #BigData",
-                    "timestamp": (datetime.now() - timedelta(hours=random.randint(0, 72))).isoformat(),
-                    "user": f"user_{random.randint(1000, 9999)}",
-                    "likes": random.randint(0, 1000),
-                    "retweets": random.randint(0, 200),
-                    "sentiment": sentiment
-                }
-                tweets.append(tweet)
-            
-            # Save to a file
+            # Generate simulated tweets mentioning the query, with realistic
+            # vocabulary, engagement and posting-time distributions
+            from src.data.corpus_generator import write_corpus
             filename = f"twitter_scraped_{query.replace(' ', '_')}_{int(time.time())}.csv"
             file_path = os.path.join(self.data_dir, "twitter", filename)
+            generated = write_corpus(file_path, 'twitter', limit, 'csv', seed=random.randrange(1 << 32),
+                                     config={'topic': query, 'days': 3,
+                                             'start': (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')})
             
-            with open(file_path, 'w') as f:
-                f.write("id,text,timestamp,user,likes,retweets,sentiment\n")
-                for tweet in tweets:
-                    f.write(f"{tweet['id']},{tweet['text']},{tweet['timestamp']},{tweet['user']},{tweet['likes']},{tweet['retweets']},{tweet['sentiment']}\n")
-            
-            logger.info(f"Scraped {len(tweets)} tweets and saved to {file_path}")
+            logger.info(f"Scraped {generated['records']} tweets and saved to {file_path}")
             
             return {
                 "success": True,
                 "file_path": file_path,
-                "records": len(tweets),
-                "message": f"Successfully scraped {len(tweets)} tweets related to '{query}'"
+                "records": generated['records'],
+                "message": f"Successfully scraped {generated['records']} tweets related to '{query}'"
             }
             
         except Exception as e:
@@ -554,7 +803,7 @@ class DatasetService:
                 "message": f"Error scraping Twitter data: {str(e)}"
             }
     
-    def scrape_reddit_data(self, subreddit, limit=100):
+    def scrape_reddit_data(self, subreddit, limit=100, compression=None):
         """Scrape Reddit data from a subreddit using the Reddit API"""
         logger.info(f"Scraping Reddit data for subreddit: {subreddit}, limit: {limit}")
         
@@ -563,7 +812,7 @@ class DatasetService:
             from src.data.reddit_scraper import scrape_reddit_data as reddit_scraper
             
             # Call the scraper function
-            result = reddit_scraper(subreddit, limit, self.data_dir + "/reddit")
+            result = reddit_scraper(subreddit, limit, self.data_dir + "/reddit", compression)
             
             logger.info(f"Scraped {result.get('records', 0)} Reddit posts and saved to {result.get('file_path', 'unknown')}")
             
@@ -583,9 +832,12 @@ class AnalysisService:
         self.spark = SparkService()
         self.analysis_dir = os.path.join('data', 'analysis')
         os.makedirs(self.analysis_dir, exist_ok=True)
+        self.catalog = FileCatalog(os.path.join('data', 'store', CATALOG_FILENAME))
 
+    @timed('spark_analysis')
     def analyze_reddit_data(self, file_path, analysis_types=None):
         """Analyze Reddit data using Hadoop and Spark"""
+        profile = Profile('AnalysisService.analyze_reddit_data')
         try:
             # Initialize Spark session
             spark = self.spark.get_session()
@@ -749,14 +1001,20 @@ class AnalysisService:
             
             with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(results, f, indent=2)
+
+            # Store the run metrics next to the results
+            run_metrics = profile.report()
+            save_profile(output_file, run_metrics)
             
             return {
                 'success': True,
                 'message': 'Analysis completed successfully',
-                'file_path': output_file
+                'file_path': output_file,
+                'metrics': run_metrics
             }
 
         except Exception as e:
+            profile.report(status='error')
             logger.error(f"Error in analyze_reddit_data: {str(e)}")
             return {
                 'success': False,
@@ -765,41 +1023,59 @@ class AnalysisService:
 
     def get_analysis_files(self):
         """Get a list of available analysis files"""
+        return self.list_analysis_files()['files']
+
+    def list_analysis_files(self, sort='created', order='desc', limit=None, cursor=None, fields=None):
+        """
+        Get one page of analysis files from the file catalog.
+
+        Args:
+            sort: Sort key ('created', 'name' or 'size')
+            order: 'asc' or 'desc'
+            limit: Page size; None returns every file
+            cursor: ``next_cursor`` of the previous page
+            fields: Fields to keep in each entry; None keeps all
+
+        Returns:
+            Dictionary with ``files``, ``next_cursor`` and ``total``
+        """
         try:
             # Create the analysis directory if it doesn't exist
             os.makedirs(self.analysis_dir, exist_ok=True)
             
-            # Get all JSON files in the analysis directory
-            analysis_files = []
-            for filename in os.listdir(self.analysis_dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(self.analysis_dir, filename)
-                    file_stat = os.stat(file_path)
-                    
-                    # Extract dataset name from filename
-                    dataset_name = filename.split('_')[0]
-                    
-                    # Format creation time
-                    created = datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    analysis_files.append({
-                        "id": filename,  # Use filename as ID
-                        "dataset": dataset_name.capitalize(),
-                        "created": created,
-                        "size": file_stat.st_size,
-                        "path": file_path
-                    })
+            # JSON and sections files in the analysis directory
+            page = self.catalog.page([self.analysis_dir], kinds=['json', 'sections'],
+                                     sort=sort, order=order, limit=limit, cursor=cursor)
             
-            # Sort by creation time, newest first
-            analysis_files.sort(key=lambda x: x['created'], reverse=True)
+            analysis_files = []
+            for entry in page['files']:
+                filename = entry['filename']
+                
+                # Extract dataset name from filename
+                dataset_name = filename.split('_')[0]
+                
+                # Format creation time
+                created = datetime.fromtimestamp(entry['mtime']).strftime('%Y-%m-%d %H:%M:%S')
+                
+                analysis_files.append({
+                    "id": filename,  # Use filename as ID
+                    "dataset": dataset_name.capitalize(),
+                    "created": created,
+                    "size": entry['size'],
+                    "path": os.path.join(self.analysis_dir, filename)
+                })
             
-            return analysis_files
+            return {
+                "files": project(analysis_files, fields),
+                "next_cursor": page['next_cursor'],
+                "total": page['total']
+            }
             
         except Exception as e:
             logger.error(f"Error getting analysis files: {str(e)}")
-            return []
+            return {"files": [], "next_cursor": None, "total": 0}
     
-    def get_visualization_data(self, analysis_id, dataset='all', viz_type='all', timeframe='30d'):
+    def get_visualization_data(self, analysis_id, dataset='all', viz_type='all', timeframe='30d', max_points=None):
         """Get visualization data from an analysis file"""
         try:
             # Get the full path to the analysis file
@@ -808,20 +1084,36 @@ class AnalysisService:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Analysis file not found: {analysis_id}")
             
-            # Read the analysis data
-            with open(file_path, 'r') as f:
-                analysis_data = json.load(f)
+            # Get the results data (sections files only decode what this view needs)
+            if is_sections_path(file_path):
+                results = load_analysis_sections(file_path, VIZ_SECTIONS.get(viz_type))
+            else:
+                # Read the analysis data (parsed once per file version)
+                results = load_analysis(file_path).get('results', {})
             
             # Initialize visualizations dictionary
             visualizations = {}
             
-            # Get the results data
-            results = analysis_data.get('results', {})
-            
             if viz_type == 'all' or viz_type == 'sentiment':
                 if 'sentiment_analysis' in results:
                     sentiment_data = results['sentiment_analysis']
                     visualizations['sentiment'] = self._format_sentiment_data(sentiment_data)
+                    sentiment_time = self._format_sentiment_time_data(sentiment_data, max_points)
+                    if sentiment_time:
+                        visualizations['sentiment_time'] = sentiment_time
+            
+            if viz_type == 'all' or viz_type == 'engagement':
+                engagement_data = results.get('engagement_analysis', {})
+                engagement_time = self._format_engagement_time_data(
+                    results.get('trend_analysis', {}), max_points)
+                if engagement_time:
+                    visualizations['engagement_time'] = engagement_time
+                engagement_by_day = self._format_engagement_by_day_data(engagement_data, max_points)
+                if engagement_by_day:
+                    visualizations['engagement_by_day'] = engagement_by_day
+                influencers = self._format_influencers_data(engagement_data)
+                if influencers:
+                    visualizations['influencers'] = influencers
             
             if viz_type == 'all' or viz_type == 'location':
                 if 'location_analysis' in results:
@@ -915,32 +1207,61 @@ class AnalysisService:
             }]
         }
 
-    def _format_sentiment_time_data(self, sentiment_data):
-        """Format sentiment over time data for visualization"""
+    def _format_sentiment_time_data(self, sentiment_data, max_points=None):
+        """Format sentiment over time data for visualization, downsampled to max_points"""
         if 'sentiment_over_time' not in sentiment_data:
             return None
             
         time_data = sentiment_data['sentiment_over_time']
+        
+        # Raw per-post polarity as written by the analysis endpoint
+        if 'timestamps' in time_data:
+            # Timestamps may be epoch seconds or ISO strings; posts without one are skipped
+            points = sorted((epoch, sentiment) for epoch, sentiment in
+                            zip(map(to_epoch, time_data['timestamps']), time_data['sentiments'])
+                            if epoch is not None)
+            reduced = downsample_series(
+                [datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m-%d %H:%M') for ts, _ in points],
+                [[sentiment for _, sentiment in points]],
+                max_points
+            )
+            return {
+                "labels": reduced['labels'],
+                "datasets": [{
+                    "label": 'Sentiment',
+                    "data": reduced['series'][0],
+                    "borderColor": '#2196f3',
+                    "backgroundColor": 'rgba(33, 150, 243, 0.1)',
+                    "fill": False
+                }]
+            }
+        
+        reduced = downsample_series(
+            time_data['time_periods'],
+            [time_data['positive_percentages'], time_data['neutral_percentages'], time_data['negative_percentages']],
+            max_points
+        )
+        positive, neutral, negative = reduced['series']
         return {
-            "labels": time_data['time_periods'],
+            "labels": reduced['labels'],
             "datasets": [
                 {
                     "label": 'Positive',
-                    "data": time_data['positive_percentages'],
+                    "data": positive,
                     "borderColor": '#4caf50',
                     "backgroundColor": 'rgba(76, 175, 80, 0.1)',
                     "fill": True
                 },
                 {
                     "label": 'Neutral',
-                    "data": time_data['neutral_percentages'],
+                    "data": neutral,
                     "borderColor": '#2196f3',
                     "backgroundColor": 'rgba(33, 150, 243, 0.1)',
                     "fill": True
                 },
                 {
                     "label": 'Negative',
-                    "data": time_data['negative_percentages'],
+                    "data": negative,
                     "borderColor": '#f44336',
                     "backgroundColor": 'rgba(244, 67, 54, 0.1)',
                     "fill": True
@@ -972,18 +1293,62 @@ class AnalysisService:
             }]
         }
     
-    def _format_engagement_by_day_data(self, engagement_data):
+    def _format_engagement_time_data(self, trend_data, max_points=None):
+        """Format per-post engagement patterns over time for visualization, downsampled to max_points"""
+        if not trend_data.get('engagement_patterns'):
+            return None
+        
+        # Timestamps may be epoch seconds or ISO strings; posts without one are skipped
+        patterns = []
+        for pattern in trend_data['engagement_patterns']:
+            epoch = to_epoch(pattern.get('timestamp'))
+            if epoch is not None:
+                patterns.append((epoch, pattern))
+        patterns.sort(key=lambda item: item[0])
+        reduced = downsample_series(
+            [datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d %H:%M') for epoch, _ in patterns],
+            [[p['score'] for _, p in patterns], [p['num_comments'] for _, p in patterns]],
+            max_points
+        )
+        scores, comments = reduced['series']
+        return {
+            "labels": reduced['labels'],
+            "datasets": [
+                {
+                    "label": 'Score',
+                    "data": scores,
+                    "borderColor": 'rgb(54, 162, 235)',
+                    "backgroundColor": 'rgba(54, 162, 235, 0.5)',
+                    "yAxisID": 'y'
+                },
+                {
+                    "label": 'Comments',
+                    "data": comments,
+                    "borderColor": 'rgb(255, 99, 132)',
+                    "backgroundColor": 'rgba(255, 99, 132, 0.5)',
+                    "yAxisID": 'y1'
+                }
+            ]
+        }
+    
+    def _format_engagement_by_day_data(self, engagement_data, max_points=None):
         """Format engagement by day data for visualization"""
         if 'engagement_by_day' not in engagement_data:
             return None
             
         day_data = engagement_data['engagement_by_day']
+        reduced = downsample_series(
+            day_data['days'],
+            [day_data['counts'], day_data['avg_engagement']],
+            max_points
+        )
+        counts, avg_engagement = reduced['series']
         return {
-            "labels": day_data['days'],
+            "labels": reduced['labels'],
             "datasets": [
                 {
                     "label": 'Posts by Day',
-                    "data": day_data['counts'],
+                    "data": counts,
                     "backgroundColor": 'rgba(54, 162, 235, 0.5)',
                     "borderColor": 'rgb(54, 162, 235)',
                     "borderWidth": 1,
@@ -992,7 +1357,7 @@ class AnalysisService:
                 },
                 {
                     "label": 'Avg Engagement',
-                    "data": day_data['avg_engagement'],
+                    "data": avg_engagement,
                     "borderColor": 'rgb(255, 99, 132)',
                     "backgroundColor": 'rgba(255, 99, 132, 0.5)',
                     "borderWidth": 2,
@@ -1000,4 +1365,4 @@ class AnalysisService:
                     "yAxisID": 'y1'
                 }
             ]
-        } 
\ No newline at end of file
+        }
@@ -0,0 +1,210 @@
+"""
+Production serving of the Flask application.
+
+``python -m src.web.serving`` runs ``app.create_app()`` under a multi-process
+WSGI server instead of Flask's single-process development server::
+
+    python -m src.web.serving --workers 4 --threads 8 --bind 0.0.0.0:5000
+
+Gunicorn (Linux/macOS) is used when installed: the application is created and
+its heavy services warmed once in the master process, then shared with every
+forked worker. Waitress is the fallback on platforms without ``fork``; it
+serves from a single process with a thread pool. Without either server the
+development server is started with threading enabled and a warning.
+
+Every option can also be set from the environment (``WEB_BIND``,
+``WEB_WORKERS``, ``WEB_THREADS``, ``WEB_TIMEOUT``, ``WEB_MAX_REQUESTS``).
+Load balancers should probe ``/healthz`` (liveness) and ``/readyz`` (readiness).
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from typing import Dict, Any, Optional
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # Not installed, or unsupported platform
+    BaseApplication = None
+
+try:
+    import waitress
+except ImportError:
+    waitress = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BIND = '0.0.0.0:5000'
+DEFAULT_THREADS = 4
+DEFAULT_TIMEOUT = 300  # Analyses of large scrapes run inside the request
+SERVERS = ('auto', 'gunicorn', 'waitress', 'flask')
+
+# Imported in the master before forking so workers share their pages;
+# pyspark is left out because its sessions are per worker anyway
+PRELOAD_MODULES = ('numpy', 'pandas', 'textblob')
+
+
+def default_workers() -> int:
+    """Worker processes when none are configured: one per core plus one, capped at 8."""
+    return min((os.cpu_count() or 1) + 1, 8)
+
+
+def serving_config(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the serving configuration from the environment.
+
+    Args:
+        overrides: Values that take precedence over the environment (None values are ignored)
+
+    Returns:
+        Dictionary with bind, workers, threads, timeout and max_requests
+    """
+    config = {
+        'bind': os.getenv('WEB_BIND', DEFAULT_BIND),
+        'workers': int(os.getenv('WEB_WORKERS', default_workers())),
+        'threads': int(os.getenv('WEB_THREADS', DEFAULT_THREADS)),
+        'timeout': int(os.getenv('WEB_TIMEOUT', DEFAULT_TIMEOUT)),
+        # Recycle workers after this many requests to bound memory growth (0 disables)
+        'max_requests': int(os.getenv('WEB_MAX_REQUESTS', 0))
+    }
+    config.update({key: value for key, value in (overrides or {}).items() if value is not None})
+    return config
+
+
+def preload(app) -> Dict[str, Any]:
+    """
+    Warm the services every worker shares before the server forks.
+
+    Imports PRELOAD_MODULES, which the web modules otherwise load on first
+    use, and indexes the analysis and scrape directories in the file catalog
+    and the post store, so the first requests of each worker pay for neither.
+    Spark sessions are not started here: a JVM does not survive ``fork``, so
+    they stay lazy and are created by the worker that first needs one.
+
+    Args:
+        app: Application returned by ``create_app``
+
+    Returns:
+        Dictionary with the time spent per step in seconds
+    """
+    from . import views
+    from .startup import startup, load_modules
+
+    with startup.phase('preload'):
+        timings = load_modules(PRELOAD_MODULES)
+
+        start = time.perf_counter()
+        views.file_catalog.sync(os.path.join(views.DATA_DIR, 'analysis'))
+        timings['file_catalog'] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        views.post_store.sync_directory(os.path.join(views.DATA_DIR, 'reddit'))
+        timings['post_store'] = round(time.perf_counter() - start, 3)
+
+    logger.info(f"Preloaded services: {timings}")
+    return timings
+
+
+def _create_app():
+    """Import and create the application from the project root ``app.py``."""
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    from app import create_app
+    return create_app()
+
+
+if BaseApplication is not None:
+    class GunicornServer(BaseApplication):
+        """Gunicorn application serving a preloaded Flask app."""
+
+        def __init__(self, app, config: Dict[str, Any]):
+            self.application = app
+            self.serving = config
+            super().__init__()
+
+        def load_config(self):
+            self.cfg.set('bind', self.serving['bind'])
+            self.cfg.set('workers', self.serving['workers'])
+            self.cfg.set('threads', self.serving['threads'])
+            self.cfg.set('timeout', self.serving['timeout'])
+            self.cfg.set('max_requests', self.serving['max_requests'])
+            self.cfg.set('max_requests_jitter', self.serving['max_requests'] // 10)
+            # gthread workers keep one process per core busy with several requests each
+            self.cfg.set('worker_class', 'gthread' if self.serving['threads'] > 1 else 'sync')
+            self.cfg.set('preload_app', True)
+            self.cfg.set('accesslog', '-')
+
+        def load(self):
+            return self.application
+else:
+    GunicornServer = None
+
+
+def serve(server: str = 'auto', config: Optional[Dict[str, Any]] = None):
+    """
+    Serve the application until interrupted.
+
+    Args:
+        server: One of SERVERS; 'auto' picks gunicorn, then waitress, then flask
+        config: Result of serving_config (built from the environment if None)
+    """
+    if server not in SERVERS:
+        raise ValueError(f"Unknown server '{server}', expected one of {SERVERS}")
+    config = config or serving_config()
+
+    if server == 'auto':
+        if GunicornServer is not None:
+            server = 'gunicorn'
+        elif waitress is not None:
+            server = 'waitress'
+        else:
+            server = 'flask'
+    if server == 'gunicorn' and GunicornServer is None:
+        raise RuntimeError("gunicorn is not installed (pip install gunicorn)")
+    if server == 'waitress' and waitress is None:
+        raise RuntimeError("waitress is not installed (pip install waitress)")
+
+    app = _create_app()
+    preload(app)
+    host, _, port = config['bind'].rpartition(':')
+
+    if server == 'gunicorn':
+        logger.info(f"Serving with gunicorn on {config['bind']}: "
+                    f"{config['workers']} workers x {config['threads']} threads")
+        GunicornServer(app, config).run()
+    elif server == 'waitress':
+        logger.info(f"Serving with waitress on {config['bind']}: {config['threads']} threads")
+        waitress.serve(app, host=host or '0.0.0.0', port=int(port), threads=config['threads'],
+                       channel_timeout=config['timeout'])
+    else:
+        logger.warning("Neither gunicorn nor waitress is installed; "
+                       "falling back to the single-process development server")
+        app.run(host=host or '0.0.0.0', port=int(port), threaded=True, debug=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the Social Media Analyzer with a production WSGI server')
+    parser.add_argument('--server', choices=SERVERS, default='auto', help='WSGI server to use')
+    parser.add_argument('--bind', help=f'host:port to listen on (default {DEFAULT_BIND})')
+    parser.add_argument('--workers', type=int, help='worker processes (gunicorn only; default cores + 1, max 8)')
+    parser.add_argument('--threads', type=int, help=f'threads per worker (default {DEFAULT_THREADS})')
+    parser.add_argument('--timeout', type=int, help=f'seconds before a silent worker is restarted (default {DEFAULT_TIMEOUT})')
+    parser.add_argument('--max-requests', type=int, help='recycle workers after this many requests (default 0, never)')
+    args = parser.parse_args(argv)
+
+    serve(args.server, serving_config({
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'timeout': args.timeout,
+        'max_requests': args.max_requests
+    }))
+
+
+if __name__ == '__main__':
+    main()
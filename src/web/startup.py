@@ -0,0 +1,170 @@
+"""
+Deferred initialisation of heavy dependencies and services.
+
+Importing the web package must stay cheap: every gunicorn worker and every
+``python app.py`` pays for it before the first request. Heavy libraries are
+therefore bound with ``lazy_import``, which returns the module object
+immediately and executes it on first attribute access::
+
+    pd = lazy_import('pandas')      # nothing imported yet
+    pd.read_csv(path)               # pandas is imported here
+
+Clients and services that do work in their constructors (creating
+directories, building API clients) are wrapped in ``LazyService`` accessors
+and built by the first request that needs them.
+
+The shared ``startup`` report times the phases of application start-up and
+the first construction of every lazy service, and lists which heavy modules
+have been imported so far. It is logged when the app is created and served by
+``/api/startup``.
+"""
+
+import sys
+import time
+import logging
+import importlib.util
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Generic, List, Optional, TypeVar
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Modules whose import dominates start-up time
+HEAVY_MODULES = ('pyspark', 'pandas', 'numpy', 'praw', 'textblob', 'nltk', 'bs4', 'requests', 'sklearn')
+
+T = TypeVar('T')
+
+
+def lazy_import(name: str):
+    """
+    Bind a top-level module without executing it.
+
+    Args:
+        name: Module name, e.g. ``pandas``
+
+    Returns:
+        The module, loaded on first attribute access (or the real module if it
+        was already imported)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load_modules(names) -> Dict[str, float]:
+    """
+    Import modules now, e.g. in a pre-fork master so workers share them.
+
+    Args:
+        names: Module names
+
+    Returns:
+        Dictionary of module name to seconds spent importing it
+    """
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        # Touching an attribute executes a module bound by lazy_import
+        module.__name__
+        timings[name] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+def _is_loaded(name: str) -> bool:
+    """Whether a module has been executed, not just bound by lazy_import."""
+    module = sys.modules.get(name)
+    # LazyLoader swaps the module's class back to ModuleType once it has loaded
+    return module is not None and type(module) is type(sys)
+
+
+class StartupReport:
+    """Timings of application start-up and of lazily created services."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Dict[str, Any]] = []
+        self.services: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time one start-up phase, e.g. ``create_app``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append({'phase': name, 'seconds': round(time.perf_counter() - start, 6)})
+
+    def service_created(self, name: str, seconds: float):
+        """Record the first construction of a lazy service."""
+        with self._lock:
+            self.services[name] = round(seconds, 6)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarise start-up.
+
+        Returns:
+            Dictionary with the phases, seconds since this module was imported,
+            the construction time of each lazy service created so far and
+            which heavy modules are loaded
+        """
+        with self._lock:
+            return {
+                'phases': list(self.phases),
+                'uptime_seconds': round(time.perf_counter() - self.started, 3),
+                'services': dict(self.services),
+                'heavy_modules': {name: _is_loaded(name) for name in HEAVY_MODULES}
+            }
+
+
+# Shared report served by /api/startup
+startup = StartupReport()
+
+
+class LazyService(Generic[T]):
+    """Thread-safe accessor that builds a service on first use."""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        """
+        Wrap a service factory.
+
+        Args:
+            name: Service name used in the startup report
+            factory: Callable returning the service
+        """
+        self.name = name
+        self.factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> bool:
+        """Whether the service has been built."""
+        return self._instance is not None
+
+    def __call__(self) -> T:
+        """Get the service, building it on the first call."""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                self._instance = self.factory()
+                seconds = time.perf_counter() - start
+                startup.service_created(self.name, seconds)
+                logger.info(f"Initialized {self.name} in {seconds:.3f}s")
+            return self._instance
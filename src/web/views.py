@@ -3,34 +3,86 @@ Views for the web application
 """
 
 from flask import Blueprint, render_template, jsonify, request, send_file
-from .services import SparkService, VisualizationService, DatasetService, AnalysisService
+from .services import SparkService, VisualizationService, DatasetService
 import os
 from datetime import datetime, timedelta
 import random
-import praw
-import pandas as pd
-import numpy as np
-from textblob import TextBlob
 import re
+import uuid
 from collections import Counter
 import json
 import logging
 from flask import current_app
+from src.data.jsonl_io import JsonlWriter, jsonl_filename, load_posts, iter_posts, is_jsonl_path, is_auxiliary_path, read_metadata
+from src.data.post_store import PostStore, STORE_FILENAME, query_terms, to_epoch
+from src.data.file_catalog import FileCatalog, CATALOG_FILENAME, parse_listing_args, project
+from src.analysis.rollups import save_rollups, rollup_path_for
+from src.analysis.downsample import parse_max_points
+from src.analysis.text import extract_phrases, extract_locations, extract_context
+from src.analysis.streaming import get_monitor
+from src.analysis.section_store import SECTIONS_SUFFIX, write_sections
+from src.analysis.sketches import save_sketches, load_sketches, sketch_path_for
+from src.analysis.distinct import distinct_counts_for_range
+from src.analysis.result_store import ResultStore, RESULTS_FILENAME, result_key
+from src.analysis.partials import (AnalysisState, SentimentPartial, TrendPartial, IncidentPartial,
+                                   LocationPartial, PostLedger, PARTIALS_DIRNAME, load_state, save_state)
+from .analysis_cache import analysis_cache, load_visualization_data
+from .metrics import Profile, metrics, save_profile, metrics_path_for, PROMETHEUS_CONTENT_TYPE
+from .http_cache import conditional_json, not_modified, file_validator, directory_validator
+from .startup import LazyService, lazy_import, startup
+from .jobs import JobManager, JOBS_DIRNAME
+
+# Loaded on first use to keep application start-up fast
+pd = lazy_import('pandas')
 
 main_bp = Blueprint('main', __name__)
-dataset_service = DatasetService()
-analysis_service = AnalysisService()
+logger = logging.getLogger(__name__)
+
+# Services are built by the first request that needs them
+get_dataset_service = LazyService('dataset_service', DatasetService)
+
+
+def _create_reddit_client():
+    """Create the Reddit API client."""
+    import praw
+    return praw.Reddit(
+        client_id=os.getenv('REDDIT_CLIENT_ID'),
+        client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
+        user_agent='DrivingSG Analysis Bot v1.0'
+    )
 
-# Initialize Reddit API client
-reddit = praw.Reddit(
-    client_id=os.getenv('REDDIT_CLIENT_ID'),
-    client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-    user_agent='DrivingSG Analysis Bot v1.0'
-)
+
+get_reddit = LazyService('reddit_client', _create_reddit_client)
 
 # Data directory path
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
 
+# Deduplicated store of every Reddit scrape
+post_store = PostStore(os.path.join(DATA_DIR, 'store', STORE_FILENAME))
+file_catalog = FileCatalog(os.path.join(DATA_DIR, 'store', CATALOG_FILENAME))
+
+# Saved analyses keyed by input content, options and analyzer versions
+result_store = ResultStore(os.path.join(DATA_DIR, 'store', RESULTS_FILENAME),
+                           companions=(rollup_path_for, sketch_path_for, metrics_path_for))
+
+# Background scrapes (thread pool) and analyses (process pool) polled via /api/jobs/<id>
+job_manager = JobManager(os.path.join(DATA_DIR, JOBS_DIRNAME))
+
+# 'exact' counts trend phrases in a Counter; 'sketch' uses bounded-memory heavy hitters
+PHRASE_COUNTING_MODES = ('exact', 'sketch')
+
+# Bump an analyzer's version when its output changes so cached results are recomputed
+ANALYZER_VERSIONS = {
+    'sentiment': 1,
+    'trend': 1,
+    'traffic': 1,
+    'engagement': 1,
+    'location': 1,
+    'topic': 1,
+    'distinct': 1,
+    'rollups': 1
+}
+
 @main_bp.route('/')
 def index():
     """Home page with overview and statistics"""
@@ -223,8 +275,12 @@ def get_visualizations():
         # Get visualization parameters from query string
         params = request.args.to_dict()
         
-        # Initialize visualization service
-        viz_service = VisualizationService()
+        # Requests for a specific analysis file are served from that file
+        if params.get('file'):
+            return get_analysis_visualizations()
+        
+        # Initialize visualization service (dashboard charts from the stored analyses)
+        viz_service = VisualizationService(os.path.join(DATA_DIR, 'analysis'))
         
         # Get visualization data
         data = viz_service.get_data(params)
@@ -339,7 +395,7 @@ def search_datasets():
         source = request.args.get('source', 'all')
         limit = int(request.args.get('limit', 5))
         
-        results = dataset_service.search_datasets(query, source, limit)
+        results = get_dataset_service().search_datasets(query, source, limit)
         
         return jsonify({
             "status": "success",
@@ -364,7 +420,7 @@ def download_dataset():
                 "message": "Dataset ID is required"
             })
         
-        result = dataset_service.download_dataset(dataset_id)
+        result = get_dataset_service().download_dataset(dataset_id)
         
         return jsonify({
             "status": "success" if result["success"] else "error",
@@ -381,12 +437,19 @@ def download_dataset():
 def available_datasets():
     """API endpoint to get available datasets"""
     try:
-        datasets = dataset_service.get_available_datasets()
+        validator = directory_validator(
+            os.path.join(get_dataset_service().data_dir, dataset_type)
+            for dataset_type in ["twitter", "reddit", "yelp", "amazon"]
+        )
+        cached = not_modified(validator)
+        if cached is not None:
+            return cached
+        datasets = get_dataset_service().get_available_datasets()
         
-        return jsonify({
+        return conditional_json({
             "status": "success",
             "data": datasets
-        })
+        }, validator)
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -407,7 +470,7 @@ def scrape_twitter():
                 "message": "Query is required"
             })
         
-        result = dataset_service.scrape_twitter_data(query, limit)
+        result = get_dataset_service().scrape_twitter_data(query, limit)
         
         return jsonify({
             "status": "success" if result["success"] else "error",
@@ -420,31 +483,55 @@ def scrape_twitter():
             "message": str(e)
         })
 
-@main_bp.route('/api/scrape-reddit', methods=['POST'])
-def scrape_reddit():
-    """Scrape data from r/drivingsg subreddit"""
-    try:
-        data = request.get_json()
-        subreddit = data.get('subreddit', 'drivingsg')
-        limit = int(data.get('limit', 500))
-        sort_by = data.get('sort_by', 'new')
-        post_type = data.get('post_type', 'all')
-
-        # Get subreddit instance
-        sub = reddit.subreddit(subreddit)
-
-        # Get posts based on sort type
-        if sort_by == 'hot':
-            posts = sub.hot(limit=limit)
-        elif sort_by == 'top':
-            posts = sub.top(limit=limit)
-        elif sort_by == 'controversial':
-            posts = sub.controversial(limit=limit)
-        else:
-            posts = sub.new(limit=limit)
+def scrape_params(data):
+    """Keyword arguments of scrape_subreddit from a request body."""
+    return {
+        'subreddit': data.get('subreddit', 'drivingsg'),
+        'limit': int(data.get('limit', 500)),
+        'sort_by': data.get('sort_by', 'new'),
+        'post_type': data.get('post_type', 'all'),
+        'compression': data.get('compression')
+    }
+
+def scrape_subreddit(subreddit='drivingsg', limit=500, sort_by='new', post_type='all', compression=None):
+    """
+    Scrape posts and their comments into a JSONL file and the post store.
+
+    Args:
+        subreddit: Subreddit to scrape
+        limit: Maximum number of posts
+        sort_by: 'new', 'hot', 'top' or 'controversial'
+        post_type: 'all' or a flair filter ('discussion', 'question', 'incident')
+        compression: Optional compression of the JSONL file
+
+    Returns:
+        Dictionary with the file path and number of posts written
+    """
+    # Get subreddit instance
+    sub = get_reddit().subreddit(subreddit)
+
+    # Get posts based on sort type
+    if sort_by == 'hot':
+        posts = sub.hot(limit=limit)
+    elif sort_by == 'top':
+        posts = sub.top(limit=limit)
+    elif sort_by == 'controversial':
+        posts = sub.controversial(limit=limit)
+    else:
+        posts = sub.new(limit=limit)
+
+    # Stream post data to disk as it is scraped
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = jsonl_filename(f'drivingsg_data_{timestamp}', compression)
+    filepath = os.path.join('data', 'reddit', filename)
+    metadata = {
+        'subreddit': subreddit,
+        'sort_by': sort_by,
+        'post_type': post_type,
+        'limit': limit
+    }
 
-        # Collect post data
-        posts_data = []
+    with JsonlWriter(filepath, compression=compression, metadata=metadata) as writer:
         for post in posts:
             # Skip if post type filter is active and post doesn't match
             if post_type != 'all':
@@ -479,24 +566,29 @@ def scrape_reddit():
                     'author': str(comment.author)
                 })
 
-            posts_data.append(post_dict)
+            writer.write(post_dict)
 
-        # Save to file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'drivingsg_data_{timestamp}.json'
-        filepath = os.path.join('data', 'reddit', filename)
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(posts_data, f)
+    # Merge the new scrape into the deduplicated store
+    try:
+        post_store.ingest_file(filepath)
+    except Exception as e:
+        logger.warning(f"Could not add {filepath} to the post store: {str(e)}")
 
+    return {
+        'file_path': filepath,
+        'records': writer.records
+    }
+
+@main_bp.route('/api/scrape-reddit', methods=['POST'])
+def scrape_reddit():
+    """Scrape data from r/drivingsg subreddit"""
+    try:
+        data = request.get_json()
+        result = scrape_subreddit(**scrape_params(data))
         return jsonify({
             'success': True,
-            'message': f'Successfully scraped {len(posts_data)} posts',
-            'file_path': filepath,
-            'records': len(posts_data)
+            'message': f"Successfully scraped {result['records']} posts",
+            **result
         })
 
     except Exception as e:
@@ -505,13 +597,151 @@ def scrape_reddit():
             'message': str(e)
         })
 
-@main_bp.route('/api/analyze-reddit-data', methods=['POST'])
-def analyze_reddit_data():
-    """Analyze scraped Reddit data"""
+def analysis_params(data):
+    """Keyword arguments of run_reddit_analysis from a request body."""
+    return {
+        'file_path': data.get('file_path'),
+        'analysis_types': data.get('analysis_types', []),
+        'result_format': data.get('result_format', 'json'),
+        'phrase_counting': data.get('phrase_counting', 'exact'),
+        'refresh': bool(data.get('refresh', False))
+    }
+
+def _load_analysis_input(file_path, analysis_types, phrase_counting, cache_params, refresh, profile):
+    """
+    Load the posts of an analysis run and the state they are added to.
+
+    Sentiment, trend, traffic, location and distinct counts are kept as
+    mergeable partial states; for the post store they are saved with the store
+    version, so the next run only analyses the rows ingested since. Without a
+    usable saved state the store is snapshotted into a memory-mapped corpus,
+    and scrape files are read whole.
+
+    Args:
+        file_path: Absolute path of a scrape file or of the post store
+        analysis_types: Analyses to run
+        phrase_counting: One of PHRASE_COUNTING_MODES
+        cache_params: Cache parameters of the run, which also name its saved state
+        refresh: Ignore the saved state
+        profile: Profile of the run; loading is timed as its 'load' stage
+
+    Returns:
+        Dictionary with the ``state`` to add posts to, ``posts_data``,
+        ``record_count``, whether the run is ``incremental`` (and the store
+        ``changes`` it applies), the store ``corpus`` of a full run, and the
+        ``state_path`` and ``state_version`` to save the state with (None if
+        the state is not kept)
+    """
+    store_input = post_store.is_store_path(file_path)
+    loaded = {
+        'state': AnalysisState(analysis_types, phrase_counting),
+        'incremental': False,
+        'changes': None,
+        'corpus': None,
+        'state_path': None,
+        'state_version': None
+    }
+    with profile.stage('load') as stage:
+        if store_input and 'topic' not in analysis_types:
+            lineage = result_key('store', {key: cache_params[key]
+                                           for key in ('analysis_types', 'phrase_counting', 'analyzers')})
+            loaded['state_path'] = os.path.join(DATA_DIR, 'store', PARTIALS_DIRNAME, f'{lineage}.json')
+            saved = None if refresh else load_state(loaded['state_path'])
+            changes = post_store.changes_since(saved['version'], 'reddit') if saved else None
+            if saved and changes['text_changed']:
+                logger.info("Edited posts or comments since the saved analysis state, re-analysing everything")
+                saved = None
+            if saved:
+                saved['state'].ledger.update_engagement(changes['updated'])
+                loaded.update(state=saved['state'], incremental=True, changes=changes,
+                              state_version=changes['version'], posts_data=changes['posts'])
+
+        if store_input and not loaded['incremental']:
+            # Memory-mapped snapshot of the store; posts are built one at a time as analyzers read them
+            from src.data.corpus import CORPUS_DIRNAME, store_corpus
+            corpus = store_corpus(post_store, os.path.join(DATA_DIR, 'store', CORPUS_DIRNAME))
+            posts_data = corpus.posts()
+            loaded.update(corpus=corpus, state_version=corpus.version, posts_data=posts_data,
+                          record_count=posts_data.records)
+        else:
+            if not store_input:
+                loaded['posts_data'] = load_posts(file_path)
+            posts_data = loaded['posts_data']
+            loaded['record_count'] = len(posts_data) + sum(len(post.get('comments', [])) for post in posts_data)
+        stage.add_records(loaded['record_count'])
+    return loaded
+
+def _save_analysis_outputs(results, state, analysis_types, result_format, analysis_dir, profile,
+                           state_path=None, state_version=None):
+    """
+    Save the results of an analysis run with their sidecar files.
+
+    Args:
+        results: Result sections
+        state: AnalysisState the results were built from
+        analysis_types: Analyses that ran
+        result_format: 'json' or 'sections'
+        analysis_dir: Directory of the analysis files
+        profile: Profile of the run; each file is timed as a stage
+        state_path: Where to keep the state for the next incremental run (None to skip)
+        state_version: Store version the state was computed at
+
+    Returns:
+        Path of the analysis file
+    """
+    # The random part keeps runs finishing in the same second (or refreshing the same key) apart
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    suffix = SECTIONS_SUFFIX if result_format == 'sections' else '.json'
+    analysis_path = os.path.join(analysis_dir, f'drivingsg_analysis_{timestamp}_{uuid.uuid4().hex[:8]}{suffix}')
+    os.makedirs(analysis_dir, exist_ok=True)
+
+    # Save the results (sections files let charts decode one section at a time)
+    with profile.stage('save'):
+        if result_format == 'sections':
+            write_sections(analysis_path, results, {'analysis_types': analysis_types})
+        else:
+            with open(analysis_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+    logger.info(f"Analysis results saved to: {analysis_path}")
+
+    # Save time-bucketed rollups so charts don't need the per-post arrays
+    with profile.stage('rollups', len(state.ledger)):
+        save_rollups(analysis_path, state.rollups())
+
+    # Save mergeable sketches so shard and daily results can be combined later
+    sketches = {'distinct': state.distinct.to_dict()}
+    if 'trend' in state.partials and state.partials['trend'].phrase_sketch is not None:
+        sketches['common_phrases'] = state.partials['trend'].phrase_sketch.to_dict()
+    with profile.stage('sketches'):
+        save_sketches(analysis_path, sketches)
+
+    # Keep the partial states for the next incremental run
+    if state_path is not None:
+        with profile.stage('save_state'):
+            save_state(state_path, state, state_version)
+    return analysis_path
+
+def run_reddit_analysis(file_path, analysis_types=None, result_format='json', phrase_counting='exact',
+                        refresh=False):
+    """
+    Analyze a Reddit scrape (or the post store) and save the results.
+
+    Args:
+        file_path: Scrape to analyze, absolute or relative to the project root
+        analysis_types: Analyses to run, e.g. ['sentiment', 'trend']
+        result_format: 'json' or 'sections'
+        phrase_counting: One of PHRASE_COUNTING_MODES
+        refresh: Recompute even if an identical analysis was saved before
+
+    Returns:
+        Dictionary with the analysis file name, its path, the run metrics, the
+        cache key and whether the result was reused
+    """
+    analysis_types = analysis_types or []
+    profile = Profile('analyze_reddit_data')
     try:
-        data = request.get_json()
-        file_path = data.get('file_path')
-        analysis_types = data.get('analysis_types', [])
+        if phrase_counting not in PHRASE_COUNTING_MODES:
+            raise ValueError(f"Unsupported phrase counting mode: {phrase_counting}")
 
         # Get the project root directory
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -520,60 +750,110 @@ def analyze_reddit_data():
         if not os.path.isabs(file_path):
             file_path = os.path.join(project_root, file_path)
 
-        # Load the data
-        with open(file_path, 'r', encoding='utf-8') as f:
-            posts_data = json.load(f)
+        # Reuse the saved result of an identical analysis of the same input
+        with profile.stage('lookup'):
+            if post_store.is_store_path(file_path):
+                post_store.sync_directory(os.path.join(DATA_DIR, 'reddit'))
+                fingerprint = f"store:{post_store.version('reddit')}"
+            else:
+                fingerprint = result_store.fingerprint(file_path)
+            cache_params = {
+                'analysis_types': sorted(analysis_types),
+                'result_format': result_format,
+                'phrase_counting': phrase_counting,
+                'analyzers': {name: version for name, version in ANALYZER_VERSIONS.items()
+                              if name in analysis_types or name in ('distinct', 'rollups')}
+            }
+            cache_key = result_key(fingerprint, cache_params)
+            cached_path = None if refresh else result_store.lookup(cache_key)
 
-        # Initialize results dictionary
-        results = {}
+        if cached_path:
+            logger.info(f"Reusing analysis {cached_path} for key {cache_key}")
+            return {
+                'analysis_file': os.path.basename(cached_path),
+                'analysis_path': cached_path,
+                'metrics': profile.report(status='cached'),
+                'cache_key': cache_key,
+                'cached': True
+            }
 
-        # Perform sentiment analysis
-        if 'sentiment' in analysis_types:
-            sentiment_results = analyze_sentiment(posts_data)
-            results['sentiment_analysis'] = sentiment_results
+        loaded = _load_analysis_input(file_path, analysis_types, phrase_counting, cache_params, refresh, profile)
+        state, posts_data = loaded['state'], loaded['posts_data']
+        record_count, incremental = loaded['record_count'], loaded['incremental']
+        store_input = post_store.is_store_path(file_path)
 
-        # Perform trend detection
-        if 'trend' in analysis_types:
-            trend_results = analyze_trends(posts_data)
-            results['trend_analysis'] = trend_results
+        # Analyze the posts (only the delta when updating a saved state). Large
+        # store snapshots are split across worker processes that map the corpus
+        # by handle and send back only their partial states
+        from src.analysis.parallel import analyze_parallel, should_parallelize
+        delta = AnalysisState(analysis_types, phrase_counting) if incremental else state
+        if store_input and not incremental and should_parallelize(record_count):
+            with profile.stage('analyze_parallel', record_count):
+                state = analyze_parallel(loaded['corpus'], analysis_types, phrase_counting)
+        else:
+            for name, add_posts in delta.steps():
+                with profile.stage(name, record_count):
+                    add_posts(posts_data)
+        if incremental:
+            with profile.stage('merge', record_count):
+                state.merge(delta)
+            logger.info(f"Updated saved analysis state with {len(posts_data)} new or commented posts "
+                        f"and {len(loaded['changes']['updated'])} engagement changes")
 
-        # Perform traffic incident analysis
-        if 'traffic' in analysis_types:
-            traffic_results = analyze_traffic_incidents(posts_data)
-            results['traffic_analysis'] = traffic_results
+        results = state.sections()
 
-        # Perform location analysis
-        if 'location' in analysis_types:
-            location_results = analyze_locations(posts_data)
-            results['location_analysis'] = location_results
+        # Perform engagement analysis (read column-wise straight from the store when possible)
+        if 'engagement' in analysis_types:
+            with profile.stage('engagement', record_count):
+                from src.analysis.engagement import analyze_engagement, analyze_engagement_frames, load_store_frames
+                if store_input:
+                    engagement_results = analyze_engagement_frames(*load_store_frames(post_store.db_path))
+                else:
+                    engagement_results = analyze_engagement(posts_data)
+            results['engagement_analysis'] = engagement_results
 
         # Perform topic modeling
         if 'topic' in analysis_types:
-            topic_results = analyze_topics(posts_data)
+            with profile.stage('topic', len(posts_data)):
+                topic_results = analyze_topics(posts_data)
             results['topic_analysis'] = topic_results
 
-        # Save analysis results
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        analysis_file = f'drivingsg_analysis_{timestamp}.json'
-        
-        # Use absolute path for analysis output
-        analysis_dir = os.path.join(project_root, 'data', 'analysis')
-        analysis_path = os.path.join(analysis_dir, analysis_file)
-        
-        # Ensure analysis directory exists
-        os.makedirs(analysis_dir, exist_ok=True)
-        
-        # Save the results
-        with open(analysis_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2)
-        
-        current_app.logger.info(f"Analysis results saved to: {analysis_path}")
+        # Save the results with their rollups, sketches and, for the store, the partial states
+        analysis_path = _save_analysis_outputs(results, state, analysis_types, result_format,
+                                               os.path.join(project_root, 'data', 'analysis'), profile,
+                                               loaded['state_path'], loaded['state_version'])
+        analysis_file = os.path.basename(analysis_path)
+
+        # Store the run metrics next to the results
+        run_metrics = profile.report()
+        save_profile(analysis_path, run_metrics)
+
+        # Index the result by its key; this also enforces the result size and age budgets
+        result_store.record(cache_key, analysis_path, cache_params)
         
+        return {
+            'analysis_file': analysis_file,
+            'analysis_path': analysis_path,
+            'metrics': run_metrics,
+            'cache_key': cache_key,
+            'cached': False,
+            'incremental': incremental
+        }
+
+    except Exception:
+        profile.report(status='error')
+        raise
+
+@main_bp.route('/api/analyze-reddit-data', methods=['POST'])
+def analyze_reddit_data():
+    """Analyze scraped Reddit data"""
+    try:
+        data = request.get_json()
+        result = run_reddit_analysis(**analysis_params(data))
         return jsonify({
             'status': 'success',
             'message': 'Analysis completed successfully',
-            'analysis_file': analysis_file,
-            'analysis_path': analysis_path
+            **result
         })
 
     except Exception as e:
@@ -583,196 +863,108 @@ def analyze_reddit_data():
             'message': str(e)
         })
 
+def _job_response(job):
+    """202 response pointing at the status URL of a queued job."""
+    return jsonify({
+        'status': 'success',
+        'message': f"Job {job['id']} queued",
+        'job': job,
+        'status_url': f"/api/jobs/{job['id']}"
+    }), 202
+
+@main_bp.route('/api/jobs/scrape-reddit', methods=['POST'])
+def submit_scrape_reddit():
+    """API endpoint to scrape a subreddit in the background"""
+    try:
+        params = scrape_params(request.get_json() or {})
+        job = job_manager.submit('scrape_reddit', 'io', scrape_subreddit, params=params, **params)
+        return _job_response(job)
+    except Exception as e:
+        current_app.logger.error(f"Error submitting scrape job: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main_bp.route('/api/jobs/analyze-reddit-data', methods=['POST'])
+def submit_analyze_reddit_data():
+    """API endpoint to analyze scraped Reddit data in a worker process"""
+    try:
+        params = analysis_params(request.get_json() or {})
+        if not params['file_path']:
+            return jsonify({
+                'status': 'error',
+                'message': 'file_path is required'
+            }), 400
+        if params['phrase_counting'] not in PHRASE_COUNTING_MODES:
+            return jsonify({
+                'status': 'error',
+                'message': f"Unsupported phrase counting mode: {params['phrase_counting']}"
+            }), 400
+        # The worker process has its own metrics registry; fold its run report into ours
+        job = job_manager.submit('analyze_reddit_data', 'cpu', run_reddit_analysis, params=params,
+                                 on_success=lambda result: metrics.record_report(result.get('metrics')),
+                                 **params)
+        return _job_response(job)
+    except Exception as e:
+        current_app.logger.error(f"Error submitting analysis job: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main_bp.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """API endpoint to poll a background job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Job not found: {job_id}'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'job': job
+    })
+
+@main_bp.route('/api/jobs')
+def list_jobs():
+    """API endpoint to list recent background jobs"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        return jsonify({
+            'status': 'success',
+            'jobs': job_manager.list(limit)
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error listing jobs: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
 def analyze_sentiment(posts_data):
     """Analyze sentiment of posts and comments"""
-    from textblob import TextBlob
-    
-    sentiment_results = {
-        'positive_count': 0,
-        'neutral_count': 0,
-        'negative_count': 0,
-        'sentiment_over_time': {
-            'timestamps': [],
-            'sentiments': []
-        }
-    }
-    
-    for post in posts_data:
-        # Analyze post content
-        text = f"{post['title']} {post['text']}"
-        blob = TextBlob(text)
-        sentiment = blob.sentiment.polarity
-        
-        # Categorize sentiment
-        if sentiment > 0.1:
-            sentiment_results['positive_count'] += 1
-        elif sentiment < -0.1:
-            sentiment_results['negative_count'] += 1
-        else:
-            sentiment_results['neutral_count'] += 1
-            
-        # Add to time series
-        sentiment_results['sentiment_over_time']['timestamps'].append(post['created_utc'])
-        sentiment_results['sentiment_over_time']['sentiments'].append(sentiment)
-        
-        # Analyze comments
-        for comment in post.get('comments', []):
-            blob = TextBlob(comment['text'])
-            sentiment = blob.sentiment.polarity
-            
-            if sentiment > 0.1:
-                sentiment_results['positive_count'] += 1
-            elif sentiment < -0.1:
-                sentiment_results['negative_count'] += 1
-            else:
-                sentiment_results['neutral_count'] += 1
-    
-    return sentiment_results
+    return SentimentPartial().add_posts(posts_data).result()
 
-def analyze_trends(posts_data):
-    """Analyze trends in posts and comments"""
-    from collections import Counter
-    import re
-    
-    trend_results = {
-        'common_phrases': Counter(),
-        'trending_topics': Counter(),
-        'engagement_patterns': []
-    }
-    
-    # Extract phrases and topics
-    for post in posts_data:
-        # Get phrases from title and text
-        text = f"{post['title']} {post['text']}"
-        phrases = extract_phrases(text)
-        trend_results['common_phrases'].update(phrases)
-        
-        # Track engagement
-        trend_results['engagement_patterns'].append({
-            'timestamp': post['created_utc'],
-            'score': post['score'],
-            'num_comments': post['num_comments']
-        })
-        
-        # Process comments
-        for comment in post.get('comments', []):
-            phrases = extract_phrases(comment['text'])
-            trend_results['common_phrases'].update(phrases)
-    
-    # Get top phrases and topics
-    trend_results['common_phrases'] = dict(trend_results['common_phrases'].most_common(20))
-    
-    return trend_results
+def analyze_trends(posts_data, phrase_sketch=None):
+    """Analyze trends in posts and comments
+
+    Phrases are counted exactly in a Counter by default. Passing a
+    HeavyHitters sketch counts them in bounded memory instead; the sketch is
+    filled in place so the caller can save and merge it.
+    """
+    posts_data = list(posts_data)
+    trends = TrendPartial(phrase_sketch).add_posts(posts_data)
+    return trends.result(PostLedger().add_posts(posts_data).engagement_patterns())
 
 def analyze_traffic_incidents(posts_data):
     """Analyze traffic incidents from posts and comments"""
-    incident_keywords = {
-        'accident': ['accident', 'crash', 'collision'],
-        'traffic_jam': ['jam', 'congestion', 'heavy traffic'],
-        'road_work': ['construction', 'roadwork', 'maintenance'],
-        'weather': ['rain', 'flood', 'weather'],
-        'violation': ['speeding', 'red light', 'illegal']
-    }
-    
-    incident_results = {
-        'incident_types': Counter(),
-        'incident_locations': Counter(),
-        'incident_times': []
-    }
-    
-    for post in posts_data:
-        text = f"{post['title']} {post['text']}".lower()
-        
-        # Check for incidents
-        for incident_type, keywords in incident_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                incident_results['incident_types'][incident_type] += 1
-                
-                # Extract location if available
-                locations = extract_locations(text)
-                incident_results['incident_locations'].update(locations)
-                
-                # Add timestamp
-                incident_results['incident_times'].append({
-                    'type': incident_type,
-                    'timestamp': post['created_utc']
-                })
-        
-        # Check comments for additional incident reports
-        for comment in post.get('comments', []):
-            text = comment['text'].lower()
-            for incident_type, keywords in incident_keywords.items():
-                if any(keyword in text for keyword in keywords):
-                    incident_results['incident_types'][incident_type] += 1
-                    locations = extract_locations(text)
-                    incident_results['incident_locations'].update(locations)
-    
-    return incident_results
+    return IncidentPartial().add_posts(posts_data).result()
 
 def analyze_locations(posts_data):
     """Analyze location mentions in posts and comments"""
-    # Singapore locations and areas
-    sg_locations = {
-        'regions': ['north', 'south', 'east', 'west', 'central'],
-        'areas': [
-            'woodlands', 'tampines', 'jurong', 'changi', 'yishun', 
-            'ang mo kio', 'bedok', 'clementi', 'punggol', 'sengkang'
-        ],
-        'roads': [
-            'pie', 'cte', 'sle', 'bke', 'tpe', 'ecp', 'aye', 'kje',
-            'orchard road', 'thomson road', 'bukit timah'
-        ]
-    }
-    
-    location_results = {
-        'region_mentions': Counter(),
-        'area_mentions': Counter(),
-        'road_mentions': Counter(),
-        'location_context': []
-    }
-    
-    for post in posts_data:
-        text = f"{post['title']} {post['text']}".lower()
-        
-        # Check regions
-        for region in sg_locations['regions']:
-            if region in text:
-                location_results['region_mentions'][region] += 1
-        
-        # Check areas
-        for area in sg_locations['areas']:
-            if area in text:
-                location_results['area_mentions'][area] += 1
-                location_results['location_context'].append({
-                    'location': area,
-                    'timestamp': post['created_utc'],
-                    'context': extract_context(text, area)
-                })
-        
-        # Check roads
-        for road in sg_locations['roads']:
-            if road in text:
-                location_results['road_mentions'][road] += 1
-                location_results['location_context'].append({
-                    'location': road,
-                    'timestamp': post['created_utc'],
-                    'context': extract_context(text, road)
-                })
-        
-        # Process comments
-        for comment in post.get('comments', []):
-            text = comment['text'].lower()
-            for region in sg_locations['regions']:
-                if region in text:
-                    location_results['region_mentions'][region] += 1
-            for area in sg_locations['areas']:
-                if area in text:
-                    location_results['area_mentions'][area] += 1
-            for road in sg_locations['roads']:
-                if road in text:
-                    location_results['road_mentions'][road] += 1
-    
-    return location_results
+    return LocationPartial().add_posts(posts_data).result()
 
 def analyze_topics(posts_data):
     """Perform topic modeling on posts and comments"""
@@ -822,53 +1014,72 @@ def analyze_topics(posts_data):
     
     return topic_results
 
-def extract_phrases(text):
-    """Extract meaningful phrases from text"""
-    import re
-    from collections import Counter
-    
-    # Remove special characters and convert to lowercase
-    text = re.sub(r'[^\w\s]', ' ', text.lower())
-    
-    # Split into words
-    words = text.split()
-    
-    # Create phrases (bigrams)
-    phrases = [' '.join(words[i:i+2]) for i in range(len(words)-1)]
-    
-    return Counter(phrases)
-
-def extract_locations(text):
-    """Extract location mentions from text"""
-    # Singapore location keywords
-    locations = ['woodlands', 'tampines', 'jurong', 'changi', 'yishun', 
-                'ang mo kio', 'bedok', 'clementi', 'punggol', 'sengkang',
-                'pie', 'cte', 'sle', 'bke', 'tpe', 'ecp', 'aye', 'kje']
-    
-    found_locations = []
-    text = text.lower()
-    
-    for location in locations:
-        if location in text:
-            found_locations.append(location)
-    
-    return found_locations
+def parse_since(value):
+    """Parse a relative window such as '7d' or '24h', an epoch time or an ISO date into epoch seconds"""
+    if not value:
+        return None
+    match = re.fullmatch(r'(\d+)([mhdw])', value.strip().lower())
+    if match:
+        unit_seconds = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+        return datetime.now().timestamp() - int(match.group(1)) * unit_seconds[match.group(2)]
+    return to_epoch(value)
 
-def extract_context(text, keyword, window=50):
-    """Extract context around a keyword mention"""
-    text = text.lower()
-    keyword = keyword.lower()
-    
-    # Find the position of the keyword
-    pos = text.find(keyword)
-    if pos == -1:
-        return ""
-    
-    # Get the surrounding context
-    start = max(0, pos - window)
-    end = min(len(text), pos + len(keyword) + window)
-    
-    return text[start:end]
+@main_bp.route('/api/search-posts')
+def search_posts():
+    """API endpoint for ranked full-text search over scraped posts and comments"""
+    try:
+        query = request.args.get('q', '')
+        source = request.args.get('source')
+        limit = int(request.args.get('limit', 20))
+        since = parse_since(request.args.get('since'))
+        until = parse_since(request.args.get('until'))
+        
+        if not query_terms(query):
+            return jsonify({
+                'status': 'error',
+                'message': 'Query is required'
+            }), 400
+        
+        started = datetime.now()
+        
+        # Pick up any scrapes that have not been indexed yet
+        post_store.sync_directory(os.path.join(DATA_DIR, 'reddit'), 'reddit')
+        post_store.sync_directory(os.path.join(DATA_DIR, 'twitter'), 'twitter', include_csv=True)
+        
+        hits = post_store.search(query, source=source, since=since, until=until, limit=limit)
+        
+        # Build a context snippet around the first query term found in each hit
+        terms = query_terms(query)
+        results = []
+        for hit in hits:
+            text = f"{hit['title'] or ''} {hit['text'] or ''}" if hit['kind'] == 'post' else (hit['text'] or '')
+            lowered = text.lower()
+            term = next((t for t in terms if t in lowered), terms[0])
+            results.append({
+                'kind': hit['kind'],
+                'id': hit['doc_id'],
+                'post_id': hit['post_id'],
+                'source': hit['source'],
+                'title': hit['title'],
+                'created_utc': hit['created_utc'],
+                'score': hit['score'],
+                'rank': hit['rank'],
+                'snippet': extract_context(text, term)
+            })
+        
+        return jsonify({
+            'status': 'success',
+            'query': query,
+            'count': len(results),
+            'took_ms': round((datetime.now() - started).total_seconds() * 1000, 2),
+            'results': results
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error in search_posts: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
 
 @main_bp.route('/api/dataset-file/<path:filename>')
 def dataset_file(filename):
@@ -881,7 +1092,7 @@ def dataset_file(filename):
                 "message": "Invalid filename"
             })
         
-        file_path = os.path.join(dataset_service.data_dir, filename)
+        file_path = os.path.join(get_dataset_service().data_dir, filename)
         
         if not os.path.exists(file_path):
             return jsonify({
@@ -898,7 +1109,7 @@ def dataset_file(filename):
 
 @main_bp.route('/api/get-analysis-files', methods=['GET'])
 def get_analysis_files():
-    """API endpoint to get available analysis files"""
+    """API endpoint to get available analysis files (paginated with ``limit``/``cursor``)"""
     try:
         # Get the project root directory (two levels up from the current file)
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -907,34 +1118,35 @@ def get_analysis_files():
         current_app.logger.info(f"Project root: {project_root}")
         current_app.logger.info(f"Analysis directory: {analysis_dir}")
         
-        files = []
+        try:
+            listing = parse_listing_args(request.args, default_sort='created')
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        fields = listing.pop('fields')
         
-        if os.path.exists(analysis_dir):
-            for filename in os.listdir(analysis_dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(analysis_dir, filename)
-                    stats = os.stat(file_path)
-                    
-                    # Get relative path from project root
-                    rel_path = os.path.relpath(file_path, project_root)
-                    
-                    files.append({
-                        'filename': filename,
-                        'size': stats.st_size,
-                        'created': stats.st_mtime,
-                        'path': rel_path,
-                        'full_path': file_path
-                    })
+        validator = file_catalog.validator([analysis_dir])
+        cached = not_modified(validator)
+        if cached is not None:
+            return cached
+        page = file_catalog.page([analysis_dir], kinds=['json', 'sections'], **listing)
         
-        # Sort files by creation time (newest first)
-        files.sort(key=lambda x: x['created'], reverse=True)
+        files = [{
+            'filename': entry['filename'],
+            'size': entry['size'],
+            'created': entry['mtime'],
+            # Relative path from project root
+            'path': os.path.relpath(entry['path'], project_root),
+            'full_path': entry['path']
+        } for entry in page['files']]
         
-        return jsonify({
+        return conditional_json({
             "status": "success",
-            "files": files,
+            "files": project(files, fields),
+            "next_cursor": page['next_cursor'],
+            "total": page['total'],
             "analysis_dir": analysis_dir,
             "project_root": project_root
-        })
+        }, validator)
     except Exception as e:
         current_app.logger.error(f"Error in get_analysis_files: {str(e)}")
         return jsonify({
@@ -951,6 +1163,7 @@ def get_analysis_visualizations():
         file_path = request.args.get('file')
         viz_type = request.args.get('type', 'all')
         timeframe = request.args.get('timeframe', '30d')
+        max_points = parse_max_points(request.args.get('max_points'))
         
         # Get the project root directory
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -967,22 +1180,17 @@ def get_analysis_visualizations():
                 "message": f"Analysis file not found: {file_path}"
             })
         
-        # Read the analysis file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            analysis_data = json.load(f)
+        validator = file_validator(file_path, rollup_path_for(file_path))
+        cached = not_modified(validator)
+        if cached is not None:
+            return cached
         
-        # Filter data based on visualization type if needed
-        if viz_type != 'all':
-            filtered_data = {}
-            for key, value in analysis_data.items():
-                if key.startswith(viz_type):
-                    filtered_data[key] = value
-            analysis_data = filtered_data
+        analysis_data = load_visualization_data(file_path, viz_type, timeframe, max_points)
         
-        return jsonify({
+        return conditional_json({
             "status": "success",
             "data": analysis_data
-        })
+        }, validator)
     except Exception as e:
         current_app.logger.error(f"Error loading visualizations: {str(e)}")
         return jsonify({
@@ -991,39 +1199,247 @@ def get_analysis_visualizations():
             "file_path": file_path if 'file_path' in locals() else "Not set"
         })
 
+@main_bp.route('/api/streaming-trends')
+def streaming_trends():
+    """API endpoint to get the sliding-window trends and bursts of a streamed dataset"""
+    try:
+        dataset = request.args.get('dataset', 'reddit')
+        if dataset not in ['reddit', 'twitter', 'amazon', 'yelp']:
+            return jsonify({
+                'status': 'error',
+                'message': f"Unknown dataset: {dataset}"
+            }), 400
+        
+        monitor = get_monitor(os.path.join(DATA_DIR, dataset))
+        if request.args.get('poll') or not monitor.running:
+            monitor.poll()
+        
+        return jsonify({
+            'status': 'success',
+            'data': monitor.snapshot(int(request.args.get('top', 10)))
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error in streaming_trends: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main_bp.route('/api/distinct-counts')
+def distinct_counts():
+    """
+    API endpoint to get distinct authors and vocabulary size over a date range.
+
+    Merges the daily HyperLogLog sketches of the analyses named in ``files``
+    (comma separated, defaults to the newest analysis) between ``start`` and
+    ``end`` (inclusive, YYYY-MM-DD).
+    """
+    try:
+        analysis_dir = os.path.join(DATA_DIR, 'analysis')
+        filenames = [name.strip() for name in request.args.get('files', '').split(',') if name.strip()]
+        if not filenames:
+            newest = file_catalog.page([analysis_dir], kinds=['json', 'sections'], limit=1)['files']
+            filenames = [entry['filename'] for entry in newest]
+
+        serialised = []
+        for filename in filenames:
+            file_path = os.path.join(analysis_dir, os.path.basename(filename))
+            sketch = load_sketches(file_path).get('distinct')
+            if sketch is None:
+                return jsonify({
+                    'status': 'error',
+                    'message': f"No distinct-count sketches for analysis: {filename}"
+                }), 404
+            serialised.append(sketch)
+
+        counts = distinct_counts_for_range(serialised, request.args.get('start'), request.args.get('end'))
+        counts['files'] = filenames
+        return jsonify({
+            'status': 'success',
+            'data': counts
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error in distinct_counts: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main_bp.route('/metrics')
+def prometheus_metrics():
+    """Analysis stage timings, run counts, peak RSS and cache counters in Prometheus text format"""
+    return current_app.response_class(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@main_bp.route('/healthz')
+def healthz():
+    """Liveness probe: the worker is up and answering requests"""
+    return jsonify({'status': 'success', 'pid': os.getpid()})
+
+@main_bp.route('/readyz')
+def readyz():
+    """Readiness probe: the data directory is writable and the file catalog answers"""
+    checks = {}
+    try:
+        checks['data_dir'] = os.path.isdir(DATA_DIR) and os.access(DATA_DIR, os.W_OK)
+        try:
+            file_catalog.validator([os.path.join(DATA_DIR, 'analysis')])
+            checks['file_catalog'] = True
+        except Exception as e:
+            current_app.logger.error(f"File catalog not ready: {str(e)}")
+            checks['file_catalog'] = False
+
+        ready = all(checks.values())
+        return jsonify({
+            'status': 'success' if ready else 'error',
+            'pid': os.getpid(),
+            'checks': checks
+        }), 200 if ready else 503
+    except Exception as e:
+        current_app.logger.error(f"Error in readiness check: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
+
+@main_bp.route('/api/startup')
+def startup_report():
+    """API endpoint to report start-up timings and which heavy modules are loaded"""
+    return jsonify({
+        'status': 'success',
+        'pid': os.getpid(),
+        'startup': startup.report()
+    })
+
+@main_bp.route('/api/result-cache')
+def result_cache_stats():
+    """API endpoint to report the content-addressed analysis results"""
+    try:
+        return jsonify({
+            'status': 'success',
+            'result_cache': result_store.stats()
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error reading result cache: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main_bp.route('/api/result-cache/gc', methods=['POST'])
+def result_cache_gc():
+    """API endpoint to delete superseded, expired and over-budget analysis results"""
+    try:
+        data = request.get_json(silent=True) or {}
+        max_bytes = data.get('max_bytes')
+        max_age_days = data.get('max_age_days')
+        collected = result_store.collect_garbage(
+            max_bytes=int(max_bytes) if max_bytes is not None else None,
+            max_age=float(max_age_days) * 86400 if max_age_days is not None else None
+        )
+        return jsonify({
+            'status': 'success',
+            'collected': collected
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error collecting result cache: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main_bp.route('/api/cache-stats')
+def cache_stats():
+    """API endpoint to report analysis cache usage"""
+    return jsonify({
+        'status': 'success',
+        'analysis_cache': analysis_cache.stats()
+    })
+
 @main_bp.route('/api/list-datasets')
 def list_datasets():
-    """API endpoint to list available datasets from the data directory"""
+    """
+    API endpoint to list available datasets from the data directory.
+
+    Supports ``sort``, ``order``, ``limit``, ``cursor`` and ``fields``. The body
+    stays a plain list; when a page is truncated the cursor for the next page is
+    returned in the ``X-Next-Cursor`` header.
+    """
     try:
+        listing = parse_listing_args(request.args)
+        fields = listing.pop('fields')
+        source_dirs = {os.path.abspath(os.path.join(DATA_DIR, source)): source
+                       for source in ['reddit', 'twitter', 'amazon', 'yelp']}
+        
+        # The deduplicated post store is listed as a dataset of its own, paged and sorted with the files
+        store_files = [os.path.abspath(post_store.db_path)] if post_store.exists() else []
+        
+        validator = file_catalog.validator(source_dirs, extra=post_store.version('reddit'), files=store_files)
+        cached = not_modified(validator)
+        if cached is not None:
+            return cached
+        page = file_catalog.page(source_dirs, files=store_files, **listing)
+        
         datasets = []
-        # Scan through each data source directory
-        for source in ['reddit', 'twitter', 'amazon', 'yelp']:
-            source_dir = os.path.join(DATA_DIR, source)
-            if os.path.exists(source_dir):
-                for file in os.listdir(source_dir):
-                    file_path = os.path.join(source_dir, file)
-                    if os.path.isfile(file_path):
-                        # Get file stats
-                        stats = os.stat(file_path)
-                        # Get file format
-                        format = file.split('.')[-1].upper()
-                        
-                        # Generate a readable title from filename
-                        title = ' '.join(
-                            word.capitalize() 
-                            for word in file.split('.')[0].replace('_', ' ').split()
-                        )
-                        
-                        datasets.append({
-                            'title': title,
-                            'source': source,
-                            'file_path': file_path,
-                            'size': stats.st_size,
-                            'format': format,
-                            'updated': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                        })
+        for entry in page['files']:
+            updated = datetime.fromtimestamp(entry['mtime']).strftime('%Y-%m-%d %H:%M:%S')
+            if entry['path'] in store_files:
+                datasets.append({
+                    'title': 'Deduplicated Reddit Posts',
+                    'source': 'store',
+                    'file_path': entry['path'],
+                    'size': entry['size'],
+                    'format': 'SQLITE',
+                    'records': post_store.get_stats('reddit')['posts'],
+                    'updated': updated
+                })
+                continue
+            
+            file = entry['filename']
+            # Get file format
+            format = 'JSONL' if entry['kind'] == 'jsonl' else file.split('.')[-1].upper()
+            
+            # Generate a readable title from filename
+            title = ' '.join(
+                word.capitalize() 
+                for word in file.split('.')[0].replace('_', ' ').split()
+            )
+            
+            datasets.append({
+                'title': title,
+                'source': source_dirs[entry['directory']],
+                'file_path': entry['path'],
+                'size': entry['size'],
+                'format': format,
+                'updated': updated
+            })
         
-        return jsonify(datasets)
+        response = conditional_json(project(datasets, fields), validator)
+        response.headers['X-Total-Count'] = str(page['total'])
+        if page['next_cursor']:
+            response.headers['X-Next-Cursor'] = page['next_cursor']
+        return response
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@main_bp.route('/api/post-store/sync', methods=['POST'])
+def sync_post_store():
+    """API endpoint to merge new Reddit scrapes into the deduplicated post store"""
+    try:
+        ingested = post_store.sync_directory(os.path.join(DATA_DIR, 'reddit'))
+        
+        return jsonify({
+            'status': 'success',
+            'ingested': ingested,
+            'store': post_store.get_stats('reddit')
+        })
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -1043,7 +1459,7 @@ def get_dataset_info():
         
         # Get file stats
         stats = os.stat(file_path)
-        format = file_path.split('.')[-1].upper()
+        format = 'JSONL' if is_jsonl_path(file_path) else file_path.split('.')[-1].upper()
         
         # Generate title from filename
         filename = os.path.basename(file_path)
@@ -1057,7 +1473,14 @@ def get_dataset_info():
         description = ''
         
         try:
-            if format == 'JSON':
+            if post_store.is_store_path(file_path):
+                format = 'SQLITE'
+                store_stats = post_store.get_stats('reddit')
+                records = store_stats['posts']
+                description = (f"Deduplicated store of {records} posts and {store_stats['comments']} comments "
+                               f"merged from {store_stats['files']} scrape files")
+            
+            elif format == 'JSON':
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     if isinstance(data, list):
@@ -1066,6 +1489,15 @@ def get_dataset_info():
                         records = 1
                     description = f"JSON dataset containing {records} records"
             
+            elif format == 'JSONL':
+                # Streamed scrapes record their post count in the sidecar metadata
+                metadata = read_metadata(file_path)
+                records = metadata.get('records') if metadata else None
+                if records is None:
+                    # No sidecar (e.g. an interrupted scrape): count the lines without keeping the posts
+                    records = sum(1 for _ in iter_posts(file_path))
+                description = f"JSONL dataset containing {records} records"
+            
             elif format == 'CSV':
                 df = pd.read_csv(file_path)
                 records = len(df)
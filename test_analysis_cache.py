@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.web.analysis_cache import AnalysisCache, load_visualization_data
+from src.analysis.rollups import build_rollups, save_rollups
+
+START = 1742169600  # 2025-03-17 00:00 UTC
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def counting_loader(calls):
+    def loader(path):
+        calls.append(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return loader
+
+
+def test_rewritten_files_are_parsed_again(tmp_path):
+    cache, calls = AnalysisCache(), []
+    path = write_json(tmp_path / 'analysis.json', {'value': 1})
+
+    assert cache.load(path, counting_loader(calls)) == {'value': 1}
+    assert cache.load(path, counting_loader(calls)) == {'value': 1}
+    assert len(calls) == 1
+
+    # A different size changes the key even within the same mtime tick
+    write_json(path, {'value': 22})
+    assert cache.load(path, counting_loader(calls)) == {'value': 22}
+    assert len(calls) == 2
+    assert (cache.stats()['hits'], cache.stats()['misses'], cache.stats()['entries']) == (1, 2, 1)
+
+
+def test_dependencies_and_parts_are_tracked(tmp_path):
+    cache, calls = AnalysisCache(), []
+    path = write_json(tmp_path / 'analysis.json', {'value': 1})
+    companion = str(tmp_path / 'rollup.json')
+
+    cache.load(path, counting_loader(calls), depends_on=[companion])
+    cache.load(path, counting_loader(calls), depends_on=[companion])
+    # A companion appearing invalidates the entry
+    write_json(companion, {})
+    cache.load(path, counting_loader(calls), depends_on=[companion])
+    assert len(calls) == 2
+
+    cache.load(path, lambda path: 'first part', part='first', weight=0)
+    assert cache.stats()['entries'] == 2
+    cache.invalidate(path)
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_eviction_by_bytes_and_entries(tmp_path):
+    paths = [write_json(tmp_path / f'{i}.json', {'padding': 'x' * 100}) for i in range(4)]
+    size = os.path.getsize(paths[0])
+
+    by_bytes = AnalysisCache(max_bytes=2 * size)
+    for path in paths[:3]:
+        by_bytes.load(path)
+    assert by_bytes.stats()['entries'] == 2 and by_bytes.stats()['evictions'] == 1
+    # Least recently used goes first: the first file was evicted, the third is still cached
+    by_bytes.load(paths[2])
+    assert by_bytes.stats()['hits'] == 1
+
+    by_entries = AnalysisCache(max_entries=3)
+    for path in paths:
+        by_entries.load(path)
+    assert by_entries.stats()['entries'] == 3
+
+    # Files larger than the whole cache are returned but not kept
+    tiny = AnalysisCache(max_bytes=size - 1)
+    assert tiny.load(paths[0]) == {'padding': 'x' * 100}
+    assert tiny.stats()['entries'] == 0
+
+
+def test_visualization_data_serves_rollups(tmp_path):
+    posts = [{'created_utc': START + i * 3600, 'score': i, 'num_comments': 1, 'comments': []} for i in range(48)]
+    analysis = {
+        'sentiment_analysis': {'overall_sentiment': 0.2,
+                               'sentiment_over_time': {'timestamps': [post['created_utc'] for post in posts],
+                                                       'sentiments': [0.1] * 48}},
+        'trend_analysis': {'engagement_patterns': [{'timestamp': post['created_utc'], 'score': post['score'],
+                                                    'num_comments': 1} for post in posts]}
+    }
+    path = write_json(tmp_path / 'drivingsg_analysis_20250319_000000.json', analysis)
+
+    raw = load_visualization_data(path, 'sentiment', max_points=10)
+    assert list(raw) == ['sentiment_analysis']
+    assert len(raw['sentiment_analysis']['sentiment_over_time']['timestamps']) <= 10
+
+    save_rollups(path, build_rollups(posts))
+    data = load_visualization_data(path, 'all', timeframe='24h')
+    assert data['rollup']['granularity'] == 'hourly' and len(data['rollup']['buckets']) == 25
+    assert 'sentiment_over_time' not in data['sentiment_analysis']
+    assert 'engagement_patterns' not in data['trend_analysis']
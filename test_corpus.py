@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.post_store import PostStore
+from src.data.corpus_generator import generate_posts
+from src.data.corpus import Corpus, CORPUS_DIRNAME, META_FILENAME, store_corpus
+
+
+def sample_posts():
+    posts = sorted(generate_posts(60, seed=5), key=lambda post: post['created_utc'])
+    # Records the arrays must carry through unchanged: non-ASCII text, unknown author and time
+    posts[0].update(title='Jalan Bahar – 事故', text='', author=None, flair=None)
+    posts[1]['created_utc'] = None
+    posts[2]['comments'] = []
+    return posts
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostStore(str(tmp_path / 'posts.db'))
+    with open(tmp_path / 'scrape.json', 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {}, 'posts': sample_posts()}, f)
+    store.ingest_file(str(tmp_path / 'scrape.json'))
+    return store
+
+
+def test_from_store_matches_store_posts(store):
+    corpus = Corpus.from_store(store.db_path)
+    expected = store.load_posts()
+    assert list(corpus.iter_posts()) == expected
+    assert corpus.post_count == len(expected)
+    assert len(corpus) == len(expected) + sum(len(post['comments']) for post in expected)
+    assert corpus.version == store.version()
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_and_open_round_trip(store, tmp_path, mmap):
+    corpus = Corpus.from_store(store.db_path)
+    path = corpus.save(str(tmp_path / 'snapshot'))
+
+    opened = Corpus.open(path, mmap=mmap)
+    assert opened.path == path
+    assert opened.version == corpus.version
+    assert list(opened.posts()) == list(corpus.posts())
+    assert opened.summary()['array_bytes'] == corpus.summary()['array_bytes']
+    opened.release()
+
+
+def test_post_ranges_cover_every_post(store):
+    corpus = Corpus.from_store(store.db_path)
+    posts = list(corpus.iter_posts())
+    assert list(corpus.posts(0, 20)) + list(corpus.posts(20)) == posts
+
+    view = corpus.posts(10, 30)
+    assert len(view) == 20
+    assert view.records == sum(1 + len(post['comments']) for post in posts[10:30])
+    # Views are re-iterable, since analyzers read posts_data several times
+    assert list(view) == list(view)
+
+
+def test_from_posts_keeps_text_and_labels():
+    posts = sample_posts()
+    corpus = Corpus.from_posts(posts)
+    rebuilt = list(corpus.iter_posts())
+    assert [post['id'] for post in rebuilt] == [post['id'] for post in posts]
+    assert rebuilt[0]['title'] == 'Jalan Bahar – 事故'
+    assert rebuilt[0]['author'] is None and rebuilt[0]['flair'] is None
+    assert rebuilt[1]['created_utc'] is None
+    assert [len(post['comments']) for post in rebuilt] == [len(post['comments']) for post in posts]
+
+
+def test_store_corpus_keeps_one_snapshot_per_version(store, tmp_path):
+    directory = str(tmp_path / CORPUS_DIRNAME)
+    first = store_corpus(store, directory)
+    assert first.version == store.version()
+    assert store_corpus(store, directory).path == first.path
+
+    more = sorted(generate_posts(10, seed=6), key=lambda post: post['created_utc'])
+    with open(tmp_path / 'more.json', 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {}, 'posts': more}, f)
+    store.ingest_file(str(tmp_path / 'more.json'))
+
+    second = store_corpus(store, directory)
+    assert second.version == store.version() == first.version + 1
+    assert second.post_count == first.post_count + len(more)
+    assert os.listdir(directory) == [os.path.basename(second.path)]
+    assert os.path.exists(os.path.join(second.path, META_FILENAME))
@@ -0,0 +1,85 @@
+import os
+import sys
+import math
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analysis.sketches import HyperLogLog
+from src.analysis.distinct import DistinctCounter, analyze_distinct, distinct_counts_for_range
+
+DAY = 86400
+START = 1742169600  # 2025-03-17 00:00 UTC
+
+
+def relative_error(estimate, truth):
+    return abs(estimate - truth) / truth
+
+
+def test_hyperloglog_error_within_bound():
+    for precision in (10, 12, 14):
+        counter = HyperLogLog(precision)
+        counter.update_all(f'user_{i}' for i in range(50000))
+        # Standard error is 1.04 / sqrt(m); allow three of them
+        assert relative_error(counter.count(), 50000) <= 3 * 1.04 / math.sqrt(2 ** precision)
+
+
+def test_hyperloglog_small_range_and_duplicates():
+    counter = HyperLogLog()
+    for _ in range(5):
+        counter.update_all(f'user_{i}' for i in range(100))
+    assert abs(counter.count() - 100) <= 2
+    assert HyperLogLog().count() == 0
+
+
+def test_hyperloglog_merge_equals_union():
+    first, second, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    first.update_all(f'user_{i}' for i in range(0, 30000))
+    second.update_all(f'user_{i}' for i in range(20000, 50000))
+    union.update_all(f'user_{i}' for i in range(0, 50000))
+
+    merged = first.merge(HyperLogLog.from_dict(second.to_dict()))
+    assert merged.registers == union.registers
+    assert relative_error(merged.count(), 50000) <= 3 * 1.04 / math.sqrt(4096)
+
+
+def make_posts(authors, day):
+    """One post per author on a day, each with a comment by the next author."""
+    return [{
+        'id': f'p{day}_{i}',
+        'title': f'Accident at Woodlands {i}',
+        'text': f'word{i}',
+        'created_utc': START + day * DAY + i,
+        'author': author,
+        'comments': [{'id': f'c{day}_{i}', 'text': 'ok', 'created_utc': START + day * DAY + i + 60,
+                      'author': authors[(i + 1) % len(authors)]}]
+    } for i, author in enumerate(authors)]
+
+
+def test_distinct_counter_merge_and_ranges():
+    day0 = make_posts([f'user_{i}' for i in range(300)], 0)
+    day1 = make_posts([f'user_{i}' for i in range(200, 600)], 1)
+
+    merged = analyze_distinct(day0).merge(DistinctCounter.from_dict(analyze_distinct(day1).to_dict()))
+    full = analyze_distinct(day0 + day1)
+    assert merged.summary() == full.summary()
+
+    summary = full.summary()
+    assert relative_error(summary['authors'], 600) <= 0.05
+    assert summary['by_day']['days'] == ['2025-03-17', '2025-03-18']
+    assert relative_error(summary['by_day']['authors'][1], 400) <= 0.05
+
+    first_day = distinct_counts_for_range([full.to_dict()], end='2025-03-17')
+    assert first_day['days'] == ['2025-03-17']
+    assert relative_error(first_day['authors'], 300) <= 0.05
+    both = distinct_counts_for_range([analyze_distinct(day0).to_dict(), analyze_distinct(day1).to_dict()])
+    assert both['authors'] == summary['authors']
+
+
+def test_distinct_counter_skips_unknown_authors_and_comment_stubs():
+    counter = analyze_distinct([
+        {'title': 'a', 'text': '', 'created_utc': START, 'author': '[deleted]', 'comments': []},
+        {'title': '', 'text': '', 'created_utc': START, 'author': 'user_1', 'comments_only': True,
+         'comments': [{'text': 'hi', 'created_utc': START, 'author': 'user_2'}]}
+    ])
+    assert counter.summary()['authors'] == 1
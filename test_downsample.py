@@ -0,0 +1,92 @@
+import os
+import sys
+import math
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analysis.downsample import (lttb_indices, minmax_indices, downsample_series,
+                                     downsample_raw_series, parse_max_points)
+from src.data.post_store import to_epoch
+
+
+def wave(n):
+    return [math.sin(i / 7) * 10 + (50 if i == n // 3 else 0) for i in range(n)]
+
+
+def test_lttb_keeps_bounds_and_endpoints():
+    values = wave(1000)
+    for max_points in (3, 10, 100):
+        indices = lttb_indices(values, max_points)
+        assert len(indices) == max_points
+        assert indices[0] == 0 and indices[-1] == 999
+        assert indices == sorted(set(indices))
+    # The spike forms the largest triangle of its bucket
+    assert 1000 // 3 in lttb_indices(values, 50)
+    assert lttb_indices(values[:5], 10) == [0, 1, 2, 3, 4]
+
+
+def test_minmax_keeps_extremes_of_every_series():
+    first, second = wave(1000), [-value for value in wave(1000)]
+    indices = minmax_indices([first, second], 100)
+    assert len(indices) <= 100
+    kept_first = [first[i] for i in indices]
+    kept_second = [second[i] for i in indices]
+    assert max(kept_first) == max(first) and min(kept_first) == min(first)
+    assert max(kept_second) == max(second) and min(kept_second) == min(second)
+
+
+def test_downsample_series_limits_and_passthrough():
+    labels = list(range(500))
+    reduced = downsample_series(labels, [wave(500), [None] * 500], 40)
+    assert len(reduced['labels']) <= 40
+    assert all(len(values) == len(reduced['labels']) for values in reduced['series'])
+    assert downsample_series(labels[:5], [wave(5)], None) == {'labels': labels[:5], 'series': [wave(5)]}
+
+
+def test_parse_max_points():
+    assert parse_max_points('200') == 200
+    for value in (None, '', 'abc', '0', '-5'):
+        assert parse_max_points(value) is None
+
+
+def mixed_timestamps(n):
+    """Epoch numbers, ISO strings and missing or unparseable values, out of order."""
+    timestamps = []
+    for i in reversed(range(n)):
+        epoch = 1742169600 + i * 60
+        if i % 7 == 0:
+            timestamps.append(None)
+        elif i % 11 == 0:
+            timestamps.append('not a time')
+        elif i % 2:
+            timestamps.append(epoch)
+        else:
+            timestamps.append(f'2025-03-17T{(i * 60) // 3600 % 24:02d}:{(i * 60) // 60 % 60:02d}:00+00:00')
+    return timestamps
+
+
+def test_raw_series_with_mixed_timestamps():
+    timestamps = mixed_timestamps(300)
+    patterns = [{'timestamp': timestamp, 'score': i, 'num_comments': i % 5}
+                for i, timestamp in enumerate(timestamps)]
+    data = {
+        'sentiment_analysis': {'sentiment_over_time': {'timestamps': timestamps,
+                                                        'sentiments': wave(300)}},
+        'trend_analysis': {'engagement_patterns': patterns}
+    }
+
+    reduced = downsample_raw_series(data, 30)
+    kept = reduced['sentiment_analysis']['sentiment_over_time']['timestamps']
+    assert 0 < len(kept) <= 30
+    epochs = [to_epoch(timestamp) for timestamp in kept]
+    assert None not in epochs and epochs == sorted(epochs)
+
+    kept_patterns = reduced['trend_analysis']['engagement_patterns']
+    assert 0 < len(kept_patterns) <= 30
+    epochs = [to_epoch(pattern['timestamp']) for pattern in kept_patterns]
+    assert None not in epochs and epochs == sorted(epochs)
+
+    # The parsed input is left untouched
+    assert data['sentiment_analysis']['sentiment_over_time']['timestamps'] is timestamps
+    assert downsample_raw_series(data, None) is data
@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.post_store import PostStore
+from src.data.corpus_generator import generate_posts
+from src.analysis.engagement import analyze_engagement, build_frames, load_store_frames, analyze_engagement_frames
+
+START = 1742169600  # Monday 2025-03-17 00:00 UTC
+
+
+def sample_posts():
+    return [
+        {'id': 'p1', 'author': 'alice', 'created_utc': START + 3600, 'score': 10, 'num_comments': 2,
+         'comments': [{'author': 'bob', 'created_utc': START + 3700, 'score': 4},
+                      {'author': '[deleted]', 'created_utc': START + 3800, 'score': 50}]},
+        {'id': 'p2', 'author': 'bob', 'created_utc': '2025-03-18T09:15:00+00:00', 'score': 1, 'num_comments': 0,
+         'comments': []},
+        {'id': 'p3', 'author': None, 'created_utc': None, 'score': None, 'num_comments': 1,
+         'comments': [{'author': 'alice', 'created_utc': START, 'score': 2}]}
+    ]
+
+
+def test_engagement_statistics():
+    result = analyze_engagement(sample_posts())
+    assert result['totals'] == {'posts': 3, 'comments': 3, 'authors': 2}
+    # alice: post 10 + 2 comments, plus a comment scored 2; bob: post 1, plus a comment scored 4
+    assert result['top_influencers'] == {'alice': 14, 'bob': 5}
+
+    by_day = result['engagement_by_day']
+    assert by_day['days'] == ['2025-03-17', '2025-03-18']
+    assert by_day['counts'] == [1, 1] and by_day['avg_engagement'] == [12.0, 1.0]
+    # The undated post is left out of the time distributions
+    assert result['engagement_by_weekday']['counts'][:3] == [1, 1, 0]
+    assert result['engagement_by_hour']['counts'][1] == 1 and result['engagement_by_hour']['counts'][9] == 1
+    assert sum(result['engagement_by_hour']['counts']) == 2
+
+    percentiles = result['percentiles']
+    assert percentiles['post_score']['p50'] == 1.0 and percentiles['post_score']['mean'] == pytest.approx(11 / 3)
+    assert percentiles['comment_score']['p99'] == pytest.approx(49.08)
+
+
+def test_empty_input():
+    result = analyze_engagement([])
+    assert result['totals'] == {'posts': 0, 'comments': 0, 'authors': 0}
+    assert result['top_influencers'] == {} and result['engagement_by_day']['days'] == []
+    assert result['percentiles']['post_score'] == {'mean': None, 'p50': None, 'p90': None, 'p99': None}
+
+
+def test_store_frames_match_scrape_frames(tmp_path):
+    posts = list(generate_posts(80, seed=4))
+    scrape = tmp_path / 'drivingsg_data_20250318_120000.json'
+    scrape.write_text(json.dumps({'metadata': {}, 'posts': posts}), encoding='utf-8')
+    store = PostStore(str(tmp_path / 'posts.db'))
+    store.ingest_file(str(scrape))
+
+    from_store = analyze_engagement_frames(*load_store_frames(store.db_path), top_n=5)
+    assert from_store == analyze_engagement_frames(*build_frames(store.load_posts()), top_n=5)
+    assert from_store['totals']['posts'] == 80
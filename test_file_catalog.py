@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.file_catalog import (FileCatalog, file_kind, encode_cursor, decode_cursor,
+                                   parse_listing_args, project)
+
+START = 1742169600  # 2025-03-17 00:00 UTC
+
+
+@pytest.fixture
+def listing(tmp_path):
+    directory = tmp_path / 'reddit'
+    directory.mkdir()
+    # Pairs of files share an mtime, so pages must break ties by path
+    for i in range(20):
+        path = directory / f'drivingsg_data_{i:02d}.json'
+        path.write_text('x' * (i + 1))
+        os.utime(path, (START + i // 2, START + i // 2))
+    (directory / 'drivingsg_data_99.jsonl.meta.json').write_text('{}')
+    return FileCatalog(str(tmp_path / 'catalog.db')), str(directory)
+
+
+def walk(catalog, directory, **options):
+    """Every page of a listing, following next_cursor."""
+    pages, cursor = [], None
+    while True:
+        page = catalog.page([directory], cursor=cursor, **options)
+        pages.append(page)
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize('sort,order', [('modified', 'desc'), ('modified', 'asc'), ('name', 'asc'), ('size', 'desc')])
+def test_pages_cover_every_file_once(listing, sort, order):
+    catalog, directory = listing
+    everything = catalog.page([directory], sort=sort, order=order)['files']
+    assert len(everything) == 20
+    assert all(row['kind'] == 'json' for row in everything)
+
+    pages = walk(catalog, directory, sort=sort, order=order, limit=3)
+    assert len(pages) == 7 and all(page['total'] == 20 for page in pages)
+    assert [row['path'] for page in pages for row in page['files']] == [row['path'] for row in everything]
+
+
+def test_cursor_is_stable_across_inserts(listing):
+    catalog, directory = listing
+    first = catalog.page([directory], sort='modified', order='desc', limit=5)
+
+    # Newer files arriving between requests land before the cursor and do not shift later pages
+    open(os.path.join(directory, 'drivingsg_data_50.json'), 'w').close()
+    second = catalog.page([directory], sort='modified', order='desc', limit=5, cursor=first['next_cursor'])
+    expected = catalog.page([directory], sort='modified', order='desc', limit=11)['files'][6:11]
+    assert second['total'] == 21
+    assert [row['path'] for row in second['files']] == [row['path'] for row in expected]
+
+
+def test_kinds_and_individual_files(listing, tmp_path):
+    catalog, directory = listing
+    store = tmp_path / 'store' / 'posts.db'
+    store.parent.mkdir()
+    store.write_text('sqlite')
+
+    assert catalog.page([directory], kinds=['auxiliary'])['total'] == 1
+    page = catalog.page([directory], files=[str(store)], sort='name', order='asc')
+    assert page['total'] == 21 and page['files'][-1]['filename'] == 'posts.db'
+
+    store.unlink()
+    assert catalog.page([directory], files=[str(store)])['total'] == 20
+
+
+def test_listing_helpers():
+    assert file_kind('a.jsonl.gz') == 'jsonl' and file_kind('a.jsonl.part') == 'auxiliary'
+    assert file_kind('a.sections') == 'sections' and file_kind('A.JSON') == 'json'
+    assert decode_cursor(encode_cursor([START, '/data/a.json'])) == [START, '/data/a.json']
+    with pytest.raises(ValueError):
+        decode_cursor('not a cursor')
+
+    args = parse_listing_args({'sort': 'name', 'order': 'ASC', 'limit': '5000', 'fields': 'filename, size'})
+    assert args == {'sort': 'name', 'order': 'asc', 'limit': 1000, 'cursor': None, 'fields': ['filename', 'size']}
+    for bad in ({'sort': 'owner'}, {'order': 'sideways'}, {'limit': 'ten'}):
+        with pytest.raises(ValueError):
+            parse_listing_args(bad)
+    assert project([{'filename': 'a', 'size': 1, 'kind': 'json'}], ['filename', 'size', 'missing']) == \
+        [{'filename': 'a', 'size': 1}]
@@ -0,0 +1,109 @@
+import os
+import sys
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.web.http_cache import conditional_json, directory_validator, file_validator, init_compression
+from src.data.file_catalog import FileCatalog
+
+HOUR_AGO = 3600
+
+
+def age(path, seconds=HOUR_AGO):
+    """Move a path's mtime into the past, so changes made now are a later HTTP date."""
+    past = os.stat(path).st_mtime - seconds
+    os.utime(path, (past, past))
+
+
+@pytest.fixture
+def listing(tmp_path):
+    directory = tmp_path / 'analysis'
+    directory.mkdir()
+    for name in ('a.json', 'b.json'):
+        (directory / name).write_text('{}')
+        age(directory / name)
+    age(directory)
+    catalog = FileCatalog(str(tmp_path / 'catalog.db'))
+
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route('/scan')
+    def scan():
+        return conditional_json(sorted(os.listdir(directory)), directory_validator([str(directory)]))
+
+    @app.route('/catalog')
+    def indexed():
+        validator = catalog.validator([str(directory)])
+        return conditional_json([row['filename'] for row in catalog.page([str(directory)])['files']], validator)
+
+    @app.route('/file')
+    def single():
+        path = directory / 'a.json'
+        return conditional_json({'size': os.path.getsize(path), 'padding': 'x' * 2000}, file_validator(str(path)))
+
+    return app.test_client(), directory
+
+
+@pytest.mark.parametrize('url', ['/scan', '/catalog'])
+def test_etag_round_trip(listing, url):
+    client, directory = listing
+    first = client.get(url)
+    assert first.status_code == 200 and first.headers['ETag'].startswith('W/')
+
+    again = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304 and again.data == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+
+    # The query string is part of the ETag
+    assert client.get(url + '?x=1', headers={'If-None-Match': first.headers['ETag']}).status_code == 200
+
+    (directory / 'c.json').write_text('{}')
+    changed = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200 and 'c.json' in changed.get_json()
+
+
+@pytest.mark.parametrize('url', ['/scan', '/catalog'])
+def test_if_modified_since_sees_deletions(listing, url):
+    client, directory = listing
+    first = client.get(url)
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert client.get(url, headers=since).status_code == 304
+
+    os.remove(directory / 'b.json')
+    after = client.get(url, headers=since)
+    assert after.status_code == 200 and after.get_json() == ['a.json']
+
+
+@pytest.mark.parametrize('url', ['/file', '/catalog'])
+def test_rewrite_in_place_is_not_answered_with_304(listing, url):
+    client, directory = listing
+    first = client.get(url)
+    etag, since = first.headers['ETag'], first.headers['Last-Modified']
+
+    # Rewriting a file leaves the directory's mtime alone
+    dir_mtime = os.stat(directory).st_mtime_ns
+    (directory / 'a.json').write_text('{"rewritten": true}')
+    assert os.stat(directory).st_mtime_ns == dir_mtime
+
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+    assert client.get(url, headers={'If-Modified-Since': since}).status_code == 200
+
+
+def test_large_bodies_are_compressed(listing):
+    client, _ = listing
+    plain = client.get('/file')
+    assert 'Content-Encoding' not in plain.headers
+
+    compressed = client.get('/file', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+    # 304s carry no body to compress
+    assert client.get('/file', headers={'Accept-Encoding': 'gzip',
+                                        'If-None-Match': plain.headers['ETag']}).status_code == 304
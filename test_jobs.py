@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.web.jobs import JobManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(str(tmp_path / 'jobs'), io_workers=2, cpu_workers=1)
+    yield manager
+    manager.shutdown()
+
+
+def wait_for(manager, job_id, timeout=60):
+    """Poll a job the way clients do until it finishes."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def test_io_jobs_succeed_and_fail(manager):
+    results, called = [], threading.Event()
+
+    def on_success(result):
+        results.append(result)
+        called.set()
+
+    job = manager.submit('scrape', 'io', sorted, [3, 1, 2], on_success=on_success, params={'limit': 3})
+    assert job['status'] == 'queued' and job['params'] == {'limit': 3}
+
+    done = wait_for(manager, job['id'])
+    assert done['status'] == 'succeeded' and done['result'] == [1, 2, 3]
+    assert done['submitted'] <= done['started'] <= done['finished']
+    # The callback runs in this process once the outcome is recorded
+    assert called.wait(10) and results == [[1, 2, 3]]
+
+    failed = wait_for(manager, manager.submit('scrape', 'io', fail, 'rate limited')['id'])
+    assert failed['status'] == 'failed' and failed['error'] == 'rate limited' and failed['result'] is None
+
+
+def test_cpu_jobs_run_in_another_process(manager):
+    job = wait_for(manager, manager.submit('analyze', 'cpu', pow, 2, 10)['id'])
+    assert job['status'] == 'succeeded' and job['result'] == 1024
+    assert job['pid'] != os.getpid()
+
+
+def test_listing_lookup_and_pruning(manager):
+    with pytest.raises(ValueError):
+        manager.submit('scrape', 'gpu', sorted, [])
+    assert manager.list() == []
+
+    first = wait_for(manager, manager.submit('first', 'io', sorted, [2, 1])['id'])
+    second = wait_for(manager, manager.submit('second', 'io', sorted, [1])['id'])
+    listed = manager.list()
+    assert [job['name'] for job in listed] == ['second', 'first']
+    assert all('result' not in job for job in listed)
+    assert manager.get('../jobs') is None and manager.get('0' * 32) is None
+
+    # Only finished jobs older than the retention period are deleted
+    old = time.time() - 3600
+    os.utime(os.path.join(manager.jobs_dir, f"{first['id']}.json"), (old, old))
+    assert manager.prune(max_age=60) == 1
+    assert manager.get(first['id']) is None and manager.get(second['id']) is not None
@@ -0,0 +1,62 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.jsonl_io import (JsonlWriter, jsonl_filename, is_jsonl_path, is_auxiliary_path,
+                               iter_posts, read_metadata, metadata_path, PART_SUFFIX)
+
+POSTS = [{'id': f'p{i}', 'title': f'Jam near exit {i} – 事故', 'created_utc': 1742169600 + i} for i in (3, 1, 2)]
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_writer_finalises_atomically(tmp_path, compression):
+    path = str(tmp_path / jsonl_filename('drivingsg_data_20250318_143009', compression))
+    writer = JsonlWriter(path, compression, metadata={'subreddit': 'drivingsg'})
+    for post in POSTS[:2]:
+        writer.write(post)
+
+    # Until the writer closes, only the part file exists, and it is readable as written so far
+    assert not os.path.exists(path) and read_metadata(path) is None
+    assert os.path.exists(path + PART_SUFFIX)
+    writer.write(POSTS[2])
+    assert writer.close() == path
+
+    assert not os.path.exists(path + PART_SUFFIX)
+    assert not os.path.exists(metadata_path(path) + PART_SUFFIX)
+    assert list(iter_posts(path)) == POSTS
+    metadata = read_metadata(path)
+    assert metadata['subreddit'] == 'drivingsg' and metadata['complete']
+    assert metadata['records'] == 3 and metadata['compression'] == compression
+    assert (metadata['first_timestamp'], metadata['last_timestamp']) == (1742169601, 1742169603)
+    assert metadata['size'] == os.path.getsize(path)
+    # Closing twice is a no-op
+    assert writer.close() == path
+
+
+def test_failed_scrape_is_kept_as_incomplete(tmp_path):
+    path = str(tmp_path / jsonl_filename('drivingsg_data_20250318_143009', 'gz'))
+    with pytest.raises(RuntimeError):
+        with JsonlWriter(path, 'gz') as writer:
+            writer.write(POSTS[0])
+            raise RuntimeError('rate limited')
+
+    assert list(iter_posts(path)) == POSTS[:1]
+    assert read_metadata(path)['complete'] is False
+
+
+def test_paths_and_legacy_documents(tmp_path):
+    assert is_jsonl_path('a.jsonl.gz') and is_jsonl_path('a.jsonl') and not is_jsonl_path('a.json')
+    assert is_auxiliary_path('a.jsonl.meta.json') and is_auxiliary_path('a.jsonl.part')
+    assert not is_auxiliary_path('a.jsonl')
+    with pytest.raises(ValueError):
+        jsonl_filename('a', 'lz4')
+
+    for document in (POSTS, {'metadata': {}, 'posts': POSTS}):
+        legacy = tmp_path / 'drivingsg_data_20250318_143009.json'
+        legacy.write_text(json.dumps(document), encoding='utf-8')
+        assert list(iter_posts(str(legacy))) == POSTS
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.web.metrics import MetricsRegistry, Profile, timed, save_profile, metrics_path_for
+
+
+def test_profile_reports_stages_and_feeds_registry():
+    registry = MetricsRegistry(enabled=True)
+    profile = Profile('analyze', registry)
+    with profile.stage('load') as stage:
+        stage.add_records(10)
+    with pytest.raises(RuntimeError):
+        with profile.stage('sentiment', records=4):
+            raise RuntimeError('analyzer failed')
+
+    report = profile.report(status='error')
+    assert report['name'] == 'analyze' and report['status'] == 'error'
+    assert [(stage['stage'], stage['records']) for stage in report['stages']] == [('load', 10), ('sentiment', 4)]
+    assert report['total_seconds'] >= sum(stage['seconds'] for stage in report['stages'])
+    assert set(report['cache']) == {'hits', 'misses', 'hit_rate'}
+
+    text = registry.render()
+    assert 'analysis_runs_total{name="analyze",status="error"} 1' in text
+    assert 'analysis_stage_seconds_count{stage="load"} 1' in text
+    assert 'analysis_stage_records_total{stage="load"} 10' in text
+    assert '# TYPE analysis_cache_hit_ratio gauge' in text
+
+
+def test_timed_and_reports_from_other_processes():
+    registry = MetricsRegistry(enabled=True)
+
+    @timed('chart', registry)
+    def build_chart(value):
+        """Chart builder."""
+        return value * 2
+
+    assert build_chart(21) == 42 and build_chart.__doc__ == 'Chart builder.'
+    registry.record_report({'name': 'job', 'status': 'success',
+                            'stages': [{'stage': 'chart', 'seconds': 1.5, 'records': 3}]})
+    text = registry.render()
+    assert 'analysis_stage_seconds_count{stage="chart"} 2' in text
+    assert 'analysis_stage_records_total{stage="chart"} 3' in text
+    assert 'analysis_runs_total{name="job",status="success"} 1' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry(enabled=True)
+    registry.count_run('say "hi"\\now')
+    assert 'analysis_runs_total{name="say \\"hi\\"\\\\now",status="success"} 1' in registry.render()
+
+
+def test_disabled_instrumentation_records_nothing(tmp_path):
+    registry = MetricsRegistry(enabled=False)
+
+    def build_chart():
+        return 'chart'
+
+    assert timed('chart', registry)(build_chart) is build_chart
+    profile = Profile('analyze', registry)
+    with profile.stage('load') as stage:
+        stage.add_records(5)
+    assert profile.report() == {} and profile.stages == []
+    registry.record_report({'name': 'job', 'stages': [{'stage': 'load', 'seconds': 1.0}]})
+    assert 'analysis_runs_total{' not in registry.render()
+
+    analysis_path = str(tmp_path / 'drivingsg_analysis_20250318_143009.json')
+    assert save_profile(analysis_path, {}) is None
+    saved = save_profile(analysis_path, {'name': 'analyze', 'stages': []})
+    assert saved == metrics_path_for(analysis_path) == str(tmp_path / 'metrics' / 'drivingsg_analysis_20250318_143009.json')
+    with open(saved, 'r', encoding='utf-8') as f:
+        assert json.load(f)['name'] == 'analyze'
@@ -0,0 +1,58 @@
+import os
+import sys
+from multiprocessing import shared_memory
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.corpus_generator import generate_posts
+from src.data.corpus import Corpus, share_corpus, attach_corpus
+from src.analysis.partials import AnalysisState
+from src.analysis.parallel import analyze_parallel, split_posts
+
+ANALYSIS_TYPES = ['sentiment', 'trend', 'traffic', 'location']
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return Corpus.from_posts(sorted(generate_posts(200, seed=8), key=lambda post: post['created_utc']))
+
+
+def test_shared_memory_attach_and_detach(corpus):
+    with share_corpus(corpus) as handle:
+        assert 'shm' in handle and handle['version'] == corpus.version
+        with attach_corpus(handle) as attached:
+            assert list(attached.posts(5, 25)) == list(corpus.posts(5, 25))
+        # Detaching released the views; the block itself lives until the share ends
+        assert attached.arrays == {}
+        shared_memory.SharedMemory(name=handle['shm']).close()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=handle['shm'])
+
+
+def test_saved_corpus_is_shared_by_path(corpus, tmp_path):
+    opened = Corpus.open(corpus.save(str(tmp_path / 'snapshot')))
+    with share_corpus(opened) as handle:
+        assert handle == {'path': opened.path, 'version': opened.version}
+        with attach_corpus(handle) as attached:
+            assert list(attached.posts()) == list(corpus.posts())
+
+
+def test_split_posts_covers_every_post(corpus):
+    for parts in (1, 3, 8, 500):
+        slices = split_posts(corpus, parts)
+        assert len(slices) <= parts
+        assert slices[0][0] == 0 and slices[-1][1] == corpus.post_count
+        assert all(stop == start for (_, stop), (start, _) in zip(slices, slices[1:]))
+
+
+def test_parallel_analysis_matches_sequential(corpus, tmp_path):
+    expected = AnalysisState(ANALYSIS_TYPES).add_posts(corpus.posts())
+    # In-memory corpora go through shared memory, saved ones through their files
+    for shared in (corpus, Corpus.open(corpus.save(str(tmp_path / 'snapshot')))):
+        state = analyze_parallel(shared, ANALYSIS_TYPES, workers=3)
+        assert state.sections() == expected.sections()
+        assert state.rollups() == expected.rollups()
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.post_store import PostStore
+from src.data.corpus_generator import generate_posts
+from src.analysis.partials import AnalysisState, save_state, load_state
+
+ANALYSIS_TYPES = ['sentiment', 'trend', 'traffic', 'location']
+
+
+def sample_posts(count=300, seed=3):
+    """Synthetic scrape posts in creation order."""
+    return sorted(generate_posts(count, seed), key=lambda post: post['created_utc'])
+
+
+def write_scrape(path, posts):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {}, 'posts': posts}, f)
+    return str(path)
+
+
+def assert_same_results(state, expected):
+    assert state.sections() == expected.sections()
+    assert state.rollups() == expected.rollups()
+
+
+@pytest.mark.parametrize('split', [1, 120, 299])
+def test_merge_equals_full_run(split):
+    posts = sample_posts()
+    full = AnalysisState(ANALYSIS_TYPES).add_posts(posts)
+
+    head = AnalysisState(ANALYSIS_TYPES).add_posts(posts[:split])
+    tail = AnalysisState(ANALYSIS_TYPES).add_posts(posts[split:])
+    # Partials cross process boundaries serialised, as in parallel analysis
+    merged = AnalysisState.from_dict(head.to_dict()).merge(AnalysisState.from_dict(tail.to_dict()))
+    assert_same_results(merged, full)
+
+
+def test_merge_rejects_different_options():
+    with pytest.raises(ValueError):
+        AnalysisState(['sentiment']).merge(AnalysisState(['sentiment', 'trend']))
+    with pytest.raises(ValueError):
+        AnalysisState(['trend'], 'exact').merge(AnalysisState(['trend'], 'sketch'))
+
+
+def test_save_and_load_state(tmp_path):
+    state = AnalysisState(ANALYSIS_TYPES, 'sketch').add_posts(sample_posts(50))
+    path = str(tmp_path / 'partials' / 'lineage.json')
+    save_state(path, state, 7)
+
+    saved = load_state(path)
+    assert saved['version'] == 7
+    assert_same_results(saved['state'], state)
+    assert load_state(str(tmp_path / 'missing.json')) is None
+
+
+def test_incremental_run_equals_full_refresh(tmp_path):
+    posts = sample_posts(400)
+    store = PostStore(str(tmp_path / 'posts.db'))
+
+    # First scrape: older posts, with only some of their comments so far
+    first = [dict(post, comments=post['comments'][:len(post['comments']) // 2]) for post in posts[:300]]
+    store.ingest_file(write_scrape(tmp_path / 'first.json', first))
+    state_path = str(tmp_path / 'partials' / 'lineage.json')
+    save_state(state_path, AnalysisState(ANALYSIS_TYPES).add_posts(store.load_posts()), store.version())
+
+    # Second scrape: overlapping posts with new comments and scores, plus newer posts
+    second = [dict(post, score=post['score'] + 5) for post in posts[200:]]
+    store.ingest_file(write_scrape(tmp_path / 'second.json', second))
+
+    # Update the saved state the way the analysis endpoint does
+    saved = load_state(state_path)
+    changes = store.changes_since(saved['version'])
+    assert not changes['text_changed']
+    assert changes['version'] == store.version()
+    assert changes['updated'] and any(post.get('comments_only') for post in changes['posts'])
+    state = saved['state']
+    state.ledger.update_engagement(changes['updated'])
+    state.merge(AnalysisState(ANALYSIS_TYPES).add_posts(changes['posts']))
+
+    assert_same_results(state, AnalysisState(ANALYSIS_TYPES).add_posts(store.load_posts()))
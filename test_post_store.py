@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.post_store import PostStore, store_id
+
+
+def make_post(post_id, title, score, comments=()):
+    return {
+        'id': post_id,
+        'title': title,
+        'text': f'{title} body',
+        'created_utc': 1742169600 + int(post_id[1:]) * 60,
+        'score': score,
+        'num_comments': len(comments),
+        'author': 'driver',
+        'comments': [{'id': f'{post_id}_c{i}', 'text': text, 'created_utc': 1742169700, 'author': 'reply'}
+                     for i, text in enumerate(comments)]
+    }
+
+
+def write_scrape(tmp_path, timestamp, posts):
+    # The scrape time comes from the legacy filename
+    path = tmp_path / f'drivingsg_data_{timestamp}.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {}, 'posts': posts}, f)
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PostStore(str(tmp_path / 'posts.db'))
+
+
+def test_newer_scrape_wins_whatever_the_ingest_order(store, tmp_path):
+    newer = write_scrape(tmp_path, '20250318_120000', [make_post('p1', 'Accident at PIE', 40, ['jam'])])
+    older = write_scrape(tmp_path, '20250317_120000', [make_post('p1', 'Accident at PIE', 5)])
+
+    assert store.ingest_file(newer) == 1
+    assert store.version() == 1
+    # Every upsert of the older file is rejected, so the version stays put
+    assert store.ingest_file(older) == 1
+    assert store.version() == 1
+    assert store.changes_since(1)['posts'] == []
+
+    post = store.load_posts()[0]
+    assert post['score'] == 40
+    assert [comment['text'] for comment in post['comments']] == ['jam']
+
+
+def test_versions_track_changes(store, tmp_path):
+    first = write_scrape(tmp_path, '20250317_120000', [make_post('p1', 'Accident at PIE', 5)])
+    second = write_scrape(tmp_path, '20250318_120000', [make_post('p1', 'Accident at PIE', 9, ['slow']),
+                                                         make_post('p2', 'Roadworks on CTE', 1)])
+    store.ingest_file(first)
+    # Unchanged files are skipped
+    assert store.ingest_file(first) == 0
+    store.ingest_file(second)
+    assert store.version() == 2
+
+    changes = store.changes_since(1)
+    assert changes['version'] == 2 and not changes['text_changed']
+    assert changes['updated'] == [{'id': 'p1', 'score': 9, 'num_comments': 1}]
+    assert [post['id'] for post in changes['posts']] == ['p2', 'p1']
+    assert changes['posts'][1]['comments_only']
+
+
+def test_sources_are_versioned_and_keyed_apart(store, tmp_path):
+    store.ingest_file(write_scrape(tmp_path, '20250317_120000', [make_post('p1', 'Accident at PIE', 5)]))
+    store.ingest_file(write_scrape(tmp_path, '20250318_120000', [make_post('p1', 'Jam on AYE', 2)]),
+                      source='twitter')
+
+    assert store_id('reddit', 'p1') == 'p1' and store_id('twitter', 'p1') == 'twitter:p1'
+    assert store.version('reddit') == 1 and store.version('twitter') == 1
+    assert store.get_stats('twitter')['posts'] == 1
+    assert [post['title'] for post in store.load_posts('twitter')] == ['Jam on AYE']
+    assert [post['title'] for post in store.load_posts()] == ['Accident at PIE']
+
+
+@pytest.mark.parametrize('fts', [True, False])
+def test_search_with_and_without_fts(tmp_path, fts):
+    store = PostStore(str(tmp_path / 'posts.db'))
+    if not fts:
+        # As on SQLite builds without FTS5
+        store.fts_enabled = False
+    store.ingest_file(write_scrape(tmp_path, '20250317_120000', [
+        make_post('p1', 'Accident at PIE', 5),
+        make_post('p2', 'Roadworks on CTE', 1),
+        make_post('p3', 'PIE jam after accident', 3)
+    ]))
+
+    hits = store.search('pie accident')
+    assert sorted(hit['post_id'] for hit in hits if hit['kind'] == 'post') == ['p1', 'p3']
+    assert [hit['doc_id'] for hit in store.search('pie', since=1742169600 + 150)] == ['p3']
+    assert store.search('expressway') == []
+    assert store.search('pie', source='twitter') == []
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analysis.result_store import ResultStore, result_key
+from src.analysis.rollups import rollup_path_for, save_rollups
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / 'store' / 'results.db'), companions=(rollup_path_for,))
+
+
+def save_result(tmp_path, name, size=100):
+    """An analysis file with a rollup sidecar."""
+    path = str(tmp_path / f'{name}.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('x' * size)
+    save_rollups(path, {'granularities': {}})
+    return path
+
+
+def set_last_used(store, path, when):
+    with closing(sqlite3.connect(store.db_path)) as conn, conn:
+        conn.execute("UPDATE results SET last_used = ? WHERE analysis_path = ?", (when, path))
+
+
+def test_keys_and_fingerprints(store, tmp_path):
+    scrape = tmp_path / 'scrape.json'
+    scrape.write_text('{"posts": []}')
+    fingerprint = store.fingerprint(str(scrape))
+    # Same content, same fingerprint; a rewrite with new content changes it
+    assert store.fingerprint(str(scrape)) == fingerprint
+    scrape.write_text('{"posts": [1]}')
+    assert store.fingerprint(str(scrape)) != fingerprint
+
+    assert result_key(fingerprint, {'a': 1, 'b': [2]}) == result_key(fingerprint, {'b': [2], 'a': 1})
+    assert result_key(fingerprint, {'a': 1}) != result_key(fingerprint, {'a': 2})
+    assert result_key(fingerprint, {'a': 1}) != result_key('store:3', {'a': 1})
+
+
+def test_lookup_and_superseded_results(store, tmp_path):
+    assert store.lookup('missing') is None
+    first = save_result(tmp_path, 'first')
+    store.record('key', first)
+    assert store.lookup('key') == first and store.stats()['hits'] == 1
+
+    # A refresh supersedes the older result for the key, sidecars included
+    second = save_result(tmp_path, 'second')
+    store.record('key', second)
+    assert store.lookup('key') == second
+    assert not os.path.exists(first) and not os.path.exists(rollup_path_for(first))
+
+    # Results deleted by hand only lose their row
+    os.remove(second)
+    assert store.lookup('key') is None
+    assert store.collect_garbage()['results'] == 0 and store.stats()['results'] == 0
+
+
+def test_gc_by_age(store, tmp_path):
+    old, recent = save_result(tmp_path, 'old'), save_result(tmp_path, 'recent')
+    store.record('old', old)
+    store.record('recent', recent)
+    set_last_used(store, old, time.time() - 3600)
+
+    report = store.collect_garbage(max_age=60)
+    assert report['removed'] == 1 and report['results'] == 1
+    assert not os.path.exists(old) and not os.path.exists(rollup_path_for(old))
+    assert store.lookup('recent') == recent
+
+
+def test_gc_by_size_drops_least_recently_used(store, tmp_path):
+    paths = [save_result(tmp_path, f'result{i}', size=1000) for i in range(3)]
+    for i, path in enumerate(paths):
+        store.record(f'key{i}', path)
+    size = store.stats()['bytes'] // 3
+    assert size > 1000  # sidecars count towards the budget
+
+    # The first result was used most recently, so the second goes first
+    for i, path in enumerate(paths):
+        set_last_used(store, path, time.time() - 100 + (50 if i == 0 else i))
+    report = store.collect_garbage(max_bytes=2 * size)
+    assert report['removed'] == 1 and report['bytes_freed'] == size and report['bytes'] == 2 * size
+    assert [os.path.exists(path) for path in paths] == [True, False, True]
+
+    # Recording enforces the store's own budget
+    small = ResultStore(store.db_path, companions=(rollup_path_for,), max_bytes=size)
+    small.record('key3', save_result(tmp_path, 'result3', size=1000))
+    assert small.stats()['results'] == 1 and small.lookup('key3') is not None
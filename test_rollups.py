@@ -0,0 +1,89 @@
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analysis.rollups import (build_rollups, bucket_start, percentile, save_rollups, load_rollup,
+                                  rollup_path_for, select_rollup, strip_raw_series)
+
+HOUR = 3600
+DAY = 86400
+START = 1742169600  # Monday 2025-03-17 00:00 UTC
+
+
+def make_posts():
+    """Five posts over two days, one with an ISO timestamp and one without a time."""
+    return [
+        {'created_utc': START + 10, 'score': 1, 'num_comments': 2, 'comments': [{}, {}]},
+        {'created_utc': START + 20, 'score': 3, 'num_comments': 0, 'comments': []},
+        {'created_utc': '2025-03-17T01:30:00+00:00', 'score': 5, 'num_comments': 1, 'comments': [{}]},
+        {'created_utc': START + DAY + HOUR + 5, 'score': 7, 'num_comments': 4, 'comment_count': 3},
+        {'created_utc': None, 'score': 100, 'num_comments': 100, 'comments': []}
+    ]
+
+
+def test_bucket_boundaries():
+    assert bucket_start(START + HOUR - 1, 'hourly') == START
+    assert bucket_start(START + DAY + 5, 'daily') == START + DAY
+    # Weeks start on Monday
+    assert bucket_start(START + 6 * DAY, 'weekly') == START
+    assert bucket_start(START - 1, 'weekly') == START - 7 * DAY
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) is None
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([1, 2, 3, 4], 100) == 4
+    assert percentile([7], 99) == 7
+
+
+def test_build_rollups_buckets_posts():
+    rollups = build_rollups(make_posts(), sentiments=[0.5, -0.5, 0.3, 0.1, 1.0])
+    assert (rollups['first_timestamp'], rollups['last_timestamp']) == (START + 10, START + DAY + HOUR + 5)
+
+    hourly = rollups['granularities']['hourly']
+    assert [bucket['label'] for bucket in hourly] == ['2025-03-17 00:00', '2025-03-17 01:00', '2025-03-18 01:00']
+    assert [bucket['posts'] for bucket in hourly] == [2, 1, 1]
+    assert hourly[0]['comments'] == 2 and hourly[2]['comments'] == 3
+    assert hourly[0]['mean_sentiment'] == 0.0
+    assert hourly[0]['score'] == {'mean': 2.0, 'p50': 2.0, 'p90': 2.8, 'p99': 2.98}
+
+    daily = rollups['granularities']['daily']
+    assert [(bucket['label'], bucket['posts']) for bucket in daily] == [('2025-03-17', 3), ('2025-03-18', 1)]
+    # The post without a time is left out everywhere
+    assert [bucket['posts'] for bucket in rollups['granularities']['weekly']] == [4]
+    assert build_rollups(make_posts())['granularities']['daily'][0]['mean_sentiment'] is None
+
+
+def test_select_rollup_anchors_window_at_newest_bucket():
+    rollups = build_rollups(make_posts())
+    day = select_rollup(rollups, '24h')
+    assert day['granularity'] == 'hourly'
+    # 24 hours back from the newest post keeps the 01:00 bucket of the first day
+    assert [bucket['label'] for bucket in day['buckets']] == ['2025-03-17 01:00', '2025-03-18 01:00']
+    assert select_rollup(rollups, 'bogus')['timeframe'] == '30d'
+    assert select_rollup(rollups, 'all')['granularity'] == 'weekly'
+
+
+def test_save_and_load_next_to_analysis(tmp_path):
+    analysis_path = str(tmp_path / 'drivingsg_analysis_20250318_143009.json')
+    assert load_rollup(analysis_path) is None
+
+    rollups = build_rollups(make_posts())
+    assert save_rollups(analysis_path, rollups) == rollup_path_for(analysis_path)
+    assert rollup_path_for(analysis_path) == str(tmp_path / 'rollups' / 'drivingsg_analysis_20250318_143009.json')
+    assert load_rollup(analysis_path, '30d') == select_rollup(rollups, '30d')
+    assert load_rollup(analysis_path, '7d', loader=lambda path: rollups) == select_rollup(rollups, '7d')
+
+
+def test_strip_raw_series_keeps_the_rest():
+    data = {
+        'sentiment_analysis': {'overall_sentiment': 0.1, 'sentiment_over_time': {'timestamps': []}},
+        'trend_analysis': {'common_phrases': {}, 'engagement_patterns': []},
+        'metadata': 'kept'
+    }
+    stripped = strip_raw_series(data)
+    assert stripped == {'sentiment_analysis': {'overall_sentiment': 0.1},
+                        'trend_analysis': {'common_phrases': {}}, 'metadata': 'kept'}
+    assert 'sentiment_over_time' in data['sentiment_analysis']
@@ -0,0 +1,62 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analysis.section_store import (write_sections, read_index, read_sections, read_section,
+                                        split_analysis, convert_json, is_sections_path, PREAMBLE, MAGIC)
+
+SECTIONS = {
+    'sentiment_analysis': {'overall_sentiment': 0.12, 'sentiment_distribution': {'positive': 3}},
+    'trend_analysis': {'common_phrases': {'pie jam': 4}, 'engagement_patterns': []},
+    'location_analysis': {'regions': {'north': 2}, 'note': 'Jalan Bahar – 事故'}
+}
+
+
+def test_round_trip_reads_only_requested_sections(tmp_path):
+    path = write_sections(str(tmp_path / 'analysis.sections'), SECTIONS, {'posts': 7})
+    assert not os.path.exists(path + '.part')
+
+    index = read_index(path)
+    assert index['metadata'] == {'posts': 7}
+    assert list(index['sections']) == list(SECTIONS)
+    assert read_sections(path) == SECTIONS
+    assert read_sections(path, ['trend_analysis', 'missing'], index) == {'trend_analysis': SECTIONS['trend_analysis']}
+    assert read_section(path, 'location_analysis') == SECTIONS['location_analysis']
+    assert read_section(path, 'missing') is None
+    assert read_sections(path, []) == {}
+
+
+def test_bad_files_are_rejected(tmp_path):
+    foreign = tmp_path / 'foreign.sections'
+    foreign.write_bytes(PREAMBLE.pack(b'JUNK', 1, 2) + b'{}')
+    with pytest.raises(ValueError):
+        read_index(str(foreign))
+
+    future = tmp_path / 'future.sections'
+    future.write_bytes(PREAMBLE.pack(MAGIC, 99, 2) + b'{}')
+    with pytest.raises(ValueError):
+        read_index(str(future))
+
+
+def test_convert_json_keeps_metadata(tmp_path):
+    service_format = {'timestamp': '2025-03-18T14:30:09', 'results': SECTIONS}
+    assert split_analysis(service_format) == (SECTIONS, {'timestamp': '2025-03-18T14:30:09'})
+    assert split_analysis(SECTIONS) == (SECTIONS, {})
+
+    json_path = tmp_path / 'drivingsg_analysis_20250318_143009.json'
+    json_path.write_text(json.dumps(service_format), encoding='utf-8')
+    path = convert_json(str(json_path))
+    assert path == str(tmp_path / 'drivingsg_analysis_20250318_143009.sections')
+    assert is_sections_path(path) and not is_sections_path(str(json_path))
+    assert read_index(path)['metadata'] == {'timestamp': '2025-03-18T14:30:09'}
+    assert read_sections(path) == SECTIONS
+    # The header length in the preamble covers exactly the header JSON
+    with open(path, 'rb') as f:
+        _, _, header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        json.loads(f.read(header_length))
+    assert read_index(path)['data_offset'] == PREAMBLE.size + header_length
@@ -0,0 +1,99 @@
+import os
+import sys
+import math
+import random
+from collections import Counter
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analysis.sketches import CountMinSketch, SpaceSaving, HeavyHitters
+
+
+def zipf_stream(size, vocabulary=2000, seed=0):
+    """Heavy-tailed stream of words, like the phrases of a corpus."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    return rng.choices([f'word{i}' for i in range(vocabulary)], weights, k=size)
+
+
+def shards():
+    """Two halves of a stream with different (overlapping) vocabularies."""
+    return zipf_stream(20000, seed=1), zipf_stream(20000, vocabulary=3000, seed=2)
+
+
+def test_count_min_merge_equals_single_sketch():
+    first, second = shards()
+    merged = CountMinSketch(width=512, depth=4)
+    other = CountMinSketch(width=512, depth=4)
+    combined = CountMinSketch(width=512, depth=4)
+    for item in first:
+        merged.update(item)
+        combined.update(item)
+    for item in second:
+        other.update(item)
+        combined.update(item)
+
+    merged.merge(CountMinSketch.from_dict(other.to_dict()))
+    assert merged.total == combined.total == len(first) + len(second)
+    assert merged.table == combined.table
+
+
+def test_count_min_merge_error_bound():
+    first, second = shards()
+    width = 512
+    sketches = [CountMinSketch(width=width, depth=5), CountMinSketch(width=width, depth=5)]
+    for sketch, stream in zip(sketches, (first, second)):
+        for item in stream:
+            sketch.update(item)
+    merged = sketches[0].merge(sketches[1])
+
+    truth = Counter(first) + Counter(second)
+    bound = math.e / width * merged.total
+    errors = [merged.estimate(item) - count for item, count in truth.items()]
+    # Never undercounts; overcounts beyond e / width of the total with probability exp(-depth)
+    assert min(errors) >= 0
+    assert sum(error > bound for error in errors) <= math.exp(-5) * len(truth) * 2
+
+
+def test_count_min_merge_rejects_other_shapes():
+    with pytest.raises(ValueError):
+        CountMinSketch(width=64, seed=0).merge(CountMinSketch(width=64, seed=1))
+    with pytest.raises(ValueError):
+        CountMinSketch(width=64).merge(CountMinSketch(width=128))
+
+
+def test_space_saving_merge_bounds():
+    first, second = shards()
+    k = 200
+    summaries = [SpaceSaving(k), SpaceSaving(k)]
+    for summary, stream in zip(summaries, (first, second)):
+        for item in stream:
+            summary.update(item)
+    merged = summaries[0].merge(SpaceSaving.from_dict(summaries[1].to_dict()))
+
+    truth = Counter(first) + Counter(second)
+    total = len(first) + len(second)
+    assert len(merged.counts) <= k
+    for item, count, error in merged.top():
+        # Counts are upper bounds and the error brackets the true count
+        assert count - error <= truth[item] <= count
+    # Every item more frequent than 2 * total / k survives the merge
+    for item, count in truth.items():
+        if count > 2 * total / k:
+            assert item in merged.counts
+
+
+def test_heavy_hitters_merge_top_items():
+    first, second = shards()
+    hitters = [HeavyHitters(k=200, width=1024), HeavyHitters(k=200, width=1024)]
+    for sketch, stream in zip(hitters, (first, second)):
+        sketch.update_counts(Counter(stream))
+    merged = hitters[0].merge(HeavyHitters.from_dict(hitters[1].to_dict()))
+
+    truth = Counter(first) + Counter(second)
+    assert [item for item, _ in merged.most_common(10)] == [item for item, _ in truth.most_common(10)]
+    for item, estimate in merged.most_common(20):
+        assert estimate >= truth[item]
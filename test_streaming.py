@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.analysis.streaming import TrendDetector, JsonlTailer, parse_window, extract_terms
+
+START = 1742169600  # 2025-03-17 00:00 UTC
+
+
+def post(post_id, timestamp, title, comments=()):
+    return {'id': post_id, 'created_utc': timestamp, 'title': title, 'text': '',
+            'comments': [{'id': f'{post_id}_{i}', 'created_utc': timestamp + 30, 'text': text}
+                         for i, text in enumerate(comments)]}
+
+
+def steady_posts(hours):
+    """One unremarkable post every five minutes."""
+    return [post(f'b{i}', START + i * 300, 'Nice weather today for cycling') for i in range(hours * 12)]
+
+
+def test_parse_window():
+    assert parse_window('30m') == 1800 and parse_window('1h') == 3600
+    assert parse_window(' 7d ') == 7 * 86400 and parse_window(90) == 90 and parse_window('45') == 45
+    with pytest.raises(ValueError):
+        parse_window('an hour')
+
+
+def test_extract_terms_skips_stopword_bigrams():
+    terms = extract_terms('It is the massive jam at Woodlands')
+    assert ('ngram', 'massive jam') in terms and ('location', 'woodlands') in terms
+    assert ('ngram', 'it is') not in terms and ('ngram', 'is the') not in terms
+
+
+def test_spike_is_flagged_and_steady_terms_are_not():
+    detector = TrendDetector()
+    detector.process_posts(steady_posts(30))
+
+    spike_start = START + 30 * 3600
+    spike = [post(f's{i}', spike_start + i * 20, 'Massive jam at Woodlands checkpoint') for i in range(20)]
+    # A later post closes the slots of the spike
+    detector.process_posts(spike + [post('late', spike_start + 2 * 3600, 'Nice weather today for cycling')])
+
+    flagged = {(burst['kind'], burst['term']) for burst in detector.snapshot()['bursts']}
+    assert ('location', 'woodlands') in flagged and ('ngram', 'massive jam') in flagged
+    assert ('ngram', 'nice weather') not in flagged
+    # Repeated flags of a term within one short window are merged
+    assert len(flagged) == len(detector.snapshot()['bursts'])
+
+
+def test_duplicates_late_events_and_windows():
+    detector = TrendDetector({'window_size': '1h', 'baseline_window': '2h'})
+    posts = [post('p1', START, 'Accident at Woodlands', ['jam at Woodlands']),
+             post('p2', START + 600, 'Roadworks on the CTE')]
+    assert detector.process_posts(posts) == 3
+    # Re-scraped posts only contribute their new comments
+    assert detector.process_posts([post('p1', START, 'Accident at Woodlands', ['jam at Woodlands', 'still slow'])]) == 1
+
+    snapshot = detector.snapshot()
+    assert snapshot['top_terms']['short_window']['location'][0] == {'term': 'woodlands', 'count': 2}
+    assert snapshot['watermark'] == START + 900
+
+    # Ninety minutes later the first posts have left the short window but not the long one
+    detector.process_posts([post('p3', START + 5400, 'Clear roads')])
+    snapshot = detector.snapshot()
+    assert snapshot['top_terms']['short_window']['location'] == []
+    assert snapshot['top_terms']['long_window']['location'][0]['term'] == 'woodlands'
+
+    # Events older than the long window are dropped
+    detector.process_posts([post('old', START - 3 * 3600, 'Accident at Woodlands')])
+    assert detector.snapshot()['late_events'] == 1
+
+
+def test_tailer_reads_complete_lines_once(tmp_path):
+    tailer = JsonlTailer(str(tmp_path))
+    part = tmp_path / 'drivingsg_data_20250318_143009.jsonl.part'
+    with open(part, 'wb') as f:
+        f.write(json.dumps({'id': 'p1'}).encode() + b'\n' + b'{"id": "p')
+    (tmp_path / 'notes.txt').write_text('ignored')
+
+    assert tailer.poll() == [{'id': 'p1'}]
+    # The half-written line is picked up once it is complete
+    with open(part, 'ab') as f:
+        f.write(b'2"}\n')
+    assert tailer.poll() == [{'id': 'p2'}]
+
+    # Finalising the scrape renames the file; its records are not read again
+    os.replace(part, tmp_path / 'drivingsg_data_20250318_143009.jsonl')
+    assert tailer.poll() == []
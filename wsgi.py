@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production servers, e.g. ``gunicorn --preload wsgi:app``.
+
+``python -m src.web.serving`` wraps this with worker and thread settings.
+"""
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from app import create_app
+
+app = create_app()